@@ -0,0 +1,85 @@
+"""
+Time /tasks/calendar/ and the date filters of /tasks/list/.
+
+The table is seeded with benchmarks.datagen, --users users with --tasks
+tasks each, and every case runs as one of those users. The calendar endpoint
+is timed for a week and for next month of due dates, and for this month of
+completions; its cost follows the user's tasks in the range, not the table.
+``month_bucketed_in_python`` is the alternative it replaces: reading every
+task due that month and counting them per day on the client side.
+``list_one_day`` times the first cursor page of one day's tasks with
+due_after/due_before.
+
+    python -m benchmarks.bench_calendar --users 100 --tasks 10000
+"""
+import argparse
+import json
+from collections import Counter
+from datetime import datetime, time, timedelta
+
+from benchmarks.common import count_queries, create_benchmark_database, measure, setup_django
+from benchmarks.datagen import seed_dataset
+
+
+def run(users, tasks_per_user, repeat):
+    from django.contrib.auth.models import User
+    from django.urls import reverse
+    from django.utils import timezone
+    from rest_framework.test import APIClient
+    from tasks.models import Task
+
+    tokens = seed_dataset(users, tasks_per_user, seed=1, prefix='bench')
+    user = User.objects.get(username='bench0')
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION='Token ' + tokens[user.username])
+    calendar_url = reverse('task_calendar')
+    list_url = reverse('list_tasks')
+
+    tz = timezone.get_current_timezone()
+    today = timezone.localdate()
+    this_month = today.replace(day=1)
+    month_start = (this_month + timedelta(days=32)).replace(day=1)
+    month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+
+    def month_bucketed_in_python():
+        due = Task.objects.filter(
+            user=user, deleted=False,
+            to_be_completed_time__gte=datetime.combine(month_start, time.min, tzinfo=tz),
+            to_be_completed_time__lt=datetime.combine(month_end + timedelta(days=1), time.min, tzinfo=tz),
+        ).values_list('to_be_completed_time', flat=True)
+        return Counter(timezone.localtime(value, tz).date() for value in due)
+
+    cases = {
+        'calendar_week': lambda: client.get(calendar_url, {'start': today, 'end': today + timedelta(days=6)}),
+        'calendar_month': lambda: client.get(calendar_url, {'start': month_start, 'end': month_end}),
+        'calendar_month_completed': lambda: client.get(calendar_url, {'start': this_month, 'end': month_start - timedelta(days=1), 'field': 'completed'}),
+        'month_bucketed_in_python': month_bucketed_in_python,
+        'list_one_day': lambda: client.get(list_url, {
+            'sort_by': 'to_be_completed_time', 'cursor': '', 'due_after': today, 'due_before': today + timedelta(days=1),
+        }),
+    }
+
+    results = []
+    for label, func in cases.items():
+        results.append(dict(measure(func, repeat=repeat), tasks=users * tasks_per_user, case=label, queries=count_queries(func)))
+        print(json.dumps(results[-1]))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--tasks', type=int, default=10000, help='Tasks per user.')
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    setup_django()
+    teardown = create_benchmark_database()
+    try:
+        run(args.users, args.tasks, args.repeat)
+    finally:
+        teardown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+Memory per idle SSE subscriber and fan-out latency of tasks.events.
+
+Opens --subscribers streams (one per user) on a single event loop, as one
+ASGI worker would, measures the Python memory they hold while idle, then
+delivers one event to every user and times until all streams have
+produced it. Uses the in-process broker; with PostgreSQL the listener
+thread feeds the same Broker.deliver.
+
+    python -m benchmarks.bench_events --subscribers 10000
+"""
+import argparse
+import asyncio
+import json
+import time
+import tracemalloc
+
+from benchmarks.common import setup_django
+
+
+async def run(subscribers, heartbeat):
+    from tasks import events
+
+    broker = events._broker = events.Broker()
+    received = 0
+    all_received = asyncio.Event()
+
+    async def consume(user_id):
+        nonlocal received
+        async for frame in events.stream(user_id, 100, heartbeat, 3600):
+            if frame.startswith('event:'):
+                received += 1
+                if received == subscribers:
+                    all_received.set()
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    consumers = [asyncio.create_task(consume(user_id)) for user_id in range(subscribers)]
+    while broker.stats()['streams'] < subscribers:
+        await asyncio.sleep(0.05)
+    await asyncio.sleep(0.2)
+    idle_bytes = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for user_id in range(subscribers):
+        broker.deliver(user_id, {'type': 'task.updated', 'id': user_id})
+    await all_received.wait()
+    fanout = time.perf_counter() - start
+
+    for consumer in consumers:
+        consumer.cancel()
+    await asyncio.gather(*consumers, return_exceptions=True)
+    return {
+        'subscribers': subscribers,
+        'idle_kb_per_subscriber': round(idle_bytes / subscribers / 1024, 2),
+        'idle_mb_total': round(idle_bytes / 1024 / 1024, 1),
+        'fanout_ms': round(fanout * 1000, 1),
+        'fanout_us_per_event': round(fanout * 1e6 / subscribers, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--subscribers', type=int, default=10000)
+    parser.add_argument('--heartbeat', type=float, default=15.0)
+    args = parser.parse_args()
+
+    setup_django()
+    print(json.dumps(asyncio.run(run(args.subscribers, args.heartbeat))))
+
+
+if __name__ == '__main__':
+    main()
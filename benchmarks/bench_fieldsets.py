@@ -0,0 +1,64 @@
+"""
+Bytes and time per /tasks/list/ page for full rows, ?view=summary and a
+narrow ?fields= list.
+
+Tasks get --description-bytes long descriptions, which PostgreSQL stores
+out of line (TOAST) above about 2 KB, so leaving description out of the
+SELECT also saves reading those pages.
+
+    python -m benchmarks.bench_fieldsets --tasks 10000 --description-bytes 8000
+"""
+import argparse
+import json
+
+from benchmarks.common import count_queries, create_benchmark_database, create_user, measure, seed_tasks, setup_django
+
+PAGE_SIZE = 100
+CASES = {
+    'full': {},
+    'summary': {'view': 'summary'},
+    'id_name_status': {'fields': 'id,name,status'},
+}
+
+
+def run(tasks, description_bytes, repeat):
+    from rest_framework.test import APIClient
+    from tasks.models import Task
+
+    user, token = create_user('bench_fields')
+    seed_tasks(user, tasks)
+    Task.objects.filter(user=user).update(description='x' * description_bytes)
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+
+    results = []
+    for name, params in CASES.items():
+        for mode, extra in [('page_number', {}), ('cursor', {'cursor': ''})]:
+            query = {'page_size': PAGE_SIZE, **params, **extra}
+            response = client.get('/tasks/list/', query)
+            results.append(dict(
+                measure(lambda: client.get('/tasks/list/', query), repeat=repeat),
+                case=name, mode=mode, tasks=tasks, description_bytes=description_bytes,
+                bytes_per_page=len(response.content), queries=count_queries(lambda: client.get('/tasks/list/', query)),
+            ))
+            print(json.dumps(results[-1]))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tasks', type=int, default=10000)
+    parser.add_argument('--description-bytes', type=int, default=8000)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    setup_django()
+    teardown = create_benchmark_database()
+    try:
+        run(args.tasks, args.description_bytes, args.repeat)
+    finally:
+        teardown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""
+Throughput and latency of the jobs queue.
+
+Enqueues --jobs no-op jobs (timing each insert, which is what a view pays)
+and drains them with a Worker of --concurrency threads for jobs per second.
+Then jobs are enqueued one every 10 ms to a running worker, and the delay
+from enqueue to run is reported; it is bounded by --poll-interval. Run it against PostgreSQL for
+realistic numbers; SQLite serialises every claim and completion.
+
+    python -m benchmarks.bench_jobs --jobs 5000 --concurrency 1 4 8
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+from benchmarks.common import create_benchmark_database, measure, setup_django
+
+pickup_delays = []
+_lock = threading.Lock()
+
+
+def record_pickup(enqueued_at):
+    with _lock:
+        pickup_delays.append(time.time() - enqueued_at)
+
+
+def steady_state_latency(noop, worker, count, interval):
+    """Enqueue ``count`` jobs every ``interval`` seconds while ``worker`` runs; return pickup delays."""
+    pickup_delays.clear()
+    thread = threading.Thread(target=worker.run)
+    thread.start()
+    for _ in range(count):
+        noop.delay(time.time())
+        time.sleep(interval)
+    deadline = time.time() + 30
+    while len(pickup_delays) < count and time.time() < deadline:
+        time.sleep(0.01)
+    worker.stop()
+    thread.join()
+    return sorted(pickup_delays)
+
+
+def run(jobs, concurrencies, batch_size, poll_interval):
+    from jobs.queue import job
+    from jobs.worker import Worker
+
+    noop = job(max_attempts=1)(record_pickup)
+    results = []
+    for concurrency in concurrencies:
+        # Throughput: drain a backlog of ``jobs``.
+        enqueue = measure(lambda: noop.delay(time.time()), repeat=jobs)
+        pickup_delays.clear()
+        worker = Worker(concurrency, batch_size, poll_interval)
+        start = time.perf_counter()
+        worker.run(once=True)
+        elapsed = time.perf_counter() - start
+        drained = len(pickup_delays)
+
+        # Latency: jobs trickling in to an idle worker, as from views.
+        delays = steady_state_latency(noop, Worker(concurrency, batch_size, poll_interval), min(jobs, 200), 0.01)
+        results.append({
+            'jobs': jobs,
+            'concurrency': concurrency,
+            'poll_interval': poll_interval,
+            'enqueue_mean_ms': enqueue['mean_ms'],
+            'enqueue_p50_ms': enqueue['p50_ms'],
+            'jobs_per_second': round(drained / elapsed, 1),
+            'pickup_p50_ms': round(delays[len(delays) // 2] * 1000, 1),
+            'pickup_p99_ms': round(delays[int(len(delays) * 0.99)] * 1000, 1),
+            'pickup_mean_ms': round(statistics.mean(delays) * 1000, 1),
+            'stats': worker.stats,
+        })
+        print(json.dumps(results[-1]))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--jobs', type=int, default=5000)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 8])
+    parser.add_argument('--batch-size', type=int, help='Jobs claimed per query (default: twice the concurrency).')
+    parser.add_argument('--poll-interval', type=float, default=0.1, help='Worker poll interval while idle, in seconds.')
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import connection
+
+    if connection.vendor == 'sqlite':
+        # Worker threads need a file database; shared in-memory SQLite locks whole tables.
+        connection.settings_dict['TEST']['NAME'] = os.path.join(tempfile.mkdtemp(), 'bench_jobs.sqlite3')
+    teardown = create_benchmark_database()
+    try:
+        run(args.jobs, args.concurrency, args.batch_size, args.poll_interval)
+    finally:
+        teardown()
+
+
+if __name__ == '__main__':
+    main()
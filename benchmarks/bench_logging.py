@@ -0,0 +1,92 @@
+"""
+Logging overhead per request: synchronous FileHandler vs QueueHandler.
+
+A "request" emits the records a typical task write produces with the
+'django' logger at DEBUG: one SQL line per query plus the request and
+'myapp' lines. Only the time spent on the calling thread is measured,
+which is what a request waits for. --stall-ms makes every 100th write
+stall, as a busy disk or network filesystem does.
+
+    python -m benchmarks.bench_logging --records 12 --repeat 2000 --stall-ms 20
+"""
+import argparse
+import json
+import logging
+import os
+import tempfile
+import time
+
+from benchmarks.common import measure, setup_django
+
+
+class StallingFileHandler(logging.FileHandler):
+    def __init__(self, filename, stall_ms):
+        super().__init__(filename)
+        self.stall = stall_ms / 1000
+        self.writes = 0
+
+    def emit(self, record):
+        self.writes += 1
+        if self.stall and self.writes % 100 == 0:
+            time.sleep(self.stall)
+        super().emit(record)
+
+
+def queue_handler(filename, stall_ms):
+    from task_manager.log_handlers import QueueHandler
+
+    handler = QueueHandler(filename)
+    handler.target = StallingFileHandler(filename, stall_ms)
+    handler.listener.handlers = (handler.target,)
+    return handler
+
+
+def make_logger(name, handler, formatter):
+    handler.setFormatter(formatter)
+    logger = logging.getLogger(f'bench.{name}')
+    logger.handlers = [handler]
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    return logger
+
+
+def run(records, repeat, stall_ms):
+    from task_manager.log_handlers import JSONFormatter
+
+    directory = tempfile.mkdtemp()
+    verbose = logging.Formatter('%(levelname)s %(asctime)s %(module)s %(message)s')
+    setups = {
+        'file_handler': lambda: StallingFileHandler(os.path.join(directory, 'sync.log'), stall_ms),
+        'queue_handler': lambda: queue_handler(os.path.join(directory, 'queue.log'), stall_ms),
+    }
+    results = []
+    for formatter_name, formatter in [('verbose', verbose), ('json', JSONFormatter())]:
+        for name, make_handler in setups.items():
+            handler = make_handler()
+            logger = make_logger(f'{name}.{formatter_name}', handler, formatter)
+
+            def request():
+                for i in range(records - 1):
+                    logger.debug('(%.3f) %s; args=%s; alias=%s', 0.001, 'SELECT "tasks_task"."id" FROM "tasks_task" WHERE "tasks_task"."user_id" = %s', (i,), 'default')
+                logger.info('Task created successfully by user %s', 'bench')
+
+            results.append(dict(measure(request, repeat=repeat), handler=name, formatter=formatter_name, records=records, stall_ms=stall_ms))
+            handler.flush()
+            handler.close()
+            print(json.dumps(results[-1]))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--records', type=int, default=12, help='Log records per request.')
+    parser.add_argument('--repeat', type=int, default=2000)
+    parser.add_argument('--stall-ms', type=float, default=0, help='Stall every 100th file write this long.')
+    args = parser.parse_args()
+
+    setup_django()
+    run(args.records, args.repeat, args.stall_ms)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""
+Per-request cost of MetricsMiddleware.
+
+The middleware is driven directly around a stub view that runs --queries
+fake SQL statements through the connection's execute wrappers, so the
+difference between the two rows is the instrumentation alone (target:
+under 50µs). --slow-log also keeps the SQL for the slow-request log.
+--end-to-end additionally times GET /tasks/list/ through the test client
+with the middleware on and off.
+
+    python -m benchmarks.bench_metrics --queries 5 --repeat 20000
+"""
+import argparse
+import functools
+import json
+
+from benchmarks.common import create_benchmark_database, create_user, measure, seed_tasks, setup_django
+
+
+def stub_view(request):
+    pass
+
+
+def make_handler(queries, instrumented, slow_log):
+    from django.db import connection
+    from django.http import HttpResponse
+    from django.test import RequestFactory
+    from django.test.utils import override_settings
+
+    from task_manager.middleware import MetricsMiddleware
+
+    stub_view.__module__ = 'tasks.views'
+    request_factory = RequestFactory()
+
+    def execute(sql, params, many, context):
+        return None
+
+    def get_response(request):
+        if instrumented:
+            middleware.process_view(request, stub_view, (), {})
+        # What CursorWrapper._execute_with_wrappers does, minus the cursor.
+        run = execute
+        for wrapper in reversed(connection.execute_wrappers):
+            run = functools.partial(wrapper, run)
+        for _ in range(queries):
+            run('SELECT 1', (), False, {})
+        return HttpResponse(b'{"results": []}', content_type='application/json')
+
+    config = {'ENABLED': True, 'VIEW_MODULES': ['tasks.views'], 'SLOW_REQUEST_MS': 60000 if slow_log else None}
+    with override_settings(METRICS=config):
+        middleware = MetricsMiddleware(get_response)
+    handler = middleware if instrumented else get_response
+    return lambda: handler(request_factory.get('/tasks/list/'))
+
+
+def run_end_to_end(repeat):
+    from django.test import Client
+    from django.test.utils import override_settings
+
+    teardown = create_benchmark_database()
+    try:
+        user, token = create_user('bench_metrics')
+        seed_tasks(user, 200)
+        for enabled in (False, True):
+            with override_settings(METRICS={'ENABLED': enabled, 'VIEW_MODULES': ['tasks.views'], 'SLOW_REQUEST_MS': None}):
+                client = Client(HTTP_AUTHORIZATION=f'Token {token.key}')
+                result = measure(lambda: client.get('/tasks/list/'), repeat=repeat)
+            print(json.dumps(dict(result, case='end_to_end', metrics=enabled)))
+    finally:
+        teardown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--queries', type=int, default=5, help='SQL statements per request.')
+    parser.add_argument('--repeat', type=int, default=20000)
+    parser.add_argument('--slow-log', action='store_true', help='Keep SQL for the slow-request log.')
+    parser.add_argument('--end-to-end', action='store_true', help='Also time GET /tasks/list/ through the test client.')
+    args = parser.parse_args()
+
+    setup_django()
+    means = {}
+    for instrumented in (False, True):
+        result = measure(make_handler(args.queries, instrumented, args.slow_log), repeat=args.repeat)
+        means[instrumented] = result['mean_ms']
+        print(json.dumps(dict(result, case='stub_view', metrics=instrumented, queries=args.queries, slow_log=args.slow_log)))
+    print(json.dumps({'overhead_us': round((means[True] - means[False]) * 1000, 1)}))
+
+    if args.end_to_end:
+        run_end_to_end(max(args.repeat // 100, 50))
+
+
+if __name__ == '__main__':
+    main()
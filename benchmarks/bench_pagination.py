@@ -0,0 +1,71 @@
+"""
+Compare page-number and cursor pagination of /tasks/list/.
+
+For every dataset size a single user is seeded with that many tasks, then the
+first, middle and last page are fetched in both modes for every sort_by value.
+
+    python -m benchmarks.bench_pagination --sizes 10000 100000 1000000
+"""
+import argparse
+import json
+
+from benchmarks.common import (
+    count_queries, create_benchmark_database, create_user, measure, seed_tasks, setup_django,
+)
+
+PAGE_SIZE = 100
+
+
+def run(sizes, repeat):
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+    from tasks.pagination import KeysetPagination
+    from tasks.views import TASK_ORDERINGS, get_task_queryset
+
+    results = []
+    for size in sizes:
+        user, token = create_user(f'bench{size}')
+        seed_tasks(user, size)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+        url = reverse('list_tasks')
+        last_page = (size + PAGE_SIZE - 1) // PAGE_SIZE
+
+        for sort_by, ordering in TASK_ORDERINGS.items():
+            paginator = KeysetPagination(ordering)
+            queryset = get_task_queryset(user, sort_by)
+            for label, page in [('first', 1), ('middle', last_page // 2 or 1), ('last', last_page)]:
+                params = {'sort_by': sort_by, 'page_size': PAGE_SIZE}
+                cursor_params = dict(params, cursor='')
+                if page > 1:
+                    # Build the cursor that points just before the requested page.
+                    previous_row = queryset[(page - 1) * PAGE_SIZE - 1]
+                    cursor_params['cursor'] = paginator.encode_cursor(paginator.get_position(previous_row))
+
+                for mode, query in [('page_number', dict(params, page=page)), ('cursor', cursor_params)]:
+                    queries = count_queries(lambda: client.get(url, query))
+                    stats = measure(lambda: client.get(url, query), repeat=repeat)
+                    results.append(dict(
+                        stats, tasks=size, sort_by=sort_by, page=label, mode=mode,
+                        queries=queries,
+                    ))
+                    print(json.dumps(results[-1]))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+    teardown = create_benchmark_database()
+    try:
+        run(args.sizes, args.repeat)
+    finally:
+        teardown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""
+Per-request connection cost with and without the connection pool.
+
+Each simulated request connects, runs one small query and closes the
+connection the way Django does at the end of a request, in each of the
+DB_CONNECTION_MODE setups: direct (a new connection every time), persistent
+(CONN_MAX_AGE, reused by the thread) and pool. Run it against a local
+PostgreSQL:
+
+    python -m benchmarks.bench_pool --host localhost --name task_manager --user task_user --password password
+"""
+import argparse
+import json
+import threading
+import time
+
+from benchmarks.common import measure, setup_django
+
+ENGINES = {
+    'direct': 'django.db.backends.postgresql',
+    'persistent': 'django.db.backends.postgresql',
+    'pool': 'task_manager.db.backends.postgresql_pool',
+}
+
+
+def make_connection(mode, overrides, pool_size):
+    from django.conf import settings
+    from django.db.utils import ConnectionHandler
+
+    settings_dict = {**settings.DATABASES['default'], **overrides, 'ENGINE': ENGINES[mode]}
+    settings_dict['CONN_MAX_AGE'] = 600 if mode == 'persistent' else 0
+    settings_dict['POOL'] = {'MAX_SIZE': pool_size}
+    # A throwaway handler, so the benchmark never touches the configured alias.
+    return ConnectionHandler({f'bench_{mode}': settings_dict})[f'bench_{mode}']
+
+
+def simulate_request(connection):
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1')
+        cursor.fetchone()
+    # What django.db.close_old_connections does at request end.
+    connection.close_if_unusable_or_obsolete()
+
+
+def run_concurrent(mode, overrides, pool_size, threads, requests):
+    """Requests/sec with ``threads`` workers sharing the mode's setup."""
+    timings = []
+    lock = threading.Lock()
+
+    def worker():
+        connection = make_connection(mode, overrides, pool_size)
+        local = []
+        for _ in range(requests):
+            start = time.perf_counter()
+            simulate_request(connection)
+            local.append((time.perf_counter() - start) * 1000)
+        connection.close()
+        with lock:
+            timings.extend(local)
+
+    started = time.perf_counter()
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    timings.sort()
+    return {
+        'requests_per_second': round(len(timings) / elapsed, 1),
+        'p50_ms': round(timings[len(timings) // 2], 3),
+        'p99_ms': round(timings[min(len(timings) - 1, int(len(timings) * 0.99))], 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host')
+    parser.add_argument('--port')
+    parser.add_argument('--name')
+    parser.add_argument('--user')
+    parser.add_argument('--password')
+    parser.add_argument('--repeat', type=int, default=500)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--pool-size', type=int, default=8)
+    args = parser.parse_args()
+
+    setup_django()
+    from task_manager.db.backends.postgresql_pool.base import get_stats
+
+    overrides = {
+        key.upper(): value for key, value in vars(args).items()
+        if key in ('host', 'port', 'name', 'user', 'password') and value is not None
+    }
+    for mode in ENGINES:
+        connection = make_connection(mode, overrides, args.pool_size)
+        simulate_request(connection)
+        result = dict(measure(lambda: simulate_request(connection), repeat=args.repeat), mode=mode, threads=1)
+        connection.close()
+        print(json.dumps(result))
+        result = dict(run_concurrent(mode, overrides, args.pool_size, args.threads, args.repeat // args.threads or 1), mode=mode, threads=args.threads)
+        print(json.dumps(result))
+    print(json.dumps({'pool_stats': get_stats()}))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""
+Time the reminder scheduler as the Task table grows.
+
+For every size the table is topped up to that many tasks, then a fresh
+ReminderScheduler is started and the clock is stepped forward --ticks times
+by --step seconds, recording reminders as it goes. The startup load and the
+mean tick should stay flat across sizes, since both only read the tasks due
+in the window. ``table_rescan`` times what a scheduler without the heap
+would run every tick: every pending task due before the lead time.
+
+    python -m benchmarks.bench_reminders --sizes 10000 100000 1000000
+"""
+import argparse
+import json
+import time
+from datetime import timedelta
+
+from benchmarks.common import (
+    count_queries, create_benchmark_database, create_user, measure, seed_tasks, setup_django,
+)
+
+
+def timed_tick(scheduler, now):
+    """Return (milliseconds, queries) for one scheduler tick."""
+    start = time.perf_counter()
+    queries = count_queries(lambda: scheduler.tick(now))
+    return round((time.perf_counter() - start) * 1000, 3), queries
+
+
+def run(sizes, ticks, step, repeat):
+    from django.conf import settings
+    from django.utils import timezone
+    from tasks.models import ReminderEvent, Task
+    from tasks.reminders import ReminderScheduler
+
+    lead = timedelta(minutes=settings.TASK_REMINDERS['LEAD_MINUTES'])
+    results = []
+    seeded = 0
+    for index, size in enumerate(sizes):
+        user, _ = create_user(f'bench{size}')
+        seed_tasks(user, size - seeded)
+        seeded = size
+
+        # Each size gets its own stretch of time so earlier runs have not
+        # already recorded its reminders.
+        start = timezone.now() + timedelta(hours=2 * index)
+        scheduler = ReminderScheduler.from_settings()
+        recorded_before = ReminderEvent.objects.count()
+        startup_ms, startup_queries = timed_tick(scheduler, start)
+        heap_size = len(scheduler.heap)
+
+        timings = []
+        queries = 0
+        for n in range(1, ticks + 1):
+            ms, tick_queries = timed_tick(scheduler, start + timedelta(seconds=step * n))
+            timings.append(ms)
+            queries += tick_queries
+
+        def table_rescan():
+            return list(
+                Task.objects.filter(completed=False, deleted=False, to_be_completed_time__lte=start + lead)
+                .values_list('id', 'to_be_completed_time')
+            )
+
+        results.append({
+            'tasks': size,
+            'startup_ms': startup_ms,
+            'startup_queries': startup_queries,
+            'heap_size': heap_size,
+            'tick_mean_ms': round(sum(timings) / len(timings), 3),
+            'tick_max_ms': max(timings),
+            'queries_per_tick': round(queries / ticks, 2),
+            'reminders': ReminderEvent.objects.count() - recorded_before,
+            'table_rescan': dict(measure(table_rescan, repeat=repeat), rows=len(table_rescan())),
+        })
+        print(json.dumps(results[-1]))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--ticks', type=int, default=120)
+    parser.add_argument('--step', type=float, default=30, help='Simulated seconds between ticks.')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    teardown = create_benchmark_database()
+    try:
+        run(args.sizes, args.ticks, args.step, args.repeat)
+    finally:
+        teardown()
+
+
+if __name__ == '__main__':
+    main()
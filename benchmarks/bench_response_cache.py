@@ -0,0 +1,84 @@
+"""
+Time /tasks/list/ and /tasks/summary/ with and without the response cache.
+
+One user is seeded with --tasks tasks. ``miss`` clears the in-process cache
+before every request and ``hit`` repeats the same request. The mixed run
+sends --requests list requests over a few sort/filter/page combinations and
+makes a write through update_task every --write-every requests, then reports
+the hit rate.
+
+    python -m benchmarks.bench_response_cache --tasks 100000
+"""
+import argparse
+import json
+import random
+
+from benchmarks.common import count_queries, create_benchmark_database, create_user, measure, seed_tasks, setup_django
+
+LIST_PARAMS = [
+    {'sort_by': sort_by, **flags, 'page': page}
+    for sort_by in ['created_at', 'to_be_completed_time', 'completion_time']
+    for flags in [{}, {'show_pending': 'true'}, {'show_completed': 'true'}]
+    for page in [1, 2, 3]
+]
+
+
+def run(count, repeat, requests, write_every):
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+    from tasks import counters, response_cache
+    from tasks.models import Task
+
+    user, token = create_user('bench')
+    seed_tasks(user, count)
+    counters.get_counter(user.id)
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+    list_url = reverse('list_tasks')
+    summary_url = reverse('task_summary')
+    cache = response_cache.response_cache
+
+    def miss(url, params):
+        cache.clear()
+        return client.get(url, params)
+
+    results = []
+    for label, url, params in [('list', list_url, LIST_PARAMS[0]), ('summary', summary_url, {})]:
+        for mode, func in [('miss', lambda: miss(url, params)), ('hit', lambda: client.get(url, params))]:
+            func()
+            results.append(dict(measure(func, repeat=repeat), tasks=count, endpoint=label, mode=mode, queries=count_queries(func)))
+            print(json.dumps(results[-1]))
+
+    cache.clear()
+    before = cache.stats()
+    rng = random.Random(0)
+    task_ids = list(Task.objects.filter(user=user).values_list('id', flat=True)[:1000])
+    for n in range(1, requests + 1):
+        client.get(list_url, rng.choice(LIST_PARAMS))
+        if n % write_every == 0:
+            client.put(reverse('update_task', args=[rng.choice(task_ids)]), {'name': f'Renamed {n}'}, format='json')
+    after = cache.stats()
+    hits, misses = after['hits'] - before['hits'], after['misses'] - before['misses']
+    results.append({'tasks': count, 'mode': 'mixed', 'requests': requests, 'write_every': write_every, 'hit_rate': round(hits / (hits + misses), 3)})
+    print(json.dumps(results[-1]))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tasks', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--write-every', type=int, default=50, help='Requests between writes in the mixed run.')
+    args = parser.parse_args()
+
+    setup_django()
+    teardown = create_benchmark_database()
+    try:
+        run(args.tasks, args.repeat, args.requests, args.write_every)
+    finally:
+        teardown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""
+Time /tasks/search/ against a substring scan of the same tasks.
+
+One user is seeded with tasks whose names and descriptions are drawn from a
+fixed vocabulary, so terms range from rare to very common. Each query is
+timed through the endpoint (tsquery + GIN index on PostgreSQL) and as a
+plain icontains filter, the only option before the endpoint existed.
+
+    python -m benchmarks.bench_search --tasks 1000000
+"""
+import argparse
+import json
+import random
+from datetime import timedelta
+
+from benchmarks.common import create_benchmark_database, create_user, measure, setup_django
+
+VOCABULARY = (
+    'meeting review report invoice budget design deploy release planning standup '
+    'customer support ticket bug feature migration database backup security audit '
+    'hiring interview onboarding training travel booking expense payroll contract '
+    'renewal vendor quarterly roadmap retrospective demo documentation refactor'
+).split()
+
+QUERIES = {
+    'rare_term': 'zephyr',
+    'common_term': 'meeting',
+    'prefix': 'rev',
+    'two_terms': 'budget review',
+}
+
+PAGE_SIZE = 20
+
+
+def seed(user, count, batch_size=5000):
+    from django.utils import timezone
+    from tasks.models import Task
+
+    rng = random.Random(42)
+    now = timezone.now()
+    for start in range(0, count, batch_size):
+        batch = []
+        for i in range(start, min(start + batch_size, count)):
+            words = rng.sample(VOCABULARY, 6)
+            # One task in 10,000 gets a rare word.
+            if i % 10000 == 0:
+                words[0] = 'zephyr'
+            batch.append(Task(
+                user=user,
+                name=' '.join(words[:2]).capitalize(),
+                description=' '.join(words[2:]),
+                to_be_completed_time=now + timedelta(minutes=i % 100000 - 50000),
+            ))
+        Task.objects.bulk_create(batch, batch_size=batch_size)
+
+
+def run(count, repeat):
+    from django.db.models import Q
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+    from tasks.views import get_task_queryset
+
+    user, token = create_user('bench')
+    seed(user, count)
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+    url = reverse('search_tasks')
+
+    def substring_scan(q):
+        queryset = get_task_queryset(user, 'created_at')
+        for term in q.split():
+            queryset = queryset.filter(Q(name__icontains=term) | Q(description__icontains=term))
+        return list(queryset.values('id')[:PAGE_SIZE])
+
+    results = []
+    for label, q in QUERIES.items():
+        cases = {
+            'search_endpoint': lambda: client.get(url, {'q': q, 'page_size': PAGE_SIZE}),
+            'substring_scan': lambda: substring_scan(q),
+        }
+        for mode, func in cases.items():
+            results.append(dict(measure(func, repeat=repeat), tasks=count, query=label, mode=mode))
+            print(json.dumps(results[-1]))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tasks', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+    teardown = create_benchmark_database()
+    try:
+        run(args.tasks, args.repeat)
+    finally:
+        teardown()
+
+
+if __name__ == '__main__':
+    main()
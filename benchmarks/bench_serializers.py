@@ -0,0 +1,53 @@
+"""
+Time TaskSerializer against TaskRowSerializer per 100 rows.
+
+Each path is timed for rendering alone (rows already fetched) and for
+fetching plus rendering, the way list_tasks uses it.
+
+    python -m benchmarks.bench_serializers --rows 100 --repeat 200
+"""
+import argparse
+import json
+
+from benchmarks.common import create_benchmark_database, create_user, measure, seed_tasks, setup_django
+
+
+def run(rows, repeat):
+    from tasks.serializers import TaskRowSerializer, TaskSerializer
+    from tasks.views import get_task_queryset
+
+    user, _ = create_user('bench')
+    seed_tasks(user, rows)
+    queryset = get_task_queryset(user, 'created_at')[:rows]
+    instances = list(queryset)
+    values = list(queryset.values(*TaskRowSerializer.columns))
+
+    cases = {
+        'task_serializer_render': lambda: TaskSerializer(instances, many=True).data,
+        'row_serializer_render': lambda: TaskRowSerializer(values).data,
+        'task_serializer_fetch_and_render': lambda: TaskSerializer(list(queryset), many=True).data,
+        'row_serializer_fetch_and_render': lambda: TaskRowSerializer(list(queryset.values(*TaskRowSerializer.columns))).data,
+    }
+    results = []
+    for name, func in cases.items():
+        results.append(dict(measure(func, repeat=repeat), case=name, rows=rows))
+        print(json.dumps(results[-1]))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    setup_django()
+    teardown = create_benchmark_database()
+    try:
+        run(args.rows, args.repeat)
+    finally:
+        teardown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""
+Shared helpers for the benchmark scripts.
+
+Benchmarks run against a throwaway test database created from the configured
+DATABASES settings, so they never touch real data. Run them from the
+repository root, e.g. ``python -m benchmarks.bench_pagination``.
+"""
+import os
+import statistics
+import sys
+import time
+from datetime import timedelta
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+
+def setup_django():
+    sys.path.insert(0, str(BASE_DIR))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'task_manager.settings')
+    import django
+    django.setup()
+
+
+def create_benchmark_database(keepdb=False):
+    """Create the test database and return a callable that destroys it."""
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+
+    setup_test_environment()
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=keepdb)
+
+    def teardown():
+        if not keepdb:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    return teardown
+
+
+def create_user(username):
+    from django.contrib.auth.models import User
+    from rest_framework.authtoken.models import Token
+
+    user = User.objects.create_user(username=username, password='password', email=f'{username}@example.com')
+    token = Token.objects.create(user=user)
+    return user, token
+
+
+def seed_tasks(user, count, batch_size=5000, completed_ratio=0.3):
+    """Insert ``count`` tasks for ``user`` with spread-out due dates."""
+    from django.utils import timezone
+    from tasks.models import Task
+
+    now = timezone.now()
+    completed_every = int(1 / completed_ratio) if completed_ratio else 0
+    created = 0
+    while created < count:
+        batch = []
+        for i in range(created, min(created + batch_size, count)):
+            completed = bool(completed_every) and i % completed_every == 0
+            batch.append(Task(
+                user=user,
+                name=f'Task {i}',
+                description=f'Benchmark task number {i}',
+                to_be_completed_time=now + timedelta(minutes=i % 100000 - 50000),
+                completed=completed,
+                completion_time=now - timedelta(minutes=i % 5000) if completed else None,
+            ))
+        Task.objects.bulk_create(batch, batch_size=batch_size)
+        created += len(batch)
+
+
+def count_queries(func):
+    """Return the number of SQL statements ``func`` runs on the default database."""
+    from django.db import connection
+
+    statements = []
+
+    def counter(execute, sql, params, many, context):
+        statements.append(sql)
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(counter):
+        func()
+    return len(statements)
+
+
+def measure(func, repeat=20):
+    """Call ``func`` ``repeat`` times and return timing statistics in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        'mean_ms': round(statistics.mean(timings), 3),
+        'p50_ms': round(timings[len(timings) // 2], 3),
+        'max_ms': round(timings[-1], 3),
+    }
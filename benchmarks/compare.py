@@ -0,0 +1,78 @@
+"""
+Compare two load_suite reports scenario by scenario.
+
+Prints one JSON object per scenario with the relative change of each metric
+and exits with status 1 if any scenario's p95 latency grew by more than
+--threshold, its throughput fell by more than --threshold, or it ran more
+SQL queries per request than before.
+
+    python -m benchmarks.compare before.json after.json --threshold 0.1
+"""
+import argparse
+import json
+import sys
+
+# Metric -> whether a higher value is better.
+METRICS = {
+    'throughput_rps': True,
+    'p50_ms': False,
+    'p95_ms': False,
+    'p99_ms': False,
+    'bytes_per_request': False,
+    'queries_per_request': False,
+}
+
+
+def change(before, after):
+    if before is None or after is None:
+        return None
+    if before == 0:
+        return 0.0 if after == 0 else None
+    return round((after - before) / before, 3)
+
+
+def compare(before, after, threshold):
+    baseline = {result['scenario']: result for result in before['results']}
+    rows = []
+    for result in after['results']:
+        previous = baseline.get(result['scenario'])
+        if previous is None:
+            continue
+        row = {'scenario': result['scenario']}
+        for metric in METRICS:
+            row[metric] = [previous.get(metric), result.get(metric), change(previous.get(metric), result.get(metric))]
+
+        regressions = []
+        p95_change = row['p95_ms'][2]
+        throughput_change = row['throughput_rps'][2]
+        if p95_change is not None and p95_change > threshold:
+            regressions.append('p95_ms')
+        if throughput_change is not None and throughput_change < -threshold:
+            regressions.append('throughput_rps')
+        if None not in row['queries_per_request'][:2] and row['queries_per_request'][1] > row['queries_per_request'][0]:
+            regressions.append('queries_per_request')
+        if result.get('errors') and not previous.get('errors'):
+            regressions.append('errors')
+        row['regressions'] = regressions
+        rows.append(row)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('before')
+    parser.add_argument('after')
+    parser.add_argument('--threshold', type=float, default=0.1, help='Allowed relative slowdown (default 0.1 = 10%%).')
+    args = parser.parse_args()
+
+    with open(args.before) as before, open(args.after) as after:
+        before, after = json.load(before), json.load(after)
+    print(json.dumps({'before': before['meta'].get('commit'), 'after': after['meta'].get('commit')}))
+    rows = compare(before, after, args.threshold)
+    for row in rows:
+        print(json.dumps(row))
+    sys.exit(1 if any(row['regressions'] for row in rows) else 0)
+
+
+if __name__ == '__main__':
+    main()
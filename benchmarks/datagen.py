@@ -0,0 +1,100 @@
+"""
+Seed a reproducible dataset of N users x M tasks.
+
+Users are named ``<prefix><n>`` with password "password". Each user's tasks
+mix pending, overdue, completed and soft-deleted rows in the given ratios,
+with descriptions of varied length. The same --seed gives the same data.
+
+The load suite seeds a throwaway test database itself. To load test a
+running server, seed the database that server uses first:
+
+    python -m benchmarks.datagen --users 20 --tasks 5000 --seed 1
+"""
+import argparse
+import json
+import random
+from datetime import timedelta
+
+DEFAULT_RATIOS = {'completed': 0.3, 'deleted': 0.05, 'overdue': 0.15}
+# Description lengths in characters and how often each occurs.
+DESCRIPTION_LENGTHS = [(0, 0.1), (40, 0.45), (200, 0.3), (1000, 0.1), (4000, 0.05)]
+WORDS = 'call email review plan draft fix send book pay write read buy check clean update renew'.split()
+
+
+def generate_task_fields(rng, index, now, ratios):
+    """Field values for one task, drawn from ``rng``."""
+    lengths, weights = zip(*DESCRIPTION_LENGTHS)
+    length = rng.choices(lengths, weights)[0]
+    description = ' '.join(rng.choice(WORDS) for _ in range(length // 6 + 1))[:length]
+    fields = {
+        'name': f'{rng.choice(WORDS).capitalize()} {rng.choice(WORDS)} #{index}',
+        'description': description,
+        'to_be_completed_time': now + timedelta(minutes=rng.randint(60, 60 * 24 * 90)),
+        'completed': False,
+        'completion_time': None,
+        'deleted': False,
+        'deleted_at': None,
+    }
+
+    roll = rng.random()
+    if roll < ratios['completed']:
+        fields['to_be_completed_time'] = now + timedelta(minutes=rng.randint(-60 * 24 * 60, 60 * 24 * 30))
+        fields['completed'] = True
+        fields['completion_time'] = now - timedelta(minutes=rng.randint(1, 60 * 24 * 60))
+    elif roll < ratios['completed'] + ratios['overdue']:
+        fields['to_be_completed_time'] = now - timedelta(minutes=rng.randint(1, 60 * 24 * 30))
+
+    if rng.random() < ratios['deleted']:
+        fields['deleted'] = True
+        fields['deleted_at'] = now - timedelta(minutes=rng.randint(1, 60 * 24 * 7))
+    return fields
+
+
+def seed_dataset(users, tasks_per_user, seed=0, prefix='load', ratios=None, batch_size=5000):
+    """
+    Create ``users`` users with ``tasks_per_user`` tasks each and return
+    {username: token key}. Existing users with the same names are replaced.
+    """
+    from django.contrib.auth.models import User
+    from django.utils import timezone
+    from rest_framework.authtoken.models import Token
+    from tasks.models import Task
+
+    ratios = {**DEFAULT_RATIOS, **(ratios or {})}
+    rng = random.Random(seed)
+    now = timezone.now()
+    usernames = [f'{prefix}{n}' for n in range(users)]
+    User.objects.filter(username__in=usernames).delete()
+
+    tokens = {}
+    for username in usernames:
+        user = User.objects.create_user(username=username, password='password', email=f'{username}@example.com')
+        tokens[username] = Token.objects.create(user=user).key
+        for start in range(0, tasks_per_user, batch_size):
+            Task.objects.bulk_create([
+                Task(user=user, **generate_task_fields(rng, index, now, ratios))
+                for index in range(start, min(start + batch_size, tasks_per_user))
+            ], batch_size=batch_size)
+    return tokens
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=10)
+    parser.add_argument('--tasks', type=int, default=1000, help='Tasks per user.')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--prefix', default='load', help='Username prefix.')
+    for name, ratio in DEFAULT_RATIOS.items():
+        parser.add_argument(f'--{name}', type=float, default=ratio, help=f'Share of {name} tasks (default {ratio}).')
+    args = parser.parse_args()
+
+    from benchmarks.common import setup_django
+
+    setup_django()
+    ratios = {name: getattr(args, name) for name in DEFAULT_RATIOS}
+    tokens = seed_dataset(args.users, args.tasks, seed=args.seed, prefix=args.prefix, ratios=ratios)
+    print(json.dumps({'users': args.users, 'tasks_per_user': args.tasks, 'seed': args.seed, 'ratios': ratios, 'tokens': tokens}))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,328 @@
+"""
+Scenario load suite for the API, in-process or against a running server.
+
+Each scenario sends --requests requests spread round-robin over the seeded
+users and is reported as one JSON object: throughput, p50/p95/p99 latency,
+errors, bytes and SQL queries per request. Scenarios: register, login,
+every list_tasks sort_by x filter x pagination combination, summary,
+create, update, complete and delete (writes run last, on pending tasks).
+
+In-process, the suite seeds a throwaway test database and drives the views
+through the test client:
+
+    python -m benchmarks.load_suite --users 10 --tasks 2000 --requests 200 --output before.json
+
+Against a server, seed its database with benchmarks.datagen first, using
+the same --users and --prefix. Queries per request are then read from
+/metrics/ when --admin-token is given; that is only exact with a single
+worker process, since each process keeps its own metrics:
+
+    python -m benchmarks.datagen --users 10 --tasks 2000
+    python -m benchmarks.load_suite --base-url http://127.0.0.1:8000 --users 10 \\
+        --concurrency 8 --admin-token <key> --output after.json
+
+Compare two reports with ``python -m benchmarks.compare before.json after.json``.
+"""
+import argparse
+import contextlib
+import http.client
+import itertools
+import json
+import subprocess
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlencode, urlsplit
+
+from benchmarks.common import BASE_DIR, setup_django
+from benchmarks.load_test import percentile
+
+SORTS = ['created_at', 'to_be_completed_time', 'completion_time']
+FILTERS = {'all': {}, 'pending': {'show_pending': 'true'}, 'completed': {'show_completed': 'true'}}
+PAGE_SIZE = 20
+
+
+class InProcessTransport:
+    label = 'inprocess'
+
+    def __init__(self):
+        from rest_framework.test import APIClient
+
+        self.client = APIClient()
+
+    def request(self, method, path, body=None, token=None):
+        headers = {'HTTP_AUTHORIZATION': f'Token {token}'} if token else {}
+        data = json.dumps(body) if body is not None else ''
+        response = self.client.generic(method, path, data, content_type='application/json', **headers)
+        content = b''.join(response) if response.streaming else response.content
+        return response.status_code, content
+
+    @contextlib.contextmanager
+    def count_queries(self):
+        from django.db import connections
+
+        statements = [0]
+
+        def counter(execute, sql, params, many, context):
+            statements[0] += 1
+            return execute(sql, params, many, context)
+
+        with contextlib.ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(counter))
+            yield lambda: statements[0]
+
+
+class HTTPTransport:
+    def __init__(self, base_url, admin_token=None):
+        parts = urlsplit(base_url)
+        self.label = 'http'
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.prefix = parts.path.rstrip('/')
+        self.admin_token = admin_token
+        self._local = threading.local()
+
+    def request(self, method, path, body=None, token=None):
+        headers = {'Content-Type': 'application/json'}
+        if token:
+            headers['Authorization'] = f'Token {token}'
+        payload = json.dumps(body).encode('utf-8') if body is not None else None
+        for attempt in range(2):
+            connection = getattr(self._local, 'connection', None)
+            if connection is None:
+                connection = self._local.connection = http.client.HTTPConnection(self.host, self.port, timeout=30)
+            try:
+                connection.request(method, self.prefix + path, payload, headers)
+                response = connection.getresponse()
+                return response.status, response.read()
+            except (OSError, http.client.HTTPException):
+                # The server closed an idle keep-alive connection; retry once on a new one.
+                connection.close()
+                self._local.connection = None
+                if attempt:
+                    raise
+
+    def scrape_queries(self):
+        """Total (SQL statements, requests) from the db_queries histogram."""
+        status, body = self.request('GET', '/metrics/', token=self.admin_token)
+        if status != 200:
+            raise RuntimeError(f'GET /metrics/ answered {status}')
+        totals = {'sum': 0.0, 'count': 0.0}
+        for line in body.decode('utf-8').splitlines():
+            for kind in totals:
+                if line.startswith(f'http_request_db_queries_{kind}{{'):
+                    totals[kind] += float(line.rsplit(' ', 1)[1])
+        return totals['sum'], totals['count']
+
+    @contextlib.contextmanager
+    def count_queries(self):
+        if not self.admin_token:
+            yield lambda: None
+            return
+        before = self.scrape_queries()
+        end = []
+        yield lambda: end[0] if end else None
+        after = self.scrape_queries()
+        end.append(after[0] - before[0])
+
+
+def next_path(url):
+    parts = urlsplit(url)
+    return parts.path + (f'?{parts.query}' if parts.query else '')
+
+
+def login_tokens(transport, usernames):
+    tokens = []
+    for username in usernames:
+        status, body = transport.request('POST', '/auth/login/', {'username': username, 'password': 'password'})
+        if status != 200:
+            raise RuntimeError(f'Could not log in {username}: {status} {body[:200]!r}; seed the server with benchmarks.datagen')
+        tokens.append(json.loads(body)['token'])
+    return tokens
+
+
+def pending_task_ids(transport, token, count):
+    """Up to ``count`` ids of the user's pending tasks, following cursor pages."""
+    ids = []
+    path = '/tasks/list/?' + urlencode({'show_pending': 'true', 'cursor': '', 'page_size': 100})
+    while path and len(ids) < count:
+        status, body = transport.request('GET', path, token=token)
+        if status != 200:
+            raise RuntimeError(f'Listing pending tasks answered {status}')
+        page = json.loads(body)
+        ids.extend(task['id'] for task in page['results'])
+        path = next_path(page['next']) if page['next'] else None
+    return ids[:count]
+
+
+def build_scenarios(tokens, task_ids, requests):
+    """Return [(name, [(method, path, body, token), ...], read_only)] in run order."""
+    users = list(zip(tokens, task_ids))
+    round_robin = [users[i % len(users)] for i in range(requests)]
+    run_id = uuid.uuid4().hex[:8]
+    due = (datetime.now(timezone.utc) + timedelta(days=7)).strftime('%Y-%m-%dT%H:%M:%SZ')
+    new_users = [f'reg-{run_id}-{i}' for i in range(requests)]
+
+    scenarios = [
+        ('register', [
+            ('POST', '/auth/register/', {'username': name, 'password': 'password', 'email': f'{name}@example.com'}, None)
+            for name in new_users
+        ], False),
+        ('login', [('POST', '/auth/login/', {'username': name, 'password': 'password'}, None) for name in new_users], False),
+    ]
+    for sort_by, (filter_name, filters), mode in itertools.product(SORTS, FILTERS.items(), ['page', 'cursor']):
+        query = {'sort_by': sort_by, 'page_size': PAGE_SIZE, **filters, **({'cursor': ''} if mode == 'cursor' else {})}
+        path = '/tasks/list/?' + urlencode(query)
+        scenarios.append((f'list:{sort_by}:{filter_name}:{mode}', [('GET', path, None, token) for token, _ in round_robin], True))
+    scenarios.append(('summary', [('GET', '/tasks/summary/', None, token) for token, _ in round_robin], True))
+
+    # Each write scenario takes its own third of every user's pending ids, so
+    # complete and delete act on tasks that are still pending.
+    def take(slot):
+        picked = []
+        for i, (token, ids) in enumerate(round_robin):
+            share = ids[slot::3]
+            if share:
+                picked.append((token, share[(i // len(users)) % len(share)]))
+        return picked
+
+    scenarios += [
+        ('create', [
+            ('POST', '/tasks/create/', {'name': f'Load task {i}', 'description': 'Created by the load suite', 'to_be_completed_time': due}, token)
+            for i, (token, _) in enumerate(round_robin)
+        ], False),
+        ('update', [('PUT', f'/tasks/update/{task_id}/', {'name': f'Updated {i}'}, token) for i, (token, task_id) in enumerate(take(0))], False),
+        ('complete', [('POST', f'/tasks/complete/{task_id}/', None, token) for token, task_id in take(1)], False),
+        ('delete', [('DELETE', f'/tasks/delete/{task_id}/', None, token) for token, task_id in take(2)], False),
+    ]
+    return scenarios
+
+
+def run_scenario(transport, name, requests, concurrency, warmup):
+    for request in requests[:warmup]:
+        transport.request(*request)
+
+    latencies = []
+    errors = {}
+    sizes = []
+
+    def send(request):
+        start = time.perf_counter()
+        try:
+            status, body = transport.request(*request)
+        except (OSError, http.client.HTTPException) as exc:
+            status, body = type(exc).__name__, b''
+        latencies.append(time.perf_counter() - start)
+        sizes.append(len(body))
+        if not isinstance(status, int) or status >= 400:
+            errors[str(status)] = errors.get(str(status), 0) + 1
+
+    with transport.count_queries() as queries:
+        started = time.perf_counter()
+        if concurrency > 1:
+            with ThreadPoolExecutor(concurrency) as pool:
+                list(pool.map(send, requests))
+        else:
+            for request in requests:
+                send(request)
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    total_queries = queries()
+    return {
+        'scenario': name,
+        'transport': transport.label,
+        'requests': len(requests),
+        'concurrency': concurrency,
+        'throughput_rps': round(len(requests) / elapsed, 1) if elapsed else None,
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 3) if latencies else None,
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 3) if latencies else None,
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 3) if latencies else None,
+        'bytes_per_request': round(sum(sizes) / len(sizes)) if sizes else None,
+        'queries_per_request': round(total_queries / len(requests), 2) if total_queries is not None and requests else None,
+        'errors': errors,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=BASE_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(transport, args):
+    usernames = [f'{args.prefix}{n}' for n in range(args.users)]
+    tokens = login_tokens(transport, usernames)
+    per_user = 3 * -(-args.requests // len(tokens))
+    task_ids = [pending_task_ids(transport, token, per_user) for token in tokens]
+
+    results = []
+    for name, requests, read_only in build_scenarios(tokens, task_ids, args.requests):
+        if args.only and not any(name.startswith(prefix) for prefix in args.only):
+            continue
+        results.append(run_scenario(transport, name, requests, args.concurrency, args.warmup if read_only else 0))
+        print(json.dumps(results[-1]))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--base-url', help='Drive a running server at this URL instead of the in-process test client.')
+    parser.add_argument('--users', type=int, default=10)
+    parser.add_argument('--tasks', type=int, default=2000, help='Tasks per user (in-process seeding only).')
+    parser.add_argument('--seed', type=int, default=0, help='Data generator seed (in-process seeding only).')
+    parser.add_argument('--prefix', default='load', help='Username prefix of the seeded users.')
+    parser.add_argument('--requests', type=int, default=200, help='Requests per scenario.')
+    parser.add_argument('--concurrency', type=int, default=1, help='Parallel connections (HTTP only).')
+    parser.add_argument('--warmup', type=int, default=5, help='Untimed requests before each read scenario.')
+    parser.add_argument('--admin-token', help='Staff token for reading queries per request from /metrics/ (HTTP only).')
+    parser.add_argument('--only', nargs='+', help='Run only scenarios whose name starts with one of these.')
+    parser.add_argument('--output', help='Also write the full report to this JSON file.')
+    args = parser.parse_args()
+
+    setup_django()
+    teardown = None
+    if args.base_url:
+        transport = HTTPTransport(args.base_url, args.admin_token)
+    else:
+        from benchmarks.common import create_benchmark_database
+        from benchmarks.datagen import seed_dataset
+
+        args.concurrency = 1
+        teardown = create_benchmark_database()
+        seed_dataset(args.users, args.tasks, seed=args.seed, prefix=args.prefix)
+        transport = InProcessTransport()
+
+    try:
+        results = run(transport, args)
+    finally:
+        if teardown is not None:
+            teardown()
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'transport': transport.label,
+            'base_url': args.base_url,
+            'users': args.users,
+            'tasks_per_user': None if args.base_url else args.tasks,
+            'seed': None if args.base_url else args.seed,
+            'requests': args.requests,
+            'concurrency': args.concurrency,
+            'finished_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        },
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(report, output, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+"""
+HTTP load test for comparing the WSGI and ASGI deployments.
+
+Unlike the other benchmarks this drives a running server over keep-alive
+connections, so start one (or both) first, e.g.:
+
+    gunicorn task_manager.wsgi -w 4 --threads 8 -b 127.0.0.1:8000
+    uvicorn task_manager.asgi:application --workers 4 --port 8001
+
+and point one target at the sync view and the other at its async twin:
+
+    python -m benchmarks.load_test --token <key> --connections 1000 --duration 30 \\
+        --target wsgi=http://127.0.0.1:8000/tasks/list/ \\
+        --target asgi=http://127.0.0.1:8001/async/tasks/list/
+
+1,000 connections need ``ulimit -n`` well above 1,000 on both ends. Each
+target is reported with requests/sec, p50/p99 latency and error counts.
+"""
+import argparse
+import asyncio
+import json
+import time
+from urllib.parse import urlsplit
+
+
+class Target:
+    def __init__(self, spec):
+        label, _, url = spec.partition('=')
+        if '://' in label:
+            label, url = spec, spec
+        self.label = label
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.path = parts.path + (f'?{parts.query}' if parts.query else '')
+
+    def request(self, token):
+        headers = [f'GET {self.path} HTTP/1.1', f'Host: {self.host}:{self.port}', 'Connection: keep-alive']
+        if token:
+            headers.append(f'Authorization: Token {token}')
+        return ('\r\n'.join(headers) + '\r\n\r\n').encode('ascii')
+
+
+async def read_response(reader):
+    """Read one response and return (status, keep_alive)."""
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    status = int(lines[0].split(' ', 2)[1])
+    headers = {}
+    for line in lines[1:]:
+        if ':' in line:
+            name, value = line.split(':', 1)
+            headers[name.strip().lower()] = value.strip()
+
+    if headers.get('transfer-encoding', '').lower() == 'chunked':
+        while True:
+            size = int((await reader.readuntil(b'\r\n')).split(b';')[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    else:
+        await reader.readexactly(int(headers.get('content-length', 0)))
+    return status, headers.get('connection', '').lower() != 'close'
+
+
+async def connection_worker(target, request, deadline, latencies, errors):
+    reader = writer = None
+    while time.perf_counter() < deadline:
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(target.host, target.port)
+            start = time.perf_counter()
+            writer.write(request)
+            await writer.drain()
+            status, keep_alive = await read_response(reader)
+            latencies.append(time.perf_counter() - start)
+            if status >= 400:
+                errors[status] = errors.get(status, 0) + 1
+        except (OSError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError) as exc:
+            errors[type(exc).__name__] = errors.get(type(exc).__name__, 0) + 1
+            keep_alive = False
+            await asyncio.sleep(0.01)
+        if not keep_alive and writer is not None:
+            writer.close()
+            writer = None
+    if writer is not None:
+        writer.close()
+
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+async def run_target(target, token, connections, duration):
+    request = target.request(token)
+    latencies = []
+    errors = {}
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(*[
+        connection_worker(target, request, deadline, latencies, errors) for _ in range(connections)
+    ])
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        'target': target.label,
+        'connections': connections,
+        'requests': len(latencies),
+        'requests_per_second': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 2) if latencies else None,
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 2) if latencies else None,
+        'errors': errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--target', action='append', required=True, help='[label=]URL to load; repeat to compare.')
+    parser.add_argument('--token', help='API token sent as "Authorization: Token <key>".')
+    parser.add_argument('--connections', type=int, default=1000)
+    parser.add_argument('--duration', type=float, default=30.0, help='Seconds per target.')
+    args = parser.parse_args()
+
+    for spec in args.target:
+        print(json.dumps(asyncio.run(run_target(Target(spec), args.token, args.connections, args.duration))))
+
+
+if __name__ == '__main__':
+    main()
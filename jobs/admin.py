@@ -0,0 +1,18 @@
+from django.contrib import admin
+from django.utils import timezone
+
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'name', 'status', 'attempts', 'max_attempts', 'run_at', 'locked_by', 'created_at']
+    list_filter = ['status', 'name']
+    search_fields = ['name']
+    readonly_fields = ['locked_by', 'locked_at', 'last_error', 'created_at', 'finished_at']
+    actions = ['retry_jobs']
+
+    @admin.action(description='Retry selected failed jobs now')
+    def retry_jobs(self, request, queryset):
+        retried = queryset.filter(status=Job.FAILED).update(status=Job.PENDING, attempts=0, run_at=timezone.now(), finished_at=None)
+        self.message_user(request, f'{retried} jobs queued again.')
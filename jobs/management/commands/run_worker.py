@@ -0,0 +1,41 @@
+import multiprocessing
+import signal
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from jobs.worker import Worker
+
+
+class Command(BaseCommand):
+    help = 'Run queued background jobs until stopped with SIGINT/SIGTERM.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=4, help='Threads running jobs in each process.')
+        parser.add_argument('--processes', type=int, default=1, help='Worker processes to fork.')
+        parser.add_argument('--batch-size', type=int, help='Jobs claimed per query (default: twice --concurrency).')
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='Seconds between polls while the queue is empty.')
+        parser.add_argument('--once', action='store_true', help='Exit once no due jobs are left.')
+
+    def handle(self, *args, **options):
+        if options['processes'] > 1:
+            # Children must not share the parent's database sockets.
+            connections.close_all()
+            context = multiprocessing.get_context('fork')
+            children = [context.Process(target=self.run_worker, args=(options,)) for _ in range(options['processes'])]
+            for child in children:
+                child.start()
+            for child in children:
+                child.join()
+            return
+
+        stats = self.run_worker(options)
+        self.stdout.write(self.style.SUCCESS(
+            f"Jobs succeeded: {stats['succeeded']}, retried: {stats['retried']}, failed: {stats['failed']}."
+        ))
+
+    def run_worker(self, options):
+        worker = Worker(options['concurrency'], options['batch_size'], options['poll_interval'])
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: worker.stop())
+        return worker.run(once=options['once'])
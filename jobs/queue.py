@@ -0,0 +1,43 @@
+"""
+Registering and enqueuing background jobs.
+
+    @job(max_attempts=3)
+    def send_reminder(task_id):
+        ...
+
+    send_reminder.delay(task.id)
+
+delay() inserts a Job row on the current database connection, so a job
+enqueued inside a view's transaction only becomes visible to workers if
+that transaction commits. Arguments must be JSON-serialisable; pass ids
+rather than model instances. Put @job functions in an app's jobs.py so
+workers find them (see JobsConfig.ready).
+"""
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Job
+
+registry = {}
+
+
+def job(max_attempts=None):
+    """Register a function as a job and give it a ``delay()`` method."""
+    def decorator(func):
+        name = f'{func.__module__}.{func.__qualname__}'
+        func.job_name = name
+        func.max_attempts = max_attempts or settings.JOBS['MAX_ATTEMPTS']
+        func.delay = lambda *args, **kwargs: enqueue(func, args, kwargs)
+        registry[name] = func
+        return func
+    return decorator
+
+
+def enqueue(func, args=(), kwargs=None, run_at=None):
+    if settings.JOBS['ALWAYS_EAGER']:
+        func(*args, **(kwargs or {}))
+        return None
+    return Job.objects.create(
+        name=func.job_name, args=list(args), kwargs=kwargs or {},
+        max_attempts=func.max_attempts, run_at=run_at or timezone.now(),
+    )
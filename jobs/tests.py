@@ -0,0 +1,94 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from jobs.models import Job
+from jobs.queue import enqueue, job
+from jobs.worker import Worker
+
+calls = []
+
+
+@job(max_attempts=2)
+def remember(value):
+    calls.append(value)
+
+
+@job(max_attempts=2)
+def explode():
+    raise ValueError('boom')
+
+
+class JobQueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_enqueue_and_run(self):
+        remember.delay('a')
+        remember.delay(value='b')
+        self.assertEqual(Job.objects.filter(status=Job.PENDING).count(), 2)
+
+        worker = Worker(concurrency=1)
+        self.assertEqual(worker.run_pending(), 2)
+        self.assertEqual(calls, ['a', 'b'])
+        self.assertFalse(Job.objects.exists())
+        self.assertEqual(worker.stats['succeeded'], 2)
+
+    def test_future_jobs_wait(self):
+        enqueue(remember, ['later'], run_at=timezone.now() + timedelta(minutes=5))
+        self.assertEqual(Worker().run_pending(), 0)
+        self.assertEqual(calls, [])
+
+    def test_claim_skips_claimed_jobs(self):
+        for i in range(3):
+            remember.delay(i)
+        first, second = Worker(), Worker()
+        claimed = first.claim(2)
+        self.assertEqual([job.args for job in claimed], [[0], [1]])
+        self.assertEqual([job.args for job in second.claim(5)], [[2]])
+        self.assertEqual(second.claim(5), [])
+
+    def test_retry_with_backoff_then_fail(self):
+        explode.delay()
+        worker = Worker()
+        worker.run_pending()
+        failed = Job.objects.get()
+        self.assertEqual((failed.status, failed.attempts), (Job.PENDING, 1))
+        self.assertGreater(failed.run_at, timezone.now())
+        self.assertIn('ValueError: boom', failed.last_error)
+
+        Job.objects.update(run_at=timezone.now())
+        worker.run_pending()
+        failed.refresh_from_db()
+        self.assertEqual((failed.status, failed.attempts), (Job.FAILED, 2))
+        self.assertEqual(worker.stats, {'succeeded': 0, 'retried': 1, 'failed': 1})
+
+    def test_unknown_job_fails(self):
+        Job.objects.create(name='nowhere.gone', max_attempts=1)
+        Worker().run_pending()
+        self.assertIn('No job registered as nowhere.gone', Job.objects.get().last_error)
+
+    def test_requeue_stale(self):
+        remember.delay('stale')
+        Worker().claim(1)
+        Job.objects.update(locked_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(Worker().requeue_stale(), 1)
+        self.assertEqual(Job.objects.get().status, Job.PENDING)
+
+    @override_settings(JOBS={**settings.JOBS, 'ALWAYS_EAGER': True})
+    def test_always_eager(self):
+        self.assertIsNone(remember.delay('now'))
+        self.assertEqual(calls, ['now'])
+
+
+class LoginJobTests(APITestCase):
+    def test_login_queues_nothing(self):
+        User.objects.create_user(username='jobuser', password='testpassword')
+        response = self.client.post(reverse('login'), {'username': 'jobuser', 'password': 'testpassword'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Job.objects.exists())
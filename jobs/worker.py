@@ -0,0 +1,159 @@
+"""
+Runs queued Job rows; driven by ``manage.py run_worker``.
+
+A worker claims due jobs in batches with SELECT ... FOR UPDATE SKIP LOCKED,
+so any number of worker processes can share the table without handing out
+a job twice, and runs them on a thread pool. On SQLite, which has no row
+locks, a single UPDATE ... WHERE id IN (SELECT ... LIMIT n) claims them.
+
+A job that raises is retried after an exponential backoff until it has used
+max_attempts; a job left 'running' by a worker that died is put back once
+its lock is older than JOBS['LOCK_TIMEOUT_SECONDS'].
+"""
+import logging
+import os
+import random
+import socket
+import threading
+import traceback
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+from .queue import registry
+
+logger = logging.getLogger('myapp')
+
+
+def backoff(attempts):
+    """Seconds to wait before retry number ``attempts``, with +/-20% jitter."""
+    config = settings.JOBS
+    delay = min(config['BACKOFF_SECONDS'] * 2 ** (attempts - 1), config['MAX_BACKOFF_SECONDS'])
+    return delay * random.uniform(0.8, 1.2)
+
+
+class Worker:
+    def __init__(self, concurrency=4, batch_size=None, poll_interval=1.0):
+        self.concurrency = concurrency
+        self.batch_size = batch_size or concurrency * 2
+        self.poll_interval = poll_interval
+        self.worker_id = f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'[-64:]
+        self.stats = {'succeeded': 0, 'retried': 0, 'failed': 0}
+        self._stats_lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def stop(self):
+        """Stop claiming jobs; run() returns once the running ones finish."""
+        self._stop.set()
+
+    def claim(self, limit):
+        now = timezone.now()
+        due = Job.objects.filter(status=Job.PENDING, run_at__lte=now).order_by('run_at', 'id')
+        claim = dict(status=Job.RUNNING, locked_by=self.worker_id, locked_at=now, attempts=F('attempts') + 1)
+        if connection.features.has_select_for_update_skip_locked:
+            with transaction.atomic():
+                ids = list(due.select_for_update(skip_locked=True).values_list('id', flat=True)[:limit])
+                if not ids:
+                    return []
+                Job.objects.filter(id__in=ids).update(**claim)
+        else:
+            # One UPDATE ... WHERE id IN (SELECT ... LIMIT n) statement, since
+            # SQLite cannot upgrade a read transaction to a write under load.
+            if not Job.objects.filter(id__in=due.values('id')[:limit]).update(**claim):
+                return []
+        return list(Job.objects.filter(status=Job.RUNNING, locked_by=self.worker_id, locked_at=now).order_by('run_at', 'id'))
+
+    def requeue_stale(self):
+        """Put back jobs whose worker died mid-run; the lost run counts as an attempt."""
+        now = timezone.now()
+        stale = Job.objects.filter(status=Job.RUNNING, locked_at__lt=now - timedelta(seconds=settings.JOBS['LOCK_TIMEOUT_SECONDS']))
+        stale.filter(attempts__gte=F('max_attempts')).update(
+            status=Job.FAILED, finished_at=now, last_error='Worker lost while running the job.',
+        )
+        return stale.update(status=Job.PENDING, locked_by='', locked_at=None, run_at=now)
+
+    def run_job(self, job):
+        close_old_connections()
+        try:
+            func = registry.get(job.name)
+            if func is None:
+                raise LookupError(f'No job registered as {job.name}')
+            func(*job.args, **job.kwargs)
+        except Exception:
+            self.record_failure(job, traceback.format_exc())
+        else:
+            self.record_success(job)
+        finally:
+            close_old_connections()
+
+    def record_success(self, job):
+        mine = Job.objects.filter(id=job.id, locked_by=self.worker_id)
+        if settings.JOBS['KEEP_DONE']:
+            mine.update(status=Job.DONE, finished_at=timezone.now(), locked_by='')
+        else:
+            mine.delete()
+        self._count('succeeded')
+
+    def record_failure(self, job, error):
+        now = timezone.now()
+        mine = Job.objects.filter(id=job.id, locked_by=self.worker_id)
+        if job.attempts >= job.max_attempts:
+            mine.update(status=Job.FAILED, finished_at=now, last_error=error, locked_by='')
+            logger.error('Job %s %s failed after %d attempts', job.id, job.name, job.attempts)
+            self._count('failed')
+        else:
+            retry_at = now + timedelta(seconds=backoff(job.attempts))
+            mine.update(status=Job.PENDING, run_at=retry_at, last_error=error, locked_by='', locked_at=None)
+            logger.warning('Job %s %s failed (attempt %d of %d), retrying at %s', job.id, job.name, job.attempts, job.max_attempts, retry_at)
+            self._count('retried')
+
+    def _count(self, outcome):
+        with self._stats_lock:
+            self.stats[outcome] += 1
+
+    def run_pending(self):
+        """Claim and run due jobs in this thread until none are left; returns how many ran."""
+        ran = 0
+        while jobs := self.claim(self.batch_size):
+            for job in jobs:
+                self.run_job(job)
+            ran += len(jobs)
+        return ran
+
+    def run(self, once=False):
+        """
+        Run jobs on ``concurrency`` threads, keeping up to ``batch_size``
+        claimed at a time, until stop() is called or, with ``once``, the
+        queue is empty.
+        """
+        self.requeue_stale()
+        in_flight = set()
+        with ThreadPoolExecutor(self.concurrency, thread_name_prefix='job') as executor:
+            while not self._stop.is_set():
+                capacity = self.batch_size - len(in_flight)
+                try:
+                    jobs = self.claim(capacity) if capacity > 0 else []
+                except DatabaseError:
+                    # E.g. the database restarting; keep running what we have and poll again.
+                    logger.exception('Could not claim jobs')
+                    jobs = []
+                    if once and not in_flight:
+                        raise
+                in_flight.update(executor.submit(self.run_job, job) for job in jobs)
+                if not in_flight:
+                    if once:
+                        break
+                    self._stop.wait(self.poll_interval)
+                    self.requeue_stale()
+                    continue
+                # With a full batch there is nothing to poll for until a slot frees up.
+                timeout = None if jobs and len(jobs) == capacity else self.poll_interval
+                _, in_flight = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+            wait(in_flight)
+        return self.stats
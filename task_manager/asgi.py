@@ -2,6 +2,9 @@
 ASGI config for task_manager project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Serve it with an ASGI server (e.g. uvicorn) for the async views under
+/async/tasks/, including the Server-Sent Events stream at
+/async/tasks/events/, which holds a connection open per subscriber.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
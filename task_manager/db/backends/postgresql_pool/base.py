@@ -0,0 +1,96 @@
+"""
+PostgreSQL backend that checks connections out of an in-process pool.
+
+Use it with CONN_MAX_AGE = 0: Django then "closes" the connection at the end
+of every request, which here hands it back to the pool instead of tearing
+down the TCP/TLS session. The pool is shared by all threads of a worker
+process and configured through a POOL entry in the DATABASES alias:
+
+    'POOL': {'MAX_SIZE': 10, 'TIMEOUT': 10, 'CHECK_AFTER': 30}
+"""
+import os
+import threading
+
+from django.db.backends.postgresql import base
+from psycopg2 import extensions
+
+from task_manager.db.pool import ConnectionPool
+
+POOL_DEFAULTS = {
+    'MAX_SIZE': 10,
+    'TIMEOUT': 10.0,
+    # Idle connections older than this are pinged with SELECT 1 on checkout.
+    'CHECK_AFTER': 30.0,
+}
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _check(connection):
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1')
+    return True
+
+
+def _reset(connection):
+    # Roll back anything left open so the next user starts clean; connections
+    # in an unknown state (e.g. a dropped socket) are discarded.
+    if connection.closed:
+        return False
+    status = connection.info.transaction_status
+    if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+        return False
+    if status != extensions.TRANSACTION_STATUS_IDLE:
+        connection.rollback()
+    return True
+
+
+def get_pool(alias, conn_params, config, connect):
+    """Return this process's pool for ``alias`` and ``conn_params``."""
+    # Keyed by the connection parameters too, since the test runner points an
+    # alias at a different database, and by pid so forked workers never share
+    # sockets with their parent.
+    key = (os.getpid(), alias, tuple(sorted((name, str(value)) for name, value in conn_params.items())))
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            config = {**POOL_DEFAULTS, **config}
+            pool = _pools[key] = ConnectionPool(
+                connect,
+                max_size=config['MAX_SIZE'],
+                timeout=config['TIMEOUT'],
+                check=_check,
+                check_after=config['CHECK_AFTER'],
+                reset=_reset,
+            )
+        return pool
+
+
+def get_stats():
+    """Pool statistics for every pool in this process, keyed by alias."""
+    pid = os.getpid()
+    with _pools_lock:
+        pools = [(key[1], pool) for key, pool in _pools.items() if key[0] == pid]
+    stats = {}
+    for alias, pool in pools:
+        stats.setdefault(alias, []).append(pool.stats())
+    return {alias: entries[0] if len(entries) == 1 else entries for alias, entries in stats.items()}
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_new_connection(self, conn_params):
+        connect = super().get_new_connection
+        pool = get_pool(self.alias, conn_params, self.settings_dict.get('POOL', {}), lambda: connect(conn_params))
+        self.pool = pool
+        return pool.acquire()
+
+    def _close(self):
+        if self.connection is None:
+            return
+        with self.wrap_database_errors:
+            # Only ping after a database error; _reset covers the common cases.
+            if self.errors_occurred and not self.is_usable():
+                self.pool.discard(self.connection)
+            else:
+                self.pool.release(self.connection)
@@ -0,0 +1,133 @@
+import threading
+import time
+from collections import deque
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class ConnectionPool:
+    """
+    Bounded, thread-safe pool of DB-API connections.
+
+    ``connect`` opens a new connection, ``check`` (optional) tells whether an
+    idle one is still usable and ``reset`` (optional) prepares a returned one
+    for reuse, returning False if it should be discarded instead. At most
+    ``max_size`` connections exist at once; callers wait up to ``timeout``
+    seconds for one to come back before PoolTimeout is raised.
+    """
+
+    def __init__(self, connect, max_size=10, timeout=10.0, check=None, check_after=30.0, reset=None):
+        self.connect = connect
+        self.max_size = max_size
+        self.timeout = timeout
+        self.check = check
+        self.check_after = check_after
+        self.reset = reset
+        self._idle = deque()
+        self._size = 0
+        self._lock = threading.Condition()
+        self._stats = {
+            'checkouts': 0,
+            'waits': 0,
+            'wait_time': 0.0,
+            'max_wait_time': 0.0,
+            'timeouts': 0,
+            'connections_opened': 0,
+            'connections_discarded': 0,
+        }
+
+    def acquire(self):
+        started = time.perf_counter()
+        deadline = started + self.timeout
+        waited = False
+        while True:
+            with self._lock:
+                while not self._idle and self._size >= self.max_size:
+                    waited = True
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        self._stats['timeouts'] += 1
+                        raise PoolTimeout(f'No connection became available within {self.timeout}s (pool size {self.max_size}).')
+                    self._lock.wait(remaining)
+
+                if not self._idle:
+                    # Reserve the slot; the connection is opened outside the lock.
+                    self._size += 1
+                    break
+                connection, released_at = self._idle.pop()
+
+            wait = time.perf_counter() - started
+            if self._usable(connection, released_at):
+                self._record_checkout(wait, waited)
+                return connection
+            self._discard(connection)
+
+        wait = time.perf_counter() - started
+        try:
+            connection = self.connect()
+        except BaseException:
+            with self._lock:
+                self._size -= 1
+                self._lock.notify()
+            raise
+        self._record_checkout(wait, waited, opened=True)
+        return connection
+
+    def release(self, connection):
+        if self.reset is not None and not self.reset(connection):
+            self._discard(connection)
+            return
+        with self._lock:
+            self._idle.append((connection, time.monotonic()))
+            self._lock.notify()
+
+    def discard(self, connection):
+        """Close a checked-out connection instead of returning it."""
+        self._discard(connection)
+
+    def close_idle(self):
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+        for connection, _ in idle:
+            self._discard(connection)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['size'] = self._size
+            stats['idle'] = len(self._idle)
+            stats['in_use'] = self._size - len(self._idle)
+            stats['max_size'] = self.max_size
+        stats['wait_time'] = round(stats['wait_time'], 6)
+        stats['max_wait_time'] = round(stats['max_wait_time'], 6)
+        return stats
+
+    def _record_checkout(self, wait, waited, opened=False):
+        # wait only covers queueing for a slot, not opening or checking it.
+        with self._lock:
+            self._stats['checkouts'] += 1
+            self._stats['connections_opened'] += opened
+            if waited:
+                self._stats['waits'] += 1
+            self._stats['wait_time'] += wait
+            self._stats['max_wait_time'] = max(self._stats['max_wait_time'], wait)
+
+    def _usable(self, connection, released_at):
+        if self.check is None or time.monotonic() - released_at < self.check_after:
+            return True
+        try:
+            return self.check(connection)
+        except Exception:
+            return False
+
+    def _discard(self, connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+        with self._lock:
+            self._size -= 1
+            self._stats['connections_discarded'] += 1
+            self._lock.notify()
@@ -0,0 +1,103 @@
+"""
+Routing of reads to a read-replica database alias.
+
+Reads go to the REPLICA_DATABASE alias, when one is set, only inside views wrapped in read_from_replica, and
+only for a user who has not written recently: PrimaryPinMiddleware pins a
+user to the primary for REPLICA_PIN_SECONDS after any successful unsafe
+request, so they always read their own writes. Everything else, including
+all writes, reads inside a transaction and authentication lookups, stays on
+``default``.
+"""
+import contextvars
+from functools import wraps
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Apps whose reads always go to the primary: a token created at login must be
+# usable on the very next request.
+PRIMARY_ONLY_APPS = {'auth', 'authtoken', 'contenttypes', 'sessions', 'admin'}
+
+# Caches that only live inside one process: a pin set by the worker that
+# handled the write would not be seen by the others.
+PROCESS_LOCAL_CACHES = {
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+}
+
+_use_replica = contextvars.ContextVar('use_replica', default=False)
+
+
+def replica_configured():
+    return settings.REPLICA_DATABASE is not None
+
+
+@checks.register(checks.Tags.caches)
+def check_pin_cache(app_configs, **kwargs):
+    if not replica_configured():
+        return []
+    backend = settings.CACHES.get(settings.REPLICA_PIN_CACHE, {}).get('BACKEND')
+    if backend is None or backend in PROCESS_LOCAL_CACHES:
+        return [checks.Error(
+            f'REPLICA_PIN_CACHE {settings.REPLICA_PIN_CACHE!r} must be a cache shared by all workers.',
+            hint='Point it at a Redis, Memcached or database cache in CACHES.',
+            id='task_manager.E001',
+        )]
+    return []
+
+
+def _pin_cache():
+    return caches[settings.REPLICA_PIN_CACHE]
+
+
+def _pin_key(user_id):
+    return f'replica-pin:{user_id}'
+
+
+def pin_to_primary(user_id):
+    _pin_cache().set(_pin_key(user_id), True, settings.REPLICA_PIN_SECONDS)
+
+
+def is_pinned(user_id):
+    return _pin_cache().get(_pin_key(user_id)) is not None
+
+
+def read_from_replica(view):
+    """
+    Let a safe (GET/HEAD) view read from the replica, unless the user is
+    pinned to the primary. Goes below @api_view so request.user is the
+    authenticated user.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        user = getattr(request, 'user', None)
+        use_replica = (
+            replica_configured()
+            and request.method in ('GET', 'HEAD')
+            and not (user is not None and user.is_authenticated and is_pinned(user.id))
+        )
+        token = _use_replica.set(use_replica)
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            _use_replica.reset(token)
+    return wrapper
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if not _use_replica.get() or model._meta.app_label in PRIMARY_ONLY_APPS:
+            return DEFAULT_DB_ALIAS
+        # Reads that are part of a write transaction must see that transaction.
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return settings.REPLICA_DATABASE
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data.
+        return True
@@ -0,0 +1,154 @@
+"""
+Logging pieces that keep file I/O off the request thread.
+
+QueueHandler only puts records on an in-memory queue; a QueueListener thread
+formats them and appends them to a file. JSONFormatter emits one
+JSON object per line and RateLimitFilter thins out repetitive INFO/DEBUG
+messages. All three are wired up in settings.LOGGING.
+"""
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+
+# Attributes every LogRecord has; anything else was passed with extra=.
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'suppressed'}
+
+
+class QueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue records for a background thread that writes them to ``filename``.
+
+    Every worker process appends to the same file, so none of them rotates it:
+    rotate it with logrotate (or similar) by renaming it, and the writer
+    reopens ``filename`` when it sees the file has moved. The queue holds at
+    most ``queue_size`` records; when it is full new records are dropped and
+    counted in ``dropped`` rather than blocking the caller. The formatter set
+    on this handler is used by the writer thread.
+    """
+
+    def __init__(self, filename, queue_size=10000, encoding='utf-8'):
+        super().__init__(queue.Queue(queue_size))
+        self.target = logging.handlers.WatchedFileHandler(filename, encoding=encoding, delay=True)
+        self.dropped = 0
+        self.listener = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+        self._start()
+        atexit.register(self.close)
+
+    def _start(self):
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            # A forked worker inherits the handler but not the writer thread.
+            self.listener = logging.handlers.QueueListener(self.queue, self.target, respect_handler_level=True)
+            self.listener.start()
+            self._pid = os.getpid()
+
+    def setFormatter(self, fmt):
+        super().setFormatter(fmt)
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record):
+        # Formatting happens on the writer thread. Only the message is merged
+        # here, so later changes to the arguments cannot alter what is logged.
+        # Other handlers still see the record as it was logged.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def emit(self, record):
+        if self._pid != os.getpid():
+            self._start()
+        super().emit(record)
+
+    def flush(self):
+        """Block until every queued record has been written."""
+        if self.listener is not None and self.listener._thread is not None:
+            self.queue.join()
+        self.target.flush()
+
+    def close(self):
+        if self.listener is not None and self.listener._thread is not None and self._pid == os.getpid():
+            self.listener.stop()
+        self.target.close()
+        super().close()
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per record, including any extra= fields."""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'module': record.module,
+            'message': record.getMessage(),
+        }
+        if getattr(record, 'suppressed', 0):
+            entry['suppressed'] = record.suppressed
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exc_info'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Let through at most ``rate`` records per ``per`` seconds for each message
+    template (e.g. 'Task created successfully by user %s', whatever the user).
+
+    Only records at ``max_level`` or below are limited; warnings and errors
+    always pass. The next record let through carries a ``suppressed`` count
+    of how many were dropped before it.
+    """
+
+    max_keys = 10000
+
+    def __init__(self, rate=10, per=1.0, max_level='INFO'):
+        super().__init__()
+        self.rate = rate
+        self.per = per
+        self.max_level = logging.getLevelName(max_level) if isinstance(max_level, str) else max_level
+        self._windows = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno > self.max_level:
+            return True
+
+        key = (record.name, record.levelno, record.msg)
+        now = time.monotonic()
+        with self._lock:
+            if key not in self._windows and len(self._windows) >= self.max_keys:
+                # Messages built with f-strings never repeat; don't let them pile up.
+                self._windows.clear()
+            started, count, suppressed = self._windows.get(key, (now, 0, 0))
+            if now - started >= self.per:
+                started, count = now, 0
+            if count >= self.rate:
+                self._windows[key] = (started, count, suppressed + 1)
+                return False
+            self._windows[key] = (started, count + 1, 0)
+        if suppressed:
+            record.suppressed = suppressed
+        return True
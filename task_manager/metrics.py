@@ -0,0 +1,162 @@
+"""
+In-process request metrics, rendered in the Prometheus text format.
+
+MetricsMiddleware fills the histograms below for every view in
+settings.METRICS['VIEW_MODULES']. Each worker process keeps its own
+numbers, so scrape every worker (or sum them) for a full picture.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+SECONDS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def snapshot(self):
+        with self._lock:
+            return list(self.counts), self.sum, self.count
+
+
+class HistogramFamily:
+    """Histograms of one metric, one per label combination."""
+
+    def __init__(self, name, help_text, buckets, label_names):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self.label_names = label_names
+        self.children = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values):
+        child = self.children.get(values)
+        if child is None:
+            with self._lock:
+                child = self.children.setdefault(values, Histogram(self.buckets))
+        return child
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        for values, histogram in sorted(self.children.items()):
+            labels = ','.join(f'{name}="{_escape(value)}"' for name, value in zip(self.label_names, values))
+            counts, total, count = histogram.snapshot()
+            cumulative = 0
+            for bound, bucket_count in zip([*self.buckets, '+Inf'], counts):
+                cumulative += bucket_count
+                lines.append(f'{self.name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_sum{{{labels}}} {total}')
+            lines.append(f'{self.name}_count{{{labels}}} {count}')
+        return lines
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+REQUEST_LABELS = ('view', 'method')
+
+request_duration = HistogramFamily('http_request_duration_seconds', 'Wall time of the request.', SECONDS_BUCKETS, REQUEST_LABELS)
+db_queries = HistogramFamily('http_request_db_queries', 'SQL statements run per request.', QUERY_BUCKETS, REQUEST_LABELS)
+db_duration = HistogramFamily('http_request_db_duration_seconds', 'Time spent in SQL per request.', SECONDS_BUCKETS, REQUEST_LABELS)
+serialize_duration = HistogramFamily(
+    'http_request_serialize_duration_seconds', 'Time spent in serializers and rendering per request.', SECONDS_BUCKETS, REQUEST_LABELS,
+)
+response_size = HistogramFamily('http_response_size_bytes', 'Size of non-streaming response bodies.', SIZE_BUCKETS, REQUEST_LABELS)
+
+HISTOGRAMS = [request_duration, db_queries, db_duration, serialize_duration, response_size]
+
+# Callables returning extra (name, help, {labels tuple: value}) gauges, e.g.
+# connection pool or token cache statistics.
+collectors = []
+
+# (view, method) -> one child of each family in HISTOGRAMS, in that order.
+_request_histograms = {}
+
+
+class RequestMetrics:
+    __slots__ = ('view', 'method', 'queries', 'db_time', 'serialize_time', 'statements', 'keep_sql')
+
+    def __init__(self, view, method, keep_sql):
+        self.view = view
+        self.method = method
+        self.queries = 0
+        self.db_time = 0.0
+        self.serialize_time = 0.0
+        self.statements = [] if keep_sql else None
+
+    def __call__(self, execute, sql, params, many, context):
+        # connection.execute_wrapper hook.
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.queries += 1
+            self.db_time += elapsed
+            if self.statements is not None and len(self.statements) < 200:
+                self.statements.append((elapsed, sql))
+
+    def record(self, duration, size):
+        labels = (self.view, self.method)
+        histograms = _request_histograms.get(labels)
+        if histograms is None:
+            histograms = _request_histograms[labels] = tuple(family.labels(*labels) for family in HISTOGRAMS)
+        for histogram, value in zip(histograms, (duration, self.queries, self.db_time, self.serialize_time, size)):
+            if value is not None:
+                histogram.observe(value)
+
+
+current = ContextVar('request_metrics', default=None)
+
+
+@contextmanager
+def serializer_timer():
+    """Count the enclosed block as serializer time for the current request."""
+    metrics = current.get()
+    if metrics is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.serialize_time += time.perf_counter() - start
+
+
+def render():
+    lines = []
+    for family in HISTOGRAMS:
+        if family.children:
+            lines.extend(family.render())
+    for collector in collectors:
+        for name, help_text, samples in collector():
+            lines.extend([f'# HELP {name} {help_text}', f'# TYPE {name} gauge'])
+            for labels, value in sorted(samples.items()):
+                label_text = ','.join(f'{key}="{_escape(label)}"' for key, label in labels)
+                lines.append(f'{name}{{{label_text}}} {value}' if label_text else f'{name} {value}')
+    return '\n'.join(lines) + '\n'
+
+
+def reset():
+    _request_histograms.clear()
+    for family in HISTOGRAMS:
+        family.children.clear()
@@ -0,0 +1,174 @@
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from task_manager import metrics
+from task_manager.db.routers import pin_to_primary, replica_configured
+
+logger = logging.getLogger('myapp')
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+
+class PrimaryPinMiddleware:
+    """
+    Pin a user to the primary database for a short while after they write, so
+    their next reads are not served from a lagging replica.
+
+    Works in both modes, so under ASGI the async views and the event stream
+    are not moved onto a thread; only a successful write goes through
+    sync_to_async to set the pin.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        response = self.get_response(request)
+        if self.wrote(request, response):
+            self.pin(request)
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        if self.wrote(request, response):
+            await sync_to_async(self.pin)(request)
+        return response
+
+    @staticmethod
+    def wrote(request, response):
+        return replica_configured() and request.method not in SAFE_METHODS and response.status_code < 400
+
+    @staticmethod
+    def pin(request):
+        # DRF copies the token-authenticated user back onto the request.
+        user = getattr(request, 'user', AnonymousUser())
+        if user.is_authenticated:
+            pin_to_primary(user.id)
+
+
+class MetricsMiddleware:
+    """
+    Record wall time, SQL count and time, serializer time and response size
+    for views in settings.METRICS['VIEW_MODULES'] into task_manager.metrics,
+    and log the SQL of requests slower than SLOW_REQUEST_MS.
+
+    Goes last in MIDDLEWARE so process_view runs right before the view.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        config = settings.METRICS
+        if not config['ENABLED']:
+            raise MiddlewareNotUsed
+        self.view_modules = frozenset(config['VIEW_MODULES'])
+        self.slow_request_ms = config['SLOW_REQUEST_MS']
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+            # Django would run a sync process_view on a thread for every request.
+            self.process_view = self.aprocess_view
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            request_metrics = self.finish(request)
+        if request_metrics is not None:
+            self.record(request, response, request_metrics, time.perf_counter() - start)
+        return response
+
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            request_metrics = self.finish(request)
+        if request_metrics is not None:
+            self.record(request, response, request_metrics, time.perf_counter() - start)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request_metrics = self.begin(request, view_func)
+        if request_metrics is not None:
+            request._metrics_connections = self.wrap_connections(request_metrics)
+        return None
+
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        request_metrics = self.begin(request, view_func)
+        if request_metrics is not None:
+            # The async ORM runs queries on sync_to_async's thread, whose
+            # connections are not the ones seen from the event loop.
+            request._metrics_connections = await sync_to_async(self.wrap_connections)(request_metrics)
+        return None
+
+    def begin(self, request, view_func):
+        view = getattr(view_func, 'view_class', view_func)
+        if view.__module__ not in self.view_modules:
+            return None
+        request_metrics = metrics.RequestMetrics(f'{view.__module__}.{view.__name__}', request.method, self.slow_request_ms is not None)
+        request._metrics = request_metrics
+        request._metrics_token = metrics.current.set(request_metrics)
+        request._metrics_connections = []
+        return request_metrics
+
+    @staticmethod
+    def wrap_connections(request_metrics):
+        wrapped = [connections[alias] for alias in connections]
+        for connection in wrapped:
+            connection.execute_wrappers.append(request_metrics)
+        return wrapped
+
+    @staticmethod
+    def finish(request):
+        request_metrics = request.__dict__.pop('_metrics', None)
+        if request_metrics is not None:
+            metrics.current.reset(request.__dict__.pop('_metrics_token'))
+            for connection in request.__dict__.pop('_metrics_connections'):
+                connection.execute_wrappers.remove(request_metrics)
+        return request_metrics
+
+    def record(self, request, response, request_metrics, duration):
+        size = None if response.streaming else len(response.content)
+        request_metrics.record(duration, size)
+        if self.slow_request_ms is not None and duration * 1000 >= self.slow_request_ms:
+            self.log_slow_request(request, response, request_metrics, duration)
+
+    def process_template_response(self, request, response):
+        # DRF renders the response after the view returns; count that as
+        # serializer time too.
+        request_metrics = getattr(request, '_metrics', None)
+        if request_metrics is not None:
+            start = time.perf_counter()
+
+            def rendered(response):
+                request_metrics.serialize_time += time.perf_counter() - start
+
+            response.add_post_render_callback(rendered)
+        return response
+
+    def log_slow_request(self, request, response, request_metrics, duration):
+        statements = '\n'.join(f'  ({elapsed * 1000:.1f} ms) {sql}' for elapsed, sql in request_metrics.statements)
+        logger.warning(
+            'Slow request %s %s -> %s took %.1f ms (%d queries, %.1f ms SQL, %.1f ms serializing)\n%s',
+            request.method, request.get_full_path(), response.status_code, duration * 1000,
+            request_metrics.queries, request_metrics.db_time * 1000, request_metrics.serialize_time * 1000, statements,
+        )
@@ -41,11 +41,13 @@ INSTALLED_APPS = [
     'rest_framework',
     'rest_framework.authtoken',
     'tasks',
+    'users',
+    'jobs',
 ]
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework.authentication.TokenAuthentication',
+        'users.authentication.CachedTokenAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
@@ -54,7 +56,60 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 10,
 }
 
+# In-process token -> user cache used by CachedTokenAuthentication. Set
+# SHARED_CACHE to a CACHES alias to add a cross-process tier; with more than
+# one worker it is also what makes logout and deactivation take effect in
+# every worker at once rather than after TTL seconds.
+TOKEN_AUTH_CACHE = {
+    'MAX_SIZE': 10000,
+    'TTL': 30,
+    'SHARED_CACHE': None,
+    'SHARED_TTL': 300,
+}
+
+# Per-user cache of /tasks/list/ and /tasks/summary/ responses, keyed by the
+# user's task version so writes invalidate it. Set SHARED_CACHE to a CACHES
+# alias to share entries between processes.
+RESPONSE_CACHE = {
+    'MAX_SIZE': 10000,
+    'TTL': 10,
+    'SHARED_CACHE': None,
+    'SHARED_TTL': 10,
+}
+
+# /tasks/changes/ only returns rows last written at least this many seconds
+# ago, so a slow transaction cannot commit a change behind a client's token.
+# That holds for transactions that commit within this long of stamping
+# updated_at: the views stamp it after taking their row locks and write at
+# most MAX_BATCH_SIZE rows, and the importer restamps a chunk that ran past
+# half of it just before committing.
+TASK_CHANGES_SETTLE_SECONDS = 2
+
+# manage.py archive_tasks moves tasks soft-deleted longer than this into the
+# TaskArchive table, and purges archived tasks after TASK_PURGE_AFTER_DAYS
+# (None keeps them forever).
+TASK_ARCHIVE_AFTER_DAYS = 30
+TASK_PURGE_AFTER_DAYS = None
+TASK_ARCHIVE_BATCH_SIZE = 1000
+
+# manage.py run_reminders records a 'due_soon' reminder LEAD_MINUTES before a
+# pending task's due time and an 'overdue' one at the due time. Tasks are read
+# WINDOW_MINUTES ahead at a time; on startup, tasks that went overdue in the
+# last CATCH_UP_MINUTES still get their reminder.
+TASK_REMINDERS = {
+    'LEAD_MINUTES': 30,
+    'WINDOW_MINUTES': 10,
+    'CATCH_UP_MINUTES': 60,
+    'RESCAN_SECONDS': 60,
+    'BATCH_SIZE': 1000,
+}
 
+
+# Log records are queued on the request thread and appended to debug.log by a
+# background thread in each process (task_manager.log_handlers). The processes
+# share the file, so rotate it externally, e.g. with logrotate. LOG_FORMAT=json
+# switches to one JSON object per line. Repetitive 'myapp' INFO lines are
+# limited to 10 per second per message.
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
@@ -67,13 +122,23 @@ LOGGING = {
             'format': '%(levelname)s %(message)s',
             'style': '%',
         },
+        'json': {
+            '()': 'task_manager.log_handlers.JSONFormatter',
+        },
+    },
+    'filters': {
+        'rate_limit': {
+            '()': 'task_manager.log_handlers.RateLimitFilter',
+            'rate': 10,
+            'per': 1.0,
+        },
     },
     'handlers': {
         'file': {
             'level': 'DEBUG',
-            'class': 'logging.FileHandler',
+            'class': 'task_manager.log_handlers.QueueHandler',
             'filename': os.path.join(BASE_DIR, 'debug.log'),
-            'formatter': 'verbose',
+            'formatter': 'json' if os.environ.get('LOG_FORMAT') == 'json' else 'verbose',
         },
         # 'console': {
         #     'level': 'DEBUG',
@@ -91,6 +156,7 @@ LOGGING = {
             'handlers': ['file'],
             'level': 'DEBUG',
             'propagate': False,
+            'filters': ['rate_limit'],
         },
     },
 }
@@ -104,8 +170,19 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'task_manager.middleware.PrimaryPinMiddleware',
+    'task_manager.middleware.MetricsMiddleware',
 ]
 
+# Per-request timings for the views in VIEW_MODULES, served at /metrics/.
+# Requests slower than SLOW_REQUEST_MS are logged with their SQL; None turns
+# that off.
+METRICS = {
+    'ENABLED': os.environ.get('METRICS_ENABLED', 'true').lower() != 'false',
+    'VIEW_MODULES': ['tasks.views', 'tasks.async_views', 'users.views'],
+    'SLOW_REQUEST_MS': float(os.environ['SLOW_REQUEST_MS']) if os.environ.get('SLOW_REQUEST_MS') else 1000,
+}
+
 ROOT_URLCONF = 'task_manager.urls'
 
 TEMPLATES = [
@@ -141,6 +218,73 @@ DATABASES = {
     }
 }
 
+# DB_CONNECTION_MODE chooses how database connections are reused:
+#   direct     - a new connection for every request
+#   persistent - one connection per worker thread, kept for DB_CONN_MAX_AGE seconds
+#   pool       - a pool of up to DB_POOL_SIZE connections shared by a worker's
+#                threads (see task_manager.db.backends.postgresql_pool)
+DB_CONNECTION_MODE = os.environ.get('DB_CONNECTION_MODE', 'persistent')
+
+if DB_CONNECTION_MODE == 'persistent':
+    DATABASES['default']['CONN_MAX_AGE'] = int(os.environ.get('DB_CONN_MAX_AGE', 60))
+    DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+elif DB_CONNECTION_MODE == 'pool':
+    DATABASES['default']['ENGINE'] = 'task_manager.db.backends.postgresql_pool'
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    DATABASES['default']['POOL'] = {
+        'MAX_SIZE': int(os.environ.get('DB_POOL_SIZE', 10)),
+        'TIMEOUT': float(os.environ.get('DB_POOL_TIMEOUT', 10)),
+        'CHECK_AFTER': float(os.environ.get('DB_POOL_CHECK_AFTER', 30)),
+    }
+
+# Setting DB_REPLICA_HOST adds a 'replica' alias with the same credentials.
+# Views marked with task_manager.db.routers.read_from_replica read from
+# REPLICA_DATABASE, except for users who wrote within the last
+# REPLICA_PIN_SECONDS.
+REPLICA_DATABASE = None
+if os.environ.get('DB_REPLICA_HOST'):
+    REPLICA_DATABASE = 'replica'
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'HOST': os.environ['DB_REPLICA_HOST'],
+        'PORT': os.environ.get('DB_REPLICA_PORT', DATABASES['default']['PORT']),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['task_manager.db.routers.ReplicaRouter']
+REPLICA_PIN_SECONDS = 5
+# Cache holding the pins. It must be shared by all workers (e.g. Redis):
+# manage.py check fails when a replica is configured with a local-memory
+# pin cache.
+REPLICA_PIN_CACHE = 'default'
+
+
+# Server-Sent Events at /async/tasks/events/ (tasks.events). BROKER is
+# 'postgres' (LISTEN/NOTIFY, reaches every worker) or 'inprocess' (only the
+# writing process); None picks by database vendor. Streams buffer BUFFER_SIZE
+# events, send a heartbeat every HEARTBEAT_SECONDS and are closed after
+# MAX_STREAM_SECONDS for the client to reconnect.
+TASK_EVENTS = {
+    'BROKER': os.environ.get('TASK_EVENTS_BROKER') or None,
+    'CHANNEL': 'task_events',
+    'BUFFER_SIZE': 100,
+    'HEARTBEAT_SECONDS': 15,
+    'MAX_STREAM_SECONDS': 300,
+}
+
+
+# Background jobs (jobs app), run by `manage.py run_worker`. Failed jobs are
+# retried after BACKOFF_SECONDS, doubling up to MAX_BACKOFF_SECONDS, until
+# MAX_ATTEMPTS. ALWAYS_EAGER runs jobs inline instead of queueing them.
+JOBS = {
+    'ALWAYS_EAGER': False,
+    'MAX_ATTEMPTS': 5,
+    'BACKOFF_SECONDS': 10,
+    'MAX_BACKOFF_SECONDS': 3600,
+    'LOCK_TIMEOUT_SECONDS': 600,
+    'KEEP_DONE': False,
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
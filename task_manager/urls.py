@@ -16,9 +16,12 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include
+from .views import metrics_view
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('auth/', include('users.urls')),  # Include auth routes from tasks app
     path('tasks/', include('tasks.urls')),   # Include task routes
+    path('async/tasks/', include('tasks.async_urls')),  # Native async task routes for ASGI
+    path('metrics/', metrics_view, name='metrics'),  # Admin-only Prometheus metrics
 ]
@@ -0,0 +1,46 @@
+from django.conf import settings
+from django.http import HttpResponse
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+
+from task_manager import metrics
+from tasks.response_cache import get_stats as get_response_cache_stats
+from users.authentication import get_stats as get_token_cache_stats
+
+POOL_ENGINE = 'task_manager.db.backends.postgresql_pool'
+
+
+def token_cache_collector():
+    return [
+        (f'token_cache_{key}', f'Token authentication cache {key.replace("_", " ")}.', {(): value})
+        for key, value in get_token_cache_stats().items()
+    ]
+
+
+def response_cache_collector():
+    return [
+        (f'response_cache_{key}', f'Task list and summary response cache {key.replace("_", " ")}.', {(): value})
+        for key, value in get_response_cache_stats().items()
+    ]
+
+
+def pool_collector():
+    if not any(database['ENGINE'] == POOL_ENGINE for database in settings.DATABASES.values()):
+        return []
+    from task_manager.db.backends.postgresql_pool.base import get_stats
+
+    gauges = {}
+    for alias, stats in get_stats().items():
+        for index, pool_stats in enumerate(stats if isinstance(stats, list) else [stats]):
+            for key, value in pool_stats.items():
+                gauges.setdefault(key, {})[(('alias', alias), ('pool', str(index)))] = value
+    return [(f'db_pool_{key}', f'Connection pool {key.replace("_", " ")}.', samples) for key, samples in gauges.items()]
+
+
+metrics.collectors.extend([token_cache_collector, response_cache_collector, pool_collector])
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def metrics_view(request):
+    return HttpResponse(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
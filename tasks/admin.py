@@ -1,3 +1,73 @@
 from django.contrib import admin
+from django.db import transaction
 
-# Register your models here.
+from . import archive, counters
+from .models import ReminderEvent, Task, TaskArchive
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ['id', 'name', 'user', 'to_be_completed_time', 'completed', 'deleted']
+    list_filter = ['completed', 'deleted']
+    search_fields = ['name', 'user__username']
+    raw_id_fields = ['user']
+
+    # Admin writes bypass the task views, so they keep the counters, and the
+    # version behind list ETags and cached responses, up to date here.
+    def save_model(self, request, obj, form, change):
+        with transaction.atomic():
+            before = Task.objects.filter(pk=obj.pk).values_list('user_id', 'completed', 'deleted').first() if change else None
+            super().save_model(request, obj, form, change)
+            counters.record_state_changes([(before, (obj.user_id, obj.completed, obj.deleted))])
+
+    def delete_model(self, request, obj):
+        with transaction.atomic():
+            super().delete_model(request, obj)
+            counters.record_state_changes([((obj.user_id, obj.completed, obj.deleted), None)])
+
+    def delete_queryset(self, request, queryset):
+        with transaction.atomic():
+            states = list(queryset.values_list('user_id', 'completed', 'deleted'))
+            super().delete_queryset(request, queryset)
+            counters.record_state_changes([(state, None) for state in states])
+
+
+@admin.register(TaskArchive)
+class TaskArchiveAdmin(admin.ModelAdmin):
+    list_display = ['id', 'name', 'user', 'completed', 'deleted_at', 'archived_at']
+    list_filter = ['completed']
+    search_fields = ['name', 'user__username']
+    raw_id_fields = ['user']
+    actions = ['restore_tasks']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def delete_model(self, request, obj):
+        with transaction.atomic():
+            super().delete_model(request, obj)
+            counters.record_state_changes([((obj.user_id, obj.completed, True), None)])
+
+    def delete_queryset(self, request, queryset):
+        with transaction.atomic():
+            states = [(user_id, completed, True) for user_id, completed in queryset.values_list('user_id', 'completed')]
+            super().delete_queryset(request, queryset)
+            counters.record_state_changes([(state, None) for state in states])
+
+    @admin.action(description='Restore selected tasks')
+    def restore_tasks(self, request, queryset):
+        restored = 0
+        for archived in queryset:
+            archive.restore(archived)
+            restored += 1
+        self.message_user(request, f'Restored {restored} tasks.')
+
+
+@admin.register(ReminderEvent)
+class ReminderEventAdmin(admin.ModelAdmin):
+    list_display = ['id', 'task', 'kind', 'due_at', 'created_at']
+    list_filter = ['kind']
+    raw_id_fields = ['task']
@@ -0,0 +1,86 @@
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import counters
+from .models import Task, TaskArchive
+
+
+def archive_horizon(now=None):
+    """Tombstones deleted before this point may already have left the Task table."""
+    return (now or timezone.now()) - timedelta(days=settings.TASK_ARCHIVE_AFTER_DAYS)
+
+
+def archive_batch(cutoff, batch_size):
+    """
+    Move up to ``batch_size`` tasks soft-deleted before ``cutoff`` into
+    TaskArchive, returning how many were moved.
+
+    Each batch is its own short transaction, so the Task table is never locked
+    for long however large the backlog is. Counters are left alone: archived
+    tasks still count as deleted.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        tasks = list(
+            Task.objects.select_for_update(skip_locked=True)
+            .filter(deleted=True, deleted_at__lt=cutoff)
+            .order_by('id')[:batch_size]
+        )
+        if not tasks:
+            return 0
+        TaskArchive.objects.bulk_create([TaskArchive.from_task(task, now) for task in tasks])
+        Task.objects.filter(id__in=[task.id for task in tasks], deleted=True).delete()
+    return len(tasks)
+
+
+def purge_batch(cutoff, batch_size):
+    """Permanently delete up to ``batch_size`` tasks archived before ``cutoff``."""
+    with transaction.atomic():
+        rows = list(
+            TaskArchive.objects.select_for_update(skip_locked=True)
+            .filter(archived_at__lt=cutoff)
+            .order_by('id')
+            .values_list('id', 'user_id')[:batch_size]
+        )
+        if not rows:
+            return 0
+        TaskArchive.objects.filter(id__in=[task_id for task_id, _ in rows]).delete()
+        for user_id, purged in Counter(user_id for _, user_id in rows).items():
+            counters.record(user_id, deleted=-purged)
+    return len(rows)
+
+
+def run_batches(step, cutoff, batch_size, max_batches=None):
+    total = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        moved = step(cutoff, batch_size)
+        if not moved:
+            break
+        total += moved
+        batches += 1
+    return total
+
+
+def restore(archived):
+    """
+    Bring an archived task back into the Task table as a live task, under its
+    original id. Returns the restored Task.
+    """
+    with transaction.atomic():
+        archived = TaskArchive.objects.select_for_update().get(id=archived.id)
+        task = archived.to_task(deleted=False, deleted_at=None)
+        task.save(force_insert=True)
+        # created_at is auto_now_add, so the original value is put back afterwards.
+        Task.objects.filter(id=task.id).update(created_at=archived.created_at)
+        task.created_at = archived.created_at
+        archived.delete()
+        if task.completed:
+            counters.record(task.user_id, completed=1, deleted=-1)
+        else:
+            counters.record(task.user_id, opened=1, deleted=-1)
+    return task
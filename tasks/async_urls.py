@@ -0,0 +1,12 @@
+from django.urls import path
+from .async_views import create_task, get_task, update_task, mark_task_completed, soft_delete_task, list_tasks, task_events
+
+urlpatterns = [
+    path('create/', create_task, name='async_create_task'),
+    path('<int:task_id>/', get_task, name='async_get_task'),
+    path('update/<int:task_id>/', update_task, name='async_update_task'),
+    path('complete/<int:task_id>/', mark_task_completed, name='async_mark_task_completed'),
+    path('delete/<int:task_id>/', soft_delete_task, name='async_soft_delete_task'),
+    path('list/', list_tasks, name='async_list_tasks'),
+    path('events/', task_events, name='async_task_events'),
+]
@@ -0,0 +1,277 @@
+"""
+Native async versions of the task CRUD and list views, and the task event
+stream, mounted under /async/tasks/.
+
+DRF's @api_view is sync-only, so these are plain Django async views that
+return the same JSON as their counterparts in tasks.views. Reads use the
+async ORM directly. Writes that must commit together with the counter
+update run in one sync_to_async call, because Django 4.2 has no async
+transactions.
+"""
+import contextlib
+import json
+import logging
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from rest_framework import exceptions, status
+from rest_framework.pagination import _positive_int
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from users.authentication import CachedTokenAuthentication
+from . import counters, events
+from .models import Task, TaskArchive
+from .pagination import CustomPageNumberPagination
+from .serializers import TaskArchiveSerializer, TaskRowSerializer, TaskSerializer
+from .validation import validate_new_task, validate_task_update
+from .views import TASK_ORDERINGS, get_task_queryset, parse_fields, parse_list_params
+
+logger = logging.getLogger('myapp')
+
+authentication = CachedTokenAuthentication()
+
+
+def _response(data, status=status.HTTP_200_OK):
+    # DRF's encoder, so datetimes and decimals render exactly as in tasks.views.
+    return JsonResponse(data, status=status, encoder=JSONEncoder, safe=False)
+
+
+def async_api_view(methods):
+    """
+    Check the method and token for an async view, in place of @api_view and
+    IsAuthenticated. The authenticated user is set on ``request.user``.
+    """
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if request.method not in methods:
+                response = _response({'detail': f'Method "{request.method}" not allowed.'}, status.HTTP_405_METHOD_NOT_ALLOWED)
+                response['Allow'] = ', '.join(methods)
+                return response
+
+            try:
+                result = await authentication.aauthenticate(request)
+                if result is None:
+                    raise exceptions.NotAuthenticated()
+            except exceptions.APIException as exc:
+                response = _response({'detail': exc.detail}, status.HTTP_401_UNAUTHORIZED)
+                response['WWW-Authenticate'] = authentication.authenticate_header(request)
+                return response
+            request.user, request.auth = result
+            return await view(request, *args, **kwargs)
+
+        # Token-authenticated like the DRF views, so CSRF does not apply.
+        wrapper.csrf_exempt = True
+        return wrapper
+    return decorator
+
+
+def _load_json(request):
+    try:
+        return json.loads(request.body.decode('utf-8')), None
+    except ValueError:
+        return None, _response({'detail': 'JSON parse error.'}, status.HTTP_400_BAD_REQUEST)
+
+
+async def _get_task_for_error(task_id, user, fields=()):
+    row = await Task.objects.filter(id=task_id, deleted=False).values('user_id', *fields).afirst()
+    if row is None:
+        return _response({'error': 'Task not found'}, status.HTTP_404_NOT_FOUND), None
+    if row['user_id'] != user.id:
+        return _response({'error': 'You do not have permission to edit this task'}, status.HTTP_403_FORBIDDEN), None
+    return None, row
+
+
+@sync_to_async
+def _save(serializer, user, created=False):
+    with transaction.atomic():
+        task = serializer.save(user=user) if created else serializer.save()
+        counters.record(user.id, opened=1 if created else 0)
+        data = TaskSerializer(task).data
+        events.publish(user.id, 'created' if created else 'updated', task.id, task=data)
+    return data
+
+
+@async_api_view(['POST'])
+async def create_task(request):
+    data, error_response = _load_json(request)
+    if error_response is not None:
+        return error_response
+
+    error = validate_new_task(data)
+    if error:
+        return _response({'error': error}, status.HTTP_400_BAD_REQUEST)
+
+    serializer = TaskSerializer(data=data)
+    if not serializer.is_valid():
+        logger.error('Error creating task for user %s: %s', request.user.username, serializer.errors)
+        return _response(serializer.errors, status.HTTP_400_BAD_REQUEST)
+
+    data = await _save(serializer, request.user, created=True)
+    logger.info('Task created successfully by user %s', request.user.username)
+    return _response(data, status.HTTP_201_CREATED)
+
+
+@async_api_view(['GET'])
+async def get_task(request, task_id):
+    # Live tasks and tombstones come from Task, older tombstones from the archive.
+    task = await Task.objects.filter(id=task_id).afirst()
+    serializer_class = TaskSerializer
+    if task is None:
+        task = await TaskArchive.objects.filter(id=task_id).afirst()
+        serializer_class = TaskArchiveSerializer
+    if task is None:
+        return _response({'error': 'Task not found'}, status.HTTP_404_NOT_FOUND)
+    if task.user_id != request.user.id:
+        return _response({'error': 'You do not have permission to view this task'}, status.HTTP_403_FORBIDDEN)
+    data = serializer_class(task).data
+    data['archived'] = serializer_class is TaskArchiveSerializer
+    return _response(data)
+
+
+@async_api_view(['PUT'])
+async def update_task(request, task_id):
+    try:
+        task = await Task.objects.aget(id=task_id, deleted=False)
+    except Task.DoesNotExist:
+        return _response({'error': 'Task not found'}, status.HTTP_404_NOT_FOUND)
+
+    if task.user_id != request.user.id:
+        return _response({'error': 'You do not have permission to edit this task'}, status.HTTP_403_FORBIDDEN)
+
+    data, error_response = _load_json(request)
+    if error_response is not None:
+        return error_response
+
+    error = validate_task_update(data)
+    if error:
+        return _response({'error': error}, status.HTTP_400_BAD_REQUEST)
+
+    serializer = TaskSerializer(task, data=data, partial=True)
+    if not serializer.is_valid():
+        logger.error('Error updating task for user %s: %s', request.user.username, serializer.errors)
+        return _response(serializer.errors, status.HTTP_400_BAD_REQUEST)
+
+    data = await _save(serializer, request.user)
+    logger.info('Task updated successfully by user %s', request.user.username)
+    return _response(data)
+
+
+@sync_to_async
+def _complete(task_id, user, completion_time):
+    with transaction.atomic():
+        completed = Task.objects.filter(id=task_id, user=user, deleted=False, completed=False).update(
+            completed=True, completion_time=completion_time, updated_at=completion_time,
+            sort_priority=0, sort_time=completion_time,
+        )
+        if completed:
+            counters.record(user.id, opened=-1, completed=1)
+            events.publish(user.id, 'completed', task_id, completion_time=completion_time)
+    return completed
+
+
+@async_api_view(['POST'])
+async def mark_task_completed(request, task_id):
+    completion_time = timezone.now()
+    if not await _complete(task_id, request.user, completion_time):
+        error_response, task = await _get_task_for_error(task_id, request.user, fields=['completion_time'])
+        if error_response is not None:
+            return error_response
+        return _response({'message': 'Task is already completed', 'completion_time': task['completion_time']})
+
+    logger.info('Task marked as completed by user %s', request.user.username)
+    return _response({'message': 'Task marked as completed', 'completion_time': completion_time})
+
+
+@sync_to_async
+def _soft_delete(task_id, user, deleted_at):
+    changes = dict(deleted=True, deleted_at=deleted_at, updated_at=deleted_at)
+    task = Task.objects.filter(id=task_id, user=user, deleted=False)
+    with transaction.atomic():
+        if task.filter(completed=False).update(**changes):
+            counters.record(user.id, opened=-1, deleted=1)
+        elif task.filter(completed=True).update(**changes):
+            counters.record(user.id, completed=-1, deleted=1)
+        else:
+            return False
+        events.publish(user.id, 'deleted', task_id, deleted_at=deleted_at)
+    return True
+
+
+@async_api_view(['DELETE'])
+async def soft_delete_task(request, task_id):
+    if not await _soft_delete(task_id, request.user, timezone.now()):
+        error_response, _ = await _get_task_for_error(task_id, request.user)
+        return error_response
+
+    logger.info('Task soft-deleted by user %s', request.user.username)
+    return _response({'message': 'Task marked as deleted'})
+
+
+@async_api_view(['GET'])
+async def list_tasks(request):
+    # Page-number pagination only; cursor pages and conditional GETs are
+    # served by the sync list_tasks.
+    params, error = parse_list_params(request.GET)
+    if error:
+        return _response({'error': error}, status.HTTP_400_BAD_REQUEST)
+    fields, error = parse_fields(request.GET)
+    if error:
+        return _response({'error': error}, status.HTTP_400_BAD_REQUEST)
+
+    page_size = 5
+    with contextlib.suppress(KeyError, ValueError):
+        page_size = _positive_int(request.GET['page_size'], strict=True, cutoff=CustomPageNumberPagination.max_page_size)
+    try:
+        page = int(request.GET.get('page', 1))
+    except ValueError:
+        page = 0
+
+    tasks = get_task_queryset(request.user, **params)
+    count = await tasks.acount()
+    if page < 1 or (page - 1) * page_size >= max(count, 1):
+        return _response({'detail': 'Invalid page.'}, status.HTTP_404_NOT_FOUND)
+
+    sort_columns = [field.lstrip('-') for field in TASK_ORDERINGS[params['sort_by']]]
+    rows = tasks.values(*dict.fromkeys(TaskRowSerializer.columns_for(fields) + sort_columns))
+    start = (page - 1) * page_size
+    results = [row async for row in rows[start:start + page_size]]
+
+    url = request.build_absolute_uri()
+    next_url = replace_query_param(url, 'page', page + 1) if start + page_size < count else None
+    if page == 1:
+        previous_url = None
+    elif page == 2:
+        previous_url = remove_query_param(url, 'page')
+    else:
+        previous_url = replace_query_param(url, 'page', page - 1)
+
+    return _response({
+        'count': count,
+        'next': next_url,
+        'previous': previous_url,
+        'results': TaskRowSerializer(results, fields=fields).data,
+    })
+
+
+@async_api_view(['GET'])
+async def task_events(request):
+    """
+    Server-Sent Events stream of the user's task.created, task.updated,
+    task.completed and task.deleted events; see tasks.events. Needs an ASGI
+    server, since the response never finishes on its own.
+    """
+    config = settings.TASK_EVENTS
+    response = StreamingHttpResponse(
+        events.stream(request.user.id, config['BUFFER_SIZE'], config['HEARTBEAT_SECONDS'], config['MAX_STREAM_SECONDS']),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx from buffering the stream.
+    response['X-Accel-Buffering'] = 'no'
+    return response
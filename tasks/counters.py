@@ -0,0 +1,119 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from .models import Task, TaskArchive, TaskCounter
+
+
+def count_tasks(user_id):
+    """Count a user's tasks straight from the Task and TaskArchive tables."""
+    counts = Task.objects.filter(user_id=user_id).aggregate(
+        open_count=Count('id', filter=Q(deleted=False, completed=False)),
+        completed_count=Count('id', filter=Q(deleted=False, completed=True)),
+        deleted_count=Count('id', filter=Q(deleted=True)),
+    )
+    counts['deleted_count'] += TaskArchive.objects.filter(user_id=user_id).count()
+    return counts
+
+
+def record(user_id, opened=0, completed=0, deleted=0):
+    """
+    Apply count deltas for a write that has just been made to ``user_id``'s tasks.
+
+    Call this inside the transaction of every task write, including ones that
+    leave the counts unchanged, since it also bumps the user's version. A user
+    without a counter row yet gets one built from the Task table, which
+    already includes the write.
+    """
+    now = timezone.now()
+    changes = dict(
+        open_count=F('open_count') + opened,
+        completed_count=F('completed_count') + completed,
+        deleted_count=F('deleted_count') + deleted,
+        version=F('version') + 1,
+        updated_at=now,
+    )
+    if TaskCounter.objects.filter(user_id=user_id).update(**changes):
+        return
+
+    try:
+        with transaction.atomic():
+            TaskCounter.objects.create(user_id=user_id, version=1, **count_tasks(user_id))
+    except IntegrityError:
+        # A concurrent write created the row first; its counts cannot include
+        # our uncommitted write, so apply the deltas on top.
+        TaskCounter.objects.filter(user_id=user_id).update(**changes)
+
+
+def record_state_changes(changes):
+    """
+    Record writes made outside the task views, such as admin edits.
+
+    ``changes`` holds (before, after) pairs, each a (user_id, completed,
+    deleted) tuple, or None where the task did not exist. Every user involved
+    gets one record() call, so their version moves even when no count does.
+    """
+    deltas = {}
+    for before, after in changes:
+        for state, sign in ((before, -1), (after, 1)):
+            if state is None:
+                continue
+            user_id, completed, deleted = state
+            name = 'deleted' if deleted else 'completed' if completed else 'opened'
+            user_deltas = deltas.setdefault(user_id, {})
+            user_deltas[name] = user_deltas.get(name, 0) + sign
+    for user_id, user_deltas in deltas.items():
+        record(user_id, **user_deltas)
+
+
+def get_counter(user_id):
+    counter = TaskCounter.objects.filter(user_id=user_id).first()
+    if counter is None:
+        # Read back inside the transaction, so it comes from the database
+        # that was just written to even when reads go to a replica.
+        with transaction.atomic():
+            record(user_id)
+            counter = TaskCounter.objects.get(user_id=user_id)
+    return counter
+
+
+def count_delayed(user_id, now=None):
+    # A range scan on the (user, completed, to_be_completed_time) partial index,
+    # so the cost grows with the number of overdue tasks, not all pending ones.
+    now = now or timezone.now()
+    return Task.objects.filter(user_id=user_id, deleted=False, completed=False, to_be_completed_time__lt=now).count()
+
+
+def get_validators(user_id, now=None):
+    """
+    Return (version, last_modified) describing the current state of a user's tasks.
+
+    The version changes with every write. Statuses also change without writes,
+    when a pending task passes its due time. The latest due time already
+    passed by an open task moves exactly when that happens. It is a single
+    probe of the (user, completed, to_be_completed_time) index, and
+    last_modified is the later of it and the last write.
+    """
+    now = now or timezone.now()
+    counter = TaskCounter.objects.filter(user_id=user_id).values('version', 'updated_at').first()
+    last_flip = (
+        Task.objects.filter(user_id=user_id, deleted=False, completed=False, to_be_completed_time__lt=now)
+        .order_by('-to_be_completed_time')
+        .values_list('to_be_completed_time', flat=True)
+        .first()
+    )
+    version = f"{counter['version'] if counter else 0}-{last_flip.timestamp() if last_flip else 0}"
+    last_modified = max(filter(None, [counter and counter['updated_at'], last_flip]), default=None)
+    return version, last_modified
+
+
+def get_summary(user_id, now=None):
+    counter = get_counter(user_id)
+    delayed = count_delayed(user_id, now)
+    return {
+        'total': counter.open_count + counter.completed_count,
+        'pending': counter.open_count - delayed,
+        'delayed': delayed,
+        'completed': counter.completed_count,
+        'deleted': counter.deleted_count,
+    }
@@ -0,0 +1,247 @@
+"""
+Task change events for the Server-Sent Events stream at /async/tasks/events/.
+
+Write views call publish() inside their transaction. Every ASGI worker keeps
+a broker holding the open streams of each user. The PostgreSQL broker sends
+events through NOTIFY, so they reach every worker and only once the write
+commits; a background thread per worker LISTENs and hands them to the local
+streams. The in-process broker delivers on commit to streams in the same
+process only, which is what tests and single-process servers use.
+
+Each stream buffers at most TASK_EVENTS['BUFFER_SIZE'] events. A client
+that falls further behind gets a single ``resync`` event in place of what
+was dropped and should refetch from /tasks/changes/.
+"""
+import asyncio
+import json
+import logging
+import os
+import select
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.db import connections, transaction
+from rest_framework.utils.encoders import JSONEncoder
+
+from .serializers import SUMMARY_FIELDS
+
+logger = logging.getLogger('myapp')
+
+RESYNC = {'type': 'resync'}
+# Milliseconds EventSource waits before reconnecting after a stream ends.
+RETRY_MS = 3000
+
+
+class Subscription:
+    """One open stream: a bounded buffer owned by the stream's event loop."""
+
+    # A bare future per wait instead of asyncio.Event plus wait_for keeps an
+    # idle stream down to a few small objects.
+    __slots__ = ('user_id', 'loop', 'events', 'waiter', 'buffer_size', 'dropped')
+
+    def __init__(self, user_id, buffer_size, loop):
+        self.user_id = user_id
+        self.loop = loop
+        self.events = deque()
+        self.waiter = None
+        self.buffer_size = buffer_size
+        self.dropped = 0
+
+    def put(self, event):
+        # Runs on self.loop; other threads go through call_soon_threadsafe.
+        if len(self.events) >= self.buffer_size:
+            self.dropped += len(self.events)
+            self.events.clear()
+            event = RESYNC
+        self.events.append(event)
+        _wake(self.waiter)
+
+    async def get(self, timeout):
+        """Wait up to ``timeout`` seconds and return the buffered events."""
+        if not self.events:
+            self.waiter = self.loop.create_future()
+            timer = self.loop.call_later(timeout, _wake, self.waiter)
+            try:
+                await self.waiter
+            finally:
+                timer.cancel()
+                self.waiter = None
+        events = list(self.events)
+        self.events.clear()
+        return events
+
+
+def _wake(waiter):
+    if waiter is not None and not waiter.done():
+        waiter.set_result(None)
+
+
+class Broker:
+    """Routes published events to this process's subscriptions."""
+
+    def __init__(self):
+        self.subscriptions = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id, buffer_size, loop=None):
+        subscription = Subscription(user_id, buffer_size, loop or asyncio.get_running_loop())
+        with self._lock:
+            self.subscriptions.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self.subscriptions.get(subscription.user_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self.subscriptions[subscription.user_id]
+
+    def deliver(self, user_id, event):
+        with self._lock:
+            subscriptions = list(self.subscriptions.get(user_id, ()))
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.put, event)
+            except RuntimeError:
+                # The stream's loop has shut down without unsubscribing.
+                self.unsubscribe(subscription)
+
+    def publish(self, user_id, event):
+        transaction.on_commit(lambda: self.deliver(user_id, event))
+
+    def stats(self):
+        with self._lock:
+            return {'users': len(self.subscriptions), 'streams': sum(len(subs) for subs in self.subscriptions.values())}
+
+
+class PostgresBroker(Broker):
+    """Fans events out to every worker through LISTEN/NOTIFY on ``channel``."""
+
+    def __init__(self, channel, alias='default'):
+        super().__init__()
+        self.channel = channel
+        self.alias = alias
+        self._pid = None
+        self._start_lock = threading.Lock()
+
+    def publish(self, user_id, event):
+        # NOTIFY is transactional: listeners only see it once the write commits.
+        payload = json.dumps({'user_id': user_id, 'event': event}, cls=JSONEncoder)
+        with connections[self.alias].cursor() as cursor:
+            cursor.execute('SELECT pg_notify(%s, %s)', [self.channel, payload])
+
+    def subscribe(self, user_id, buffer_size, loop=None):
+        if self._pid != os.getpid():
+            self.start()
+        return super().subscribe(user_id, buffer_size, loop)
+
+    def start(self):
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            # Connection parameters are read here, where Django's connection
+            # handler is usable, rather than on the listener thread.
+            params = connections[self.alias].get_connection_params()
+            thread = threading.Thread(target=self.listen, args=(params,), name='task-events-listener', daemon=True)
+            thread.start()
+            self._pid = os.getpid()
+
+    def listen(self, params):
+        import psycopg2
+
+        delay = 1
+        reconnecting = False
+        while True:
+            connection = None
+            try:
+                connection = psycopg2.connect(**params)
+                connection.autocommit = True
+                with connection.cursor() as cursor:
+                    cursor.execute(f'LISTEN "{self.channel}"')
+                if reconnecting:
+                    # Anything sent while we were disconnected is lost.
+                    self.resync_all()
+                delay = 1
+                while True:
+                    if select.select([connection], [], [], 60) == ([], [], []):
+                        continue
+                    connection.poll()
+                    while connection.notifies:
+                        message = json.loads(connection.notifies.pop(0).payload)
+                        self.deliver(message['user_id'], message['event'])
+            except Exception:
+                logger.exception('Task event listener lost its connection; retrying in %s s', delay)
+                if connection is not None:
+                    connection.close()
+                reconnecting = True
+                time.sleep(delay)
+                delay = min(delay * 2, 30)
+
+    def resync_all(self):
+        with self._lock:
+            user_ids = list(self.subscriptions)
+        for user_id in user_ids:
+            self.deliver(user_id, RESYNC)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    """This process's broker, per TASK_EVENTS['BROKER'] (default: by database vendor)."""
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                config = settings.TASK_EVENTS
+                kind = config['BROKER'] or ('postgres' if connections['default'].vendor == 'postgresql' else 'inprocess')
+                _broker = PostgresBroker(config['CHANNEL']) if kind == 'postgres' else Broker()
+    return _broker
+
+
+def publish(user_id, event_type, task_id, task=None, **data):
+    """
+    Queue a ``task.<event_type>`` event for the user's open streams. Call it
+    inside the write's transaction. ``task`` is trimmed to SUMMARY_FIELDS to
+    keep events, and NOTIFY payloads, small.
+    """
+    event = {'type': f'task.{event_type}', 'id': task_id, **data}
+    if task is not None:
+        event['task'] = {name: task[name] for name in SUMMARY_FIELDS}
+    get_broker().publish(user_id, event)
+
+
+def publish_resync(user_id):
+    """Tell the user's streams to refetch, e.g. after a bulk write."""
+    get_broker().publish(user_id, RESYNC)
+
+
+def format_event(event):
+    return f'event: {event["type"]}\ndata: {json.dumps(event, cls=JSONEncoder)}\n\n'
+
+
+async def stream(user_id, buffer_size, heartbeat, max_seconds):
+    """
+    Yield SSE frames for ``user_id`` with a comment line every ``heartbeat``
+    idle seconds. The stream ends after ``max_seconds`` and the client
+    reconnects, so streams of clients that vanished without the server
+    noticing are not kept forever.
+    """
+    broker = get_broker()
+    subscription = broker.subscribe(user_id, buffer_size)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + max_seconds
+    try:
+        yield f'retry: {RETRY_MS}\n\n'
+        while (remaining := deadline - loop.time()) > 0:
+            events = await subscription.get(min(heartbeat, remaining))
+            if not events:
+                yield ': heartbeat\n\n'
+            for event in events:
+                yield format_event(event)
+    finally:
+        broker.unsubscribe(subscription)
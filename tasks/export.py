@@ -0,0 +1,79 @@
+import csv
+import json
+import zlib
+
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from .serializers import TaskRowSerializer
+
+CHUNK_SIZE = 2000
+
+# output -> (content type, file extension)
+FORMATS = {
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'csv': ('text/csv; charset=utf-8', 'csv'),
+}
+
+
+class _Echo:
+    """File-like object for csv.writer that hands each line straight back."""
+
+    def write(self, value):
+        return value
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    return value
+
+
+def _iter_lines(rows, output):
+    serializer = TaskRowSerializer(None)
+    if output == 'csv':
+        writer = csv.writer(_Echo())
+        fields = [name for name, _ in serializer.converters]
+        yield writer.writerow(fields)
+        for row in rows:
+            data = serializer.to_representation(row)
+            yield writer.writerow([_csv_value(data[name]) for name in fields])
+    else:
+        # Same compact, non-ASCII-escaping encoding as DRF's JSONRenderer.
+        for row in rows:
+            yield json.dumps(serializer.to_representation(row), ensure_ascii=False, separators=(',', ':')) + '\n'
+
+
+def iter_export(rows, output, compress=False):
+    """Yield the encoded export in chunks of up to CHUNK_SIZE rows."""
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS) if compress else None
+    batch = []
+    for line in _iter_lines(rows, output):
+        batch.append(line)
+        if len(batch) >= CHUNK_SIZE:
+            chunk = ''.join(batch).encode('utf-8')
+            batch = []
+            if compressor is not None:
+                chunk = compressor.compress(chunk)
+            if chunk:
+                yield chunk
+
+    chunk = ''.join(batch).encode('utf-8')
+    if compressor is not None:
+        chunk = compressor.compress(chunk) + compressor.flush()
+    if chunk:
+        yield chunk
+
+
+def streaming_response(rows, output, compress=False):
+    content_type, extension = FORMATS[output]
+    filename = f"tasks-{timezone.localdate():%Y%m%d}.{extension}"
+    if compress:
+        content_type = 'application/gzip'
+        filename += '.gz'
+
+    response = StreamingHttpResponse(iter_export(rows, output, compress), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
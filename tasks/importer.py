@@ -0,0 +1,187 @@
+import csv
+import io
+import json
+import time
+from datetime import timedelta
+from itertools import islice
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from . import counters, events
+from .models import Task
+from .serializers import TaskImportSerializer
+from .validation import validate_new_task
+
+FORMATS = ['ndjson', 'csv']
+
+# Per-row error details kept in a report; the total count is always exact.
+MAX_REPORTED_ERRORS = 1000
+
+
+class ImportReport:
+    def __init__(self):
+        self.rows = 0
+        self.imported = 0
+        self.failed = 0
+        self.errors = []
+        self.error = None
+        self.started = time.perf_counter()
+        self.seconds = 0.0
+
+    def add_error(self, line, error):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line, 'error': error})
+
+    def finish(self):
+        self.seconds = time.perf_counter() - self.started
+
+    def as_dict(self):
+        data = {
+            'rows': self.rows,
+            'imported': self.imported,
+            'failed': self.failed,
+            'seconds': round(self.seconds, 3),
+            'rows_per_second': round(self.imported / self.seconds, 1) if self.seconds else None,
+            'errors': sorted(self.errors, key=lambda error: error['line']),
+        }
+        if self.error:
+            data['error'] = self.error
+        return data
+
+
+class TaskImporter:
+    """
+    Validate and load tasks for one user from NDJSON or CSV lines.
+
+    Rows are checked in chunks with the same rules as create_task (the
+    'not in the past' rule only unless ``allow_past`` is set) and by
+    TaskImportSerializer, which also accepts ``completed`` and
+    ``completion_time``. Valid rows are loaded with COPY on PostgreSQL and
+    bulk_create elsewhere, one transaction per chunk, updating the user's
+    counters alongside. A chunk commits within half of
+    TASK_CHANGES_SETTLE_SECONDS of its rows' updated_at, however long the load
+    took. Invalid rows are skipped and reported by line number. Each
+    committed chunk sends a resync event. A file that stops decoding ends the
+    run with ``error`` set; chunks committed before it stay imported.
+    """
+
+    def __init__(self, user, allow_past=False, chunk_size=5000):
+        self.user = user
+        self.allow_past = allow_past
+        self.chunk_size = chunk_size
+
+    def run(self, lines, file_format):
+        report = ImportReport()
+        records = self.parse(lines, file_format, report)
+        try:
+            while True:
+                chunk = list(islice(records, self.chunk_size))
+                if not chunk:
+                    break
+                self.load_chunk(chunk, report)
+        except UnicodeDecodeError:
+            # Earlier chunks are committed and stay counted in ``imported``.
+            report.error = 'The file must be UTF-8 encoded.'
+        report.finish()
+        return report
+
+    def parse(self, lines, file_format, report):
+        """Yield (line number, dict) pairs, reporting lines that do not parse."""
+        if file_format == 'csv':
+            reader = csv.DictReader(lines)
+            for record in reader:
+                report.rows += 1
+                # Empty CSV cells mean "not given", e.g. no completion_time.
+                yield reader.line_num, {key: value for key, value in record.items() if key and value != ''}
+            return
+
+        for number, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            report.rows += 1
+            try:
+                record = json.loads(line)
+            except ValueError:
+                report.add_error(number, 'Invalid JSON.')
+                continue
+            if not isinstance(record, dict):
+                report.add_error(number, 'Expected an object.')
+                continue
+            yield number, record
+
+    def validate_chunk(self, chunk, report):
+        checked = []
+        for number, record in chunk:
+            error = validate_new_task(record, allow_past=self.allow_past)
+            if error:
+                report.add_error(number, error)
+            else:
+                checked.append((number, record))
+        if not checked:
+            return []
+
+        serializer = TaskImportSerializer(data=[record for _, record in checked], many=True)
+        if serializer.is_valid():
+            return serializer.validated_data
+
+        valid = []
+        for (number, record), errors in zip(checked, serializer.errors):
+            if errors:
+                report.add_error(number, errors)
+            else:
+                valid.append((number, record))
+        return self.validate_chunk(valid, report) if valid else []
+
+    def load_chunk(self, chunk, report):
+        validated = self.validate_chunk(chunk, report)
+        if not validated:
+            return
+
+        now = timezone.now()
+        tasks = [Task(user=self.user, created_at=now, updated_at=now, **attrs) for attrs in validated]
+        completed = sum(task.completed for task in tasks)
+        with transaction.atomic():
+            if connection.vendor == 'postgresql':
+                self.copy_tasks(tasks)
+                loaded = Task.objects.filter(user=self.user, updated_at=now)
+            else:
+                # bulk_create applies auto_now itself, so match by id instead.
+                Task.objects.bulk_create(tasks, batch_size=1000)
+                loaded = Task.objects.filter(id__in=[task.id for task in tasks])
+            counters.record(self.user.id, opened=len(tasks) - completed, completed=completed)
+            events.publish_resync(self.user.id)
+            if timezone.now() - now > timedelta(seconds=settings.TASK_CHANGES_SETTLE_SECONDS) / 2:
+                # /tasks/changes/ only holds back rows stamped within the
+                # settle window, so a chunk that ran long is stamped again
+                # right before it commits.
+                loaded.update(updated_at=timezone.now())
+        report.imported += len(tasks)
+
+    def copy_tasks(self, tasks):
+        fields = [field for field in Task._meta.concrete_fields if not field.primary_key]
+        columns = ', '.join(connection.ops.quote_name(field.column) for field in fields)
+        buffer = io.StringIO()
+        for task in tasks:
+            task.set_sort_key()
+            buffer.write(','.join(_copy_value(getattr(task, field.attname)) for field in fields) + '\n')
+        buffer.seek(0)
+
+        with connection.cursor() as cursor:
+            cursor.copy_expert(f'COPY {connection.ops.quote_name(Task._meta.db_table)} ({columns}) FROM STDIN WITH (FORMAT csv)', buffer)
+
+
+def _copy_value(value):
+    # In COPY's CSV format an unquoted empty field is NULL and a quoted one is
+    # an empty string, so every string is quoted.
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, str):
+        return '"' + value.replace('"', '""') + '"'
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
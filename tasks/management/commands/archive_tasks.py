@@ -0,0 +1,38 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from tasks import archive
+
+
+class Command(BaseCommand):
+    help = 'Move long soft-deleted tasks into the archive table and purge old archived tasks.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.TASK_ARCHIVE_AFTER_DAYS,
+                            help='Archive tasks soft-deleted more than this many days ago.')
+        parser.add_argument('--purge-days', type=int, default=settings.TASK_PURGE_AFTER_DAYS,
+                            help='Permanently delete tasks archived more than this many days ago.')
+        parser.add_argument('--batch-size', type=int, default=settings.TASK_ARCHIVE_BATCH_SIZE,
+                            help='Rows moved or purged per transaction.')
+        parser.add_argument('--max-batches', type=int,
+                            help='Stop after this many batches of each kind, to bound a periodic run.')
+
+    def handle(self, *args, **options):
+        if options['days'] < settings.TASK_ARCHIVE_AFTER_DAYS:
+            # The change feed only rejects tokens older than the configured
+            # window, so archiving sooner would let clients miss deletions.
+            raise CommandError(f'--days cannot be lower than TASK_ARCHIVE_AFTER_DAYS ({settings.TASK_ARCHIVE_AFTER_DAYS}).')
+
+        now = timezone.now()
+        archived = archive.run_batches(
+            archive.archive_batch, now - timedelta(days=options['days']), options['batch_size'], options['max_batches'],
+        )
+        purged = 0
+        if options['purge_days'] is not None:
+            purged = archive.run_batches(
+                archive.purge_batch, now - timedelta(days=options['purge_days']), options['batch_size'], options['max_batches'],
+            )
+        self.stdout.write(self.style.SUCCESS(f'Archived {archived} tasks, purged {purged} archived tasks.'))
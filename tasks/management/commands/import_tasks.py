@@ -0,0 +1,41 @@
+import json
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.importer import FORMATS, TaskImporter
+
+
+class Command(BaseCommand):
+    help = 'Import tasks for a user from an NDJSON or CSV file.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='File to import.')
+        parser.add_argument('--user', required=True, help='Username that will own the tasks.')
+        parser.add_argument('--format', choices=FORMATS, help='File format; defaults to the file extension.')
+        parser.add_argument('--allow-past', action='store_true', help='Accept due times in the past, for historical imports.')
+        parser.add_argument('--chunk-size', type=int, default=5000, help='Rows validated and loaded per transaction.')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f"User {options['user']} does not exist.")
+
+        file_format = options['format'] or options['path'].rsplit('.', 1)[-1].lower()
+        if file_format not in FORMATS:
+            raise CommandError(f'Cannot tell the format of {options["path"]}; pass --format.')
+
+        importer = TaskImporter(user, allow_past=options['allow_past'], chunk_size=options['chunk_size'])
+        with open(options['path'], encoding='utf-8-sig', newline='') as lines:
+            report = importer.run(lines, file_format).as_dict()
+
+        for error in report.pop('errors'):
+            self.stderr.write(f"Line {error['line']}: {json.dumps(error['error'])}")
+        summary = (
+            f"Imported {report['imported']} of {report['rows']} rows in {report['seconds']}s "
+            f"({report['rows_per_second']} rows/sec), {report['failed']} failed."
+        )
+        if 'error' in report:
+            raise CommandError(f"{report['error']} {summary}")
+        self.stdout.write(self.style.SUCCESS(summary))
@@ -0,0 +1,65 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from tasks.counters import count_tasks
+from tasks.models import Task, TaskArchive, TaskCounter
+
+
+class Command(BaseCommand):
+    help = 'Recount per-user task counters from the Task and TaskArchive tables and fix any drift.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Only reconcile this username.')
+        parser.add_argument('--dry-run', action='store_true', help='Report drift without fixing it.')
+
+    def handle(self, *args, **options):
+        tasks = Task.objects.all()
+        archived = TaskArchive.objects.all()
+        counters = TaskCounter.objects.all()
+        if options['user']:
+            user = User.objects.get(username=options['user'])
+            tasks = tasks.filter(user=user)
+            archived = archived.filter(user=user)
+            counters = counters.filter(user=user)
+
+        # One grouped pass finds the users whose counters look wrong; only those
+        # are then locked and recounted, so concurrent writes are not lost.
+        actual = {
+            row.pop('user_id'): row
+            for row in tasks.values('user_id').annotate(
+                open_count=Count('id', filter=Q(deleted=False, completed=False)),
+                completed_count=Count('id', filter=Q(deleted=False, completed=True)),
+                deleted_count=Count('id', filter=Q(deleted=True)),
+            ).order_by()
+        }
+        empty = {'open_count': 0, 'completed_count': 0, 'deleted_count': 0}
+        for row in archived.values('user_id').annotate(count=Count('id')).order_by():
+            counts = actual.setdefault(row['user_id'], dict(empty))
+            counts['deleted_count'] += row['count']
+        stored = {
+            row.pop('user_id'): row
+            for row in counters.values('user_id', 'open_count', 'completed_count', 'deleted_count')
+        }
+        drifted = [
+            user_id for user_id in actual.keys() | stored.keys()
+            if actual.get(user_id, empty) != stored.get(user_id)
+        ]
+
+        for user_id in sorted(drifted):
+            if options['dry_run']:
+                self.stdout.write(f'User {user_id}: stored {stored.get(user_id)}, actual {actual.get(user_id, empty)}')
+                continue
+            with transaction.atomic():
+                TaskCounter.objects.select_for_update().filter(user_id=user_id).first()
+                counts = count_tasks(user_id)
+                # Bump the version too, so ETags and cached responses built
+                # from the wrong counts stop validating.
+                changes = dict(counts, version=F('version') + 1, updated_at=timezone.now())
+                if not TaskCounter.objects.filter(user_id=user_id).update(**changes):
+                    TaskCounter.objects.create(user_id=user_id, version=1, **counts)
+
+        action = 'found' if options['dry_run'] else 'fixed'
+        self.stdout.write(self.style.SUCCESS(f'Checked {len(actual.keys() | stored.keys())} users, {action} {len(drifted)} drifted counters.'))
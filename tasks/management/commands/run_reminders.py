@@ -0,0 +1,38 @@
+import logging
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError
+
+from tasks.reminders import ReminderScheduler
+
+logger = logging.getLogger('myapp')
+
+
+class Command(BaseCommand):
+    help = 'Record due-soon and overdue reminders for pending tasks until stopped with SIGINT/SIGTERM.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=1.0, help='Seconds between scheduler ticks.')
+        parser.add_argument('--once', action='store_true', help='Run a single tick and exit.')
+
+    def handle(self, *args, **options):
+        scheduler = ReminderScheduler.from_settings()
+        if options['once']:
+            recorded = scheduler.tick()
+            self.stdout.write(self.style.SUCCESS(f'Recorded {len(recorded)} reminders.'))
+            return
+
+        stop = threading.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: stop.set())
+        recorded = 0
+        while not stop.is_set():
+            try:
+                recorded += len(scheduler.tick())
+            except DatabaseError:
+                # Unrecorded reminders stay queued; try again on the next tick.
+                logger.exception('Reminder tick failed')
+            stop.wait(options['interval'])
+        self.stdout.write(self.style.SUCCESS(f'Recorded {recorded} reminders.'))
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.14 on 2026-10-18 05:40
+
+from django.db import migrations, models
+
+
+def populate_sort_key(apps, schema_editor):
+    Task = apps.get_model('tasks', 'Task')
+    Task.objects.filter(completion_time__isnull=False).update(sort_priority=0, sort_time=models.F('completion_time'))
+    Task.objects.filter(completion_time__isnull=True).update(sort_priority=1, sort_time=models.F('to_be_completed_time'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0005_task_deleted_at_task_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='sort_priority',
+            field=models.SmallIntegerField(default=1, editable=False),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='sort_time',
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.RunPython(populate_sort_key, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 4.2.14 on 2026-10-18 05:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0006_task_sort_key'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='task',
+            name='sort_time',
+            field=models.DateTimeField(editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('deleted', False)), fields=['user', '-created_at', '-id'], name='task_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('deleted', False)), fields=['user', 'completed', '-created_at', '-id'], name='task_user_done_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('deleted', False)), fields=['user', '-to_be_completed_time', '-id'], name='task_user_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('deleted', False)), fields=['user', 'completed', '-to_be_completed_time', '-id'], name='task_user_done_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('deleted', False)), fields=['user', 'sort_priority', '-sort_time', '-id'], name='task_user_sort_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('deleted', False)), fields=['user', 'completed', 'sort_priority', '-sort_time', '-id'], name='task_user_done_sort_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.14 on 2026-10-18 05:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0008_taskcounter'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='taskcounter',
+            name='version',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+    ]
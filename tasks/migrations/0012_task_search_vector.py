@@ -0,0 +1,55 @@
+# Generated by Django 4.2.14 on 2026-10-18 06:13
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('pg_catalog.english', coalesce({row}name, '')), 'A') || "
+    "setweight(to_tsvector('pg_catalog.english', coalesce({row}description, '')), 'B')"
+)
+
+
+def create_search_trigger(apps, schema_editor):
+    # Trigger and GIN index are PostgreSQL-only; other backends fall back to
+    # substring matching in tasks.search and leave the column empty.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f"""
+        CREATE FUNCTION tasks_task_search_vector_update() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector := {SEARCH_VECTOR_SQL.format(row='NEW.')};
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    schema_editor.execute("""
+        CREATE TRIGGER tasks_task_search_vector_trigger
+        BEFORE INSERT OR UPDATE OF name, description ON tasks_task
+        FOR EACH ROW EXECUTE PROCEDURE tasks_task_search_vector_update()
+    """)
+    schema_editor.execute(f"UPDATE tasks_task SET search_vector = {SEARCH_VECTOR_SQL.format(row='')}")
+    schema_editor.execute("CREATE INDEX task_search_idx ON tasks_task USING gin (search_vector) WHERE NOT deleted")
+
+
+def drop_search_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS task_search_idx")
+    schema_editor.execute("DROP TRIGGER IF EXISTS tasks_task_search_vector_trigger ON tasks_task")
+    schema_editor.execute("DROP FUNCTION IF EXISTS tasks_task_search_vector_update()")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0011_taskarchive'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_trigger, drop_search_trigger),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.14 on 2026-10-18 06:36
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0012_task_search_vector'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReminderEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('due_soon', 'Due soon'), ('overdue', 'Overdue')], max_length=10)),
+                ('due_at', models.DateTimeField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('completed', False), ('deleted', False)), fields=['to_be_completed_time', 'id'], name='task_pending_due_idx'),
+        ),
+        migrations.AddField(
+            model_name='reminderevent',
+            name='task',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reminders', to='tasks.task'),
+        ),
+        migrations.AddConstraint(
+            model_name='reminderevent',
+            constraint=models.UniqueConstraint(fields=('task', 'kind', 'due_at'), name='reminder_event_unique'),
+        ),
+    ]
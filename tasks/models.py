@@ -1,7 +1,25 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.contrib.postgres.search import SearchVectorField
 from django.utils import timezone
 
+
+class TaskQuerySet(models.QuerySet):
+    """The bulk methods bypass Task.save(), so they fill in the stored sort key."""
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        for obj in objs:
+            obj.set_sort_key()
+        return super().bulk_create(objs, *args, **kwargs)
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        objs = list(objs)
+        for obj in objs:
+            obj.set_sort_key()
+        return super().bulk_update(objs, [*fields, 'sort_priority', 'sort_time'], *args, **kwargs)
+
+
 class Task(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     name = models.CharField(max_length=255)
@@ -13,6 +31,130 @@ class Task(models.Model):
     deleted = models.BooleanField(default=False)
     deleted_at = models.DateTimeField(null=True, blank=True)
     completed = models.BooleanField(default=False)
+    # Stored sort key for sort_by=completion_time: completed tasks first, each
+    # group newest first by completion_time or, if not completed, by due time.
+    sort_priority = models.SmallIntegerField(default=1, editable=False)
+    sort_time = models.DateTimeField(editable=False)
+    # Weighted tsvector of name and description, maintained by a PostgreSQL
+    # trigger on every insert and on updates of either column; see tasks.search.
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = TaskQuerySet.as_manager()
+
+    class Meta:
+        # Partial indexes matching list_tasks: always filtered on the user and
+        # deleted=False, optionally on completed, ordered by the sort key and id.
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-id'], condition=models.Q(deleted=False), name='task_user_created_idx'),
+            models.Index(fields=['user', 'completed', '-created_at', '-id'], condition=models.Q(deleted=False), name='task_user_done_created_idx'),
+            models.Index(fields=['user', '-to_be_completed_time', '-id'], condition=models.Q(deleted=False), name='task_user_due_idx'),
+            models.Index(fields=['user', 'completed', '-to_be_completed_time', '-id'], condition=models.Q(deleted=False), name='task_user_done_due_idx'),
+            models.Index(fields=['user', 'sort_priority', '-sort_time', '-id'], condition=models.Q(deleted=False), name='task_user_sort_idx'),
+            models.Index(fields=['user', 'completed', 'sort_priority', '-sort_time', '-id'], condition=models.Q(deleted=False), name='task_user_done_sort_idx'),
+            # Change feed, including soft-deleted tombstones.
+            models.Index(fields=['user', 'updated_at', 'id'], name='task_user_changes_idx'),
+            # Reminder scheduler: range scans over pending tasks by due time.
+            models.Index(fields=['to_be_completed_time', 'id'], condition=models.Q(completed=False, deleted=False), name='task_pending_due_idx'),
+        ]
+
+    def __str__(self):
+        return self.name
+
+    @staticmethod
+    def sort_key(completion_time, to_be_completed_time):
+        if completion_time is not None:
+            return 0, completion_time
+        return 1, to_be_completed_time
+
+    def set_sort_key(self):
+        self.sort_priority, self.sort_time = self.sort_key(self.completion_time, self.to_be_completed_time)
+
+    def save(self, *args, **kwargs):
+        self.set_sort_key()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'sort_priority', 'sort_time'}
+        super().save(*args, **kwargs)
+
+
+class TaskCounter(models.Model):
+    """
+    Per-user task counts, kept in step with Task writes by tasks.counters.
+
+    Counts are maintained in the same transaction as the write that changes
+    them; ``manage.py reconcile_task_counters`` repairs any drift.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='task_counter')
+    open_count = models.IntegerField(default=0)
+    completed_count = models.IntegerField(default=0)
+    deleted_count = models.IntegerField(default=0)
+    # Bumped by every write to the user's tasks; used as a cache validator.
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'Task counts for {self.user}'
+
+
+class TaskArchive(models.Model):
+    """
+    Soft-deleted tasks moved out of the Task table by tasks.archive.
+
+    Rows keep their original id, so a task can be looked up or restored by the
+    same id it had while live. Archived rows still count as deleted in the
+    user's TaskCounter until they are purged.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_tasks')
+    name = models.CharField(max_length=255)
+    description = models.TextField()
+    to_be_completed_time = models.DateTimeField()
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    completion_time = models.DateTimeField(null=True, blank=True)
+    completed = models.BooleanField(default=False)
+    deleted_at = models.DateTimeField(null=True, blank=True)
+    archived_at = models.DateTimeField(db_index=True)
+
+    # Everything in the archive is a tombstone.
+    deleted = True
+
+    # Columns copied between Task and TaskArchive.
+    copied_fields = ['id', 'user_id', 'name', 'description', 'to_be_completed_time', 'created_at', 'updated_at', 'completion_time', 'completed', 'deleted_at']
 
     def __str__(self):
         return self.name
+
+    @classmethod
+    def from_task(cls, task, archived_at):
+        return cls(archived_at=archived_at, **{field: getattr(task, field) for field in cls.copied_fields})
+
+    def to_task(self, **changes):
+        return Task(**{**{field: getattr(self, field) for field in self.copied_fields}, **changes})
+
+
+class ReminderEvent(models.Model):
+    """
+    A reminder recorded by tasks.reminders when a pending task comes due or
+    becomes overdue.
+
+    Rows are unique per task, kind and due time, so a rerun or a second
+    scheduler never records the same reminder twice, while moving a task's
+    due date makes it eligible for new ones.
+    """
+    DUE_SOON = 'due_soon'
+    OVERDUE = 'overdue'
+    KIND_CHOICES = [(DUE_SOON, 'Due soon'), (OVERDUE, 'Overdue')]
+
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='reminders')
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    due_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['task', 'kind', 'due_at'], name='reminder_event_unique'),
+        ]
+
+    def __str__(self):
+        return f'{self.kind} reminder for task {self.task_id}'
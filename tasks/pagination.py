@@ -1,6 +1,182 @@
-from rest_framework.pagination import PageNumberPagination
+import contextlib
+import json
+import math
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound, ParseError
+from rest_framework.pagination import BasePagination, PageNumberPagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
 class CustomPageNumberPagination(PageNumberPagination):
-    page_size = 10 
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination over an explicit ordering such as ('-created_at', '-id').
+
+    The cursor stores the sort values of the last row on the page, so the next
+    page is a plain range query on the ordering columns. No COUNT(*) and no
+    OFFSET are issued, which keeps deep pages as cheap as the first one. The
+    last ordering field must be unique (normally '-id') to break ties. Every
+    ordering field needs an entry in ``field_types``, which cursors are
+    checked against before they reach a query.
+    """
+    cursor_query_param = 'cursor'
+    page_size = 10
     page_size_query_param = 'page_size'
     max_page_size = 100
+    invalid_cursor_message = 'Invalid cursor'
+    invalid_cursor_exception = NotFound
+
+    # What a cursor may hold for each column it can be ordered by.
+    field_types = {
+        'id': int,
+        'sort_priority': int,
+        'created_at': datetime,
+        'updated_at': datetime,
+        'to_be_completed_time': datetime,
+        'sort_time': datetime,
+        'rank': float,
+    }
+
+    def __init__(self, ordering):
+        self.ordering = tuple(ordering)
+        self.types = [self.field_types[field.lstrip('-')] for field in self.ordering]
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        position = self.decode_cursor(request)
+        if position is not None:
+            queryset = queryset.filter(self.position_filter(position))
+
+        rows = list(queryset.order_by(*self.ordering)[:self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        self.next_position = self.get_position(rows[-1]) if self.has_next else None
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_page_size(self, request):
+        if self.page_size_query_param:
+            with contextlib.suppress(KeyError, ValueError):
+                return _positive_int(
+                    request.query_params[self.page_size_query_param],
+                    strict=True,
+                    cutoff=self.max_page_size
+                )
+        return self.page_size
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_position))
+
+    def get_position(self, row):
+        fields = [field.lstrip('-') for field in self.ordering]
+        if isinstance(row, dict):
+            return [row[field] for field in fields]
+        return [getattr(row, field) for field in fields]
+
+    def position_filter(self, position):
+        # (a, b, c) after (x, y, z) expands to
+        # a > x OR (a = x AND b > y) OR (a = x AND b = y AND c > z),
+        # with > flipped to < for descending fields.
+        condition = Q()
+        equal = Q()
+        for field, value in zip(self.ordering, position):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def encode_cursor(self, position):
+        values = [value.isoformat() if isinstance(value, datetime) else value for value in position]
+        return urlsafe_b64encode(json.dumps(values).encode('utf-8')).decode('ascii')
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+
+        try:
+            values = json.loads(urlsafe_b64decode(encoded.encode('ascii')).decode('utf-8'))
+        except (TypeError, ValueError, UnicodeError):
+            raise self.invalid_cursor_exception(self.invalid_cursor_message)
+
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise self.invalid_cursor_exception(self.invalid_cursor_message)
+
+        position = [self.decode_value(value, expected) for value, expected in zip(values, self.types)]
+        if None in position:
+            raise self.invalid_cursor_exception(self.invalid_cursor_message)
+        return position
+
+    @staticmethod
+    def decode_value(value, expected):
+        """``value`` as an ``expected`` for the database, or None if it is not one."""
+        if expected is datetime:
+            if not isinstance(value, str):
+                return None
+            with contextlib.suppress(ValueError):
+                value = parse_datetime(value)
+            return value if isinstance(value, datetime) and timezone.is_aware(value) else None
+        if isinstance(value, bool):
+            return None
+        if expected is int:
+            # Out of BIGINT range would be a database error, not a bad cursor.
+            return value if isinstance(value, int) and -2 ** 63 <= value < 2 ** 63 else None
+        if isinstance(value, (int, float)) and math.isfinite(value):
+            return float(value)
+        return None
+
+
+class ChangeFeedPagination(KeysetPagination):
+    """
+    Keyset pagination over (updated_at, id) for the task change feed.
+
+    The cursor is handed to clients as an opaque ``since`` token instead of a
+    next-page link.
+    """
+    cursor_query_param = 'since'
+    page_size = 100
+    page_size_query_param = 'limit'
+    max_page_size = 1000
+    invalid_cursor_message = 'Invalid since token'
+    invalid_cursor_exception = ParseError
+
+    def __init__(self):
+        super().__init__(('updated_at', 'id'))
+
+    def get_token(self, rows):
+        if not rows:
+            return self.request.query_params.get(self.cursor_query_param) or None
+        return self.encode_cursor(self.get_position(rows[-1]))
+
+    def get_paginated_response(self, data):
+        return Response({
+            'changes': data,
+            'next': self.next_token,
+            'has_more': self.has_next,
+        })
+
+    def paginate_queryset(self, queryset, request, view=None):
+        rows = super().paginate_queryset(queryset, request, view)
+        self.next_token = self.get_token(rows)
+        return rows
+
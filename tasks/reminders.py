@@ -0,0 +1,152 @@
+"""
+Due-date reminders for pending tasks, run by ``manage.py run_reminders``.
+
+Two kinds of ReminderEvent are recorded: ``due_soon`` LEAD_MINUTES before a
+task's due time and ``overdue`` at the due time. Each is also published as a
+``task.due_soon`` / ``task.overdue`` event on the user's live stream.
+
+The scheduler keeps the reminders of the next few minutes in a min-heap
+ordered by when they fire. It never scans the Task table: it reads pending
+tasks by due time off the partial index task_pending_due_idx, one
+WINDOW_MINUTES slice ahead of the clock at a time, so the cost of a tick
+follows the number of tasks coming due rather than the size of the table.
+Tasks created or given a new due date inside an already loaded slice are
+picked up by rescanning that slice every RESCAN_SECONDS. Every reminder is
+checked against the task's current state before it is recorded, and the
+unique constraint on ReminderEvent keeps a restart from recording it twice.
+"""
+import heapq
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+
+from . import events
+from .models import ReminderEvent, Task
+from .pagination import KeysetPagination
+
+logger = logging.getLogger('myapp')
+
+# The column order of task_pending_due_idx.
+DUE_ORDERING = ('to_be_completed_time', 'id')
+DUE_KEYSET = KeysetPagination(DUE_ORDERING)
+
+
+class ReminderScheduler:
+    def __init__(self, lead, window, catch_up, rescan, batch_size=1000):
+        self.lead = lead
+        self.window = window
+        self.catch_up = catch_up
+        self.rescan = rescan
+        self.batch_size = batch_size
+        # (fire_at, task_id, kind, due_at) entries, and the same keys as a set
+        # so a rescan does not push a reminder that is already waiting.
+        self.heap = []
+        self.scheduled = set()
+        self.loaded_until = None
+        self.last_scan = None
+
+    @classmethod
+    def from_settings(cls):
+        config = settings.TASK_REMINDERS
+        return cls(
+            lead=timedelta(minutes=config['LEAD_MINUTES']),
+            window=timedelta(minutes=config['WINDOW_MINUTES']),
+            catch_up=timedelta(minutes=config['CATCH_UP_MINUTES']),
+            rescan=timedelta(seconds=config['RESCAN_SECONDS']),
+            batch_size=config['BATCH_SIZE'],
+        )
+
+    def pending_due(self, start, end):
+        """Yield (id, due time) of pending tasks due in (start, end], in index order."""
+        queryset = Task.objects.filter(completed=False, deleted=False, to_be_completed_time__lte=end)
+        page = queryset.filter(to_be_completed_time__gt=start)
+        while True:
+            rows = list(page.order_by(*DUE_ORDERING).values_list(*DUE_ORDERING)[:self.batch_size])
+            for due_at, task_id in rows:
+                yield task_id, due_at
+            if len(rows) < self.batch_size:
+                return
+            page = queryset.filter(DUE_KEYSET.position_filter(rows[-1]))
+
+    def load(self, start, end, now):
+        """Schedule reminders for pending tasks due in (start, end]; return how many were added."""
+        added = 0
+        for task_id, due_at in self.pending_due(start, end):
+            if due_at > now:
+                added += self.push(due_at - self.lead, task_id, ReminderEvent.DUE_SOON, due_at)
+            added += self.push(due_at, task_id, ReminderEvent.OVERDUE, due_at)
+        return added
+
+    def push(self, fire_at, task_id, kind, due_at):
+        key = (task_id, kind, due_at)
+        if key in self.scheduled:
+            return 0
+        self.scheduled.add(key)
+        heapq.heappush(self.heap, (fire_at, task_id, kind, due_at))
+        return 1
+
+    def tick(self, now=None):
+        """Record the reminders that are due at ``now`` and return the new ones."""
+        now = now or timezone.now()
+        if self.loaded_until is None:
+            # Tasks that went overdue while no scheduler was running still get
+            # their reminder, if it was recent enough to be useful.
+            self.loaded_until = now - self.catch_up
+            self.last_scan = now
+        if now - self.last_scan >= self.rescan:
+            self.load(self.last_scan, self.loaded_until, now)
+            self.last_scan = now
+        if self.loaded_until < now + self.lead + self.window / 2:
+            end = now + self.lead + self.window
+            self.load(self.loaded_until, end, now)
+            self.loaded_until = end
+
+        recorded = []
+        while self.heap and self.heap[0][0] <= now:
+            batch = []
+            while self.heap and self.heap[0][0] <= now and len(batch) < self.batch_size:
+                batch.append(heapq.heappop(self.heap))
+            try:
+                recorded.extend(self.record([entry[1:] for entry in batch]))
+            except DatabaseError:
+                # Keep them queued for the next tick.
+                for entry in batch:
+                    heapq.heappush(self.heap, entry)
+                raise
+            for entry in batch:
+                self.scheduled.discard(entry[1:])
+        return recorded
+
+    def record(self, reminders):
+        """
+        Save the reminders whose task is still pending with the same due time,
+        skipping ones already recorded, and publish them to the owners' streams.
+        """
+        task_ids = {task_id for task_id, _, _ in reminders}
+        current = {
+            task_id: (user_id, due_at)
+            for task_id, user_id, due_at in Task.objects.filter(id__in=task_ids, completed=False, deleted=False)
+            .values_list('id', 'user_id', 'to_be_completed_time')
+        }
+        existing = set(
+            ReminderEvent.objects.filter(task_id__in=task_ids).values_list('task_id', 'kind', 'due_at')
+        )
+        new = [
+            reminder for reminder in reminders
+            if reminder not in existing and reminder[0] in current and current[reminder[0]][1] == reminder[2]
+        ]
+        if not new:
+            return []
+        with transaction.atomic():
+            # ignore_conflicts covers a second scheduler racing this one.
+            ReminderEvent.objects.bulk_create(
+                [ReminderEvent(task_id=task_id, kind=kind, due_at=due_at) for task_id, kind, due_at in new],
+                ignore_conflicts=True,
+            )
+            for task_id, kind, due_at in new:
+                events.publish(current[task_id][0], kind, task_id, due_at=due_at)
+        logger.info('Recorded %s task reminders', len(new))
+        return new
@@ -0,0 +1,72 @@
+"""
+Per-user cache of list_tasks and task_summary response data.
+
+Keys carry the user's validators from counters.get_validators: the
+TaskCounter version, which every task write bumps in its own transaction,
+and the latest due time already passed by an open task. A write, or a
+pending task turning delayed, moves all of the user's keys at once, so
+nothing is scanned or deleted on write; entries under the old generation
+are simply never read again and age out of the LRU or expire after TTL.
+The short TTL also bounds anything the validators do not see.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+
+from task_manager.cache import LRUCache
+
+RESPONSE_CACHE = {
+    'MAX_SIZE': 10000,
+    'TTL': 10,
+    'SHARED_CACHE': None,
+    'SHARED_TTL': 10,
+    **getattr(settings, 'RESPONSE_CACHE', {}),
+}
+
+response_cache = LRUCache(max_size=RESPONSE_CACHE['MAX_SIZE'], ttl=RESPONSE_CACHE['TTL'])
+shared_stats = {'hits': 0, 'misses': 0}
+
+
+def _shared_cache():
+    alias = RESPONSE_CACHE['SHARED_CACHE']
+    return caches[alias] if alias else None
+
+
+def make_key(kind, request, validators):
+    """
+    Key for ``kind`` ('list' or 'summary') responses to ``request``. The full
+    URL is part of it because paginated responses embed absolute links.
+    """
+    version, last_modified = validators
+    stamp = last_modified.timestamp() if last_modified else 0
+    url = request.build_absolute_uri()
+    digest = hashlib.md5(f'{version}:{stamp}:{url}'.encode('utf-8')).hexdigest()
+    return f'tasks-response:{kind}:{request.user.id}:{digest}'
+
+
+def lookup(key):
+    data = response_cache.get(key)
+    if data is None:
+        shared = _shared_cache()
+        if shared is not None:
+            data = shared.get(key)
+            shared_stats['hits' if data is not None else 'misses'] += 1
+            if data is not None:
+                response_cache.set(key, data)
+    return data
+
+
+def store(key, data):
+    response_cache.set(key, data)
+    shared = _shared_cache()
+    if shared is not None:
+        shared.set(key, data, RESPONSE_CACHE['SHARED_TTL'])
+
+
+def get_stats():
+    stats = response_cache.stats()
+    if _shared_cache() is not None:
+        stats['shared_hits'] = shared_stats['hits']
+        stats['shared_misses'] = shared_stats['misses']
+    return stats
@@ -0,0 +1,42 @@
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connection
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.functions import Cast
+
+# Must match the configuration used by the trigger in migration 0012.
+SEARCH_CONFIG = 'english'
+
+# Search results are ordered by rank, best first, with id breaking ties. The
+# rank is cast to double precision: ts_rank returns a float4, and the cursor's
+# float comparison against it would otherwise be float4 vs float8 and skip or
+# repeat rows at page boundaries.
+SEARCH_ORDERING = ('-rank', '-id')
+
+_TERM_RE = re.compile(r'\w+')
+
+
+def parse_terms(q):
+    """Split a search string into plain word terms, dropping tsquery syntax."""
+    return _TERM_RE.findall(q or '')
+
+
+def search_tasks(queryset, q):
+    """
+    Filter ``queryset`` to tasks matching every term of ``q`` and annotate a
+    ``rank``. Each term also matches as a prefix, so "meet" finds "meeting".
+
+    On PostgreSQL this is a tsquery against the GIN-indexed search_vector,
+    ranked with ts_rank (matches in the name weigh more than in the
+    description). Other backends, i.e. SQLite test runs, fall back to
+    case-insensitive substring matching with a constant rank.
+    """
+    terms = parse_terms(q)
+    if connection.vendor == 'postgresql':
+        query = SearchQuery(' & '.join(f'{term}:*' for term in terms), config=SEARCH_CONFIG, search_type='raw')
+        return queryset.filter(search_vector=query).annotate(rank=Cast(SearchRank(F('search_vector'), query), FloatField()))
+
+    for term in terms:
+        queryset = queryset.filter(Q(name__icontains=term) | Q(description__icontains=term))
+    return queryset.annotate(rank=Value(0.0, output_field=FloatField()))
@@ -1,7 +1,18 @@
 from rest_framework import serializers
-from .models import Task
+from rest_framework import ISO_8601
+from rest_framework.relations import RelatedField
+from rest_framework.settings import api_settings
+from .models import Task, TaskArchive
 from django.utils import timezone
 
+def get_task_status(completed, to_be_completed_time, now):
+    if completed:
+        return 'completed'
+    elif to_be_completed_time < now:
+        return 'delayed'
+    else:
+        return 'pending'
+
 class TaskSerializer(serializers.ModelSerializer):
     status = serializers.SerializerMethodField()
 
@@ -12,9 +23,106 @@ class TaskSerializer(serializers.ModelSerializer):
 
     def get_status(self, obj):
         now = timezone.now()
-        if obj.completed:
-            return 'completed'
-        elif obj.to_be_completed_time < now:
-            return 'delayed'
-        else:
-            return 'pending'
+        return get_task_status(obj.completed, obj.to_be_completed_time, now)
+
+class TaskImportSerializer(TaskSerializer):
+    """TaskSerializer for imports, which may also carry completion state."""
+
+    class Meta(TaskSerializer.Meta):
+        read_only_fields = ['created_at', 'updated_at', 'user', 'deleted', 'deleted_at']
+
+    def validate(self, attrs):
+        if attrs.get('completion_time'):
+            attrs['completed'] = True
+        elif attrs.get('completed'):
+            attrs['completion_time'] = timezone.now()
+        return attrs
+
+class TaskArchiveSerializer(serializers.ModelSerializer):
+    status = serializers.SerializerMethodField()
+
+    class Meta:
+        model = TaskArchive
+        fields = [*TaskSerializer.Meta.fields, 'archived_at']
+        read_only_fields = fields
+
+    def get_status(self, obj):
+        return get_task_status(obj.completed, obj.to_be_completed_time, timezone.now())
+
+# Fields returned by ?view=summary on list screens; leaves out the potentially
+# large description and the always-empty deleted columns.
+SUMMARY_FIELDS = ['id', 'name', 'to_be_completed_time', 'completed', 'completion_time', 'status']
+
+class TaskRowSerializer:
+    """
+    Read-only counterpart of TaskSerializer for rendering lists.
+
+    Takes dicts from ``Task.objects.values(*TaskRowSerializer.columns)`` instead
+    of model instances and formats them with TaskSerializer's own field objects,
+    built once per process, so the output is identical. ``status`` is computed
+    against a single ``now`` and datetimes against a single timezone lookup for
+    the whole batch.
+
+    ``fields`` limits the output to those keys; the rows then only need the
+    columns from ``columns_for(fields)``.
+    """
+    columns = [name for name in TaskSerializer.Meta.fields if name != 'status']
+    _fields = None
+
+    def __init__(self, rows, now=None, fields=None):
+        self.rows = rows
+        self.now = now or timezone.now()
+        self.converters = [
+            (name, self.get_converter(field)) for name, field in self.get_fields().items()
+            if fields is None or name in fields
+        ]
+
+    @classmethod
+    def columns_for(cls, fields):
+        """The columns to fetch with values() to render ``fields`` (None for all)."""
+        if fields is None:
+            return list(cls.columns)
+        columns = [name for name in cls.columns if name in fields]
+        if 'status' in fields:
+            columns += [name for name in ('completed', 'to_be_completed_time') if name not in columns]
+        return columns
+
+    @classmethod
+    def get_fields(cls):
+        if cls._fields is None:
+            cls._fields = TaskSerializer().fields
+        return cls._fields
+
+    def get_converter(self, field):
+        if isinstance(field, serializers.SerializerMethodField):
+            return None
+        if isinstance(field, RelatedField):
+            # values() already yields the primary key.
+            return int
+        if isinstance(field, serializers.DateTimeField):
+            output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+            field_timezone = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+            if isinstance(output_format, str) and output_format.lower() == ISO_8601 and field_timezone is not None:
+                # Same steps as DateTimeField.to_representation for the aware
+                # datetimes the database returns when USE_TZ is on.
+                def convert(value):
+                    value = value.astimezone(field_timezone).isoformat()
+                    if value.endswith('+00:00'):
+                        value = value[:-6] + 'Z'
+                    return value
+                return convert
+        return field.to_representation
+
+    def to_representation(self, row):
+        data = {}
+        for name, convert in self.converters:
+            if convert is None:
+                data[name] = get_task_status(row['completed'], row['to_be_completed_time'], self.now)
+            else:
+                value = row[name]
+                data[name] = None if value is None else convert(value)
+        return data
+
+    @property
+    def data(self):
+        return [self.to_representation(row) for row in self.rows]
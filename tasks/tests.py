@@ -1,12 +1,50 @@
 from django.urls import reverse
 from rest_framework import status
-from rest_framework.test import APITestCase
+from rest_framework.test import APITestCase, APITransactionTestCase
 from django.contrib.auth.models import User
 from rest_framework.authtoken.models import Token
-from tasks.models import Task  
+from tasks.models import ReminderEvent, Task, TaskArchive, TaskCounter
+from tasks import counters, events, importer, response_cache
+from tasks.pagination import ChangeFeedPagination, KeysetPagination
+from tasks.reminders import ReminderScheduler
+from tasks.serializers import SUMMARY_FIELDS, TaskRowSerializer, TaskSerializer
+from rest_framework.renderers import JSONRenderer
+from tasks.views import TASK_ORDERINGS, get_calendar_queryset, get_task_queryset
 from django.utils import timezone
-from datetime import timedelta
+from django.utils.dateparse import parse_datetime
+from django.utils.http import http_date
+from django.core.cache import cache
+from django.db import connection, connections, transaction
+from django.conf import settings
+from django.dispatch import receiver
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.test.signals import setting_changed
+from django.http import HttpResponse
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.test.utils import CaptureQueriesContext
+from datetime import date, timedelta
+import asyncio
+import csv
+import gzip
+import io
 import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+import warnings
+from unittest import mock
+from io import StringIO
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from task_manager import metrics
+from task_manager.db import routers
+from task_manager.db.pool import ConnectionPool, PoolTimeout
+from task_manager.db.routers import ReplicaRouter
+from task_manager.middleware import MetricsMiddleware, PrimaryPinMiddleware
+from task_manager.log_handlers import JSONFormatter, QueueHandler, RateLimitFilter
 
 class TaskTests(APITestCase):
     def setUp(self):
@@ -95,4 +133,1550 @@ class TaskTests(APITestCase):
         url = reverse('list_tasks')
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data['results']), 1)
\ No newline at end of file
+        self.assertEqual(len(response.data['results']), 1)
+
+class TaskCursorPaginationTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword', email='test@example.com')
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        now = timezone.now()
+        for i in range(12):
+            Task.objects.create(
+                user=self.user,
+                name=f'Task {i}',
+                description='Task description',
+                # Duplicate due dates exercise the id tie-break.
+                to_be_completed_time=now + timedelta(days=i // 3),
+                completed=i % 4 == 0,
+                completion_time=now - timedelta(hours=i) if i % 4 == 0 else None,
+            )
+
+    def collect_pages(self, params):
+        url = reverse('list_tasks')
+        ids = []
+        response = self.client.get(url, params)
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids.extend(task['id'] for task in response.data['results'])
+            if not response.data['next']:
+                return ids
+            response = self.client.get(response.data['next'])
+
+    def test_cursor_matches_page_number_order(self):
+        for sort_by in ['created_at', 'to_be_completed_time', 'completion_time']:
+            for flag in [{}, {'show_pending': 'true'}, {'show_completed': 'true'}]:
+                params = {'sort_by': sort_by, **flag}
+                cursor_ids = self.collect_pages({**params, 'cursor': ''})
+                page_ids = self.collect_pages(params)
+                self.assertEqual(cursor_ids, page_ids)
+                self.assertEqual(len(cursor_ids), len(set(cursor_ids)))
+
+    def test_cursor_skips_count_query(self):
+        url = reverse('list_tasks')
+        response = self.client.get(url, {'cursor': ''})
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(response.data['next'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('count', response.data)
+        self.assertFalse(any('COUNT(' in query['sql'].upper() for query in queries.captured_queries))
+
+    def test_invalid_cursor(self):
+        url = reverse('list_tasks')
+        response = self.client.get(url, {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_forged_cursors_are_rejected(self):
+        url = reverse('list_tasks')
+        encode = KeysetPagination(()).encode_cursor
+        cases = {
+            'null': ('created_at', [None, None]),
+            'null_id': ('created_at', ['2024-01-01T00:00:00+00:00', None]),
+            'wrong_type': ('completion_time', ['2024-01-01T00:00:00+00:00', 1, 2]),
+            'wrong_length': ('created_at', ['2024-01-01T00:00:00+00:00']),
+            'too_long': ('created_at', ['2024-01-01T00:00:00+00:00', 1, 2]),
+            'out_of_order': ('created_at', [1, '2024-01-01T00:00:00+00:00']),
+            'naive_datetime': ('created_at', ['2024-01-01T00:00:00', 1]),
+            'bool_id': ('created_at', ['2024-01-01T00:00:00+00:00', True]),
+            'float_id': ('created_at', ['2024-01-01T00:00:00+00:00', 1.5]),
+            'huge_id': ('created_at', ['2024-01-01T00:00:00+00:00', 2 ** 70]),
+            'not_a_list': ('created_at', {'id': 1}),
+        }
+        for label, (sort_by, values) in cases.items():
+            with self.subTest(label):
+                response = self.client.get(url, {'sort_by': sort_by, 'cursor': encode(values)})
+                self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        response = self.client.get(url, {'sort_by': 'completion_time', 'cursor': encode([1, '2024-01-01T00:00:00+00:00', 2])})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class TaskIndexUsageTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword', email='test@example.com')
+        now = timezone.now()
+        Task.objects.bulk_create([
+            Task(
+                user=self.user,
+                name=f'Task {i}',
+                description='Task description',
+                to_be_completed_time=now + timedelta(hours=i),
+                completed=i % 2 == 0,
+                completion_time=now if i % 2 == 0 else None,
+            )
+            for i in range(20)
+        ])
+
+    def explain(self, queryset):
+        if connection.vendor == 'postgresql':
+            # Tiny test tables would otherwise always be sequentially scanned.
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+                cursor.execute('SET LOCAL enable_bitmapscan = off')
+        return queryset.explain()
+
+    def assertIndexOrdered(self, plan):
+        if connection.vendor == 'sqlite':
+            self.assertIn('USING INDEX task_', plan)
+            self.assertNotIn('TEMP B-TREE', plan)
+        elif connection.vendor == 'postgresql':
+            self.assertIn('Index Scan', plan)
+            self.assertNotIn('Sort', plan)
+
+    def test_list_tasks_variants_use_index_without_sort(self):
+        for sort_by, ordering in TASK_ORDERINGS.items():
+            paginator = KeysetPagination(ordering)
+            for flags in [(False, False), (True, False), (False, True)]:
+                queryset = get_task_queryset(self.user, sort_by, *flags)
+                with self.subTest(sort_by=sort_by, flags=flags):
+                    self.assertIndexOrdered(self.explain(queryset[:5]))
+                    position = paginator.get_position(queryset[0])
+                    self.assertIndexOrdered(self.explain(queryset.filter(paginator.position_filter(position))[:5]))
+
+
+class TaskBulkTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword', email='test@example.com')
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        self.other_user = User.objects.create_user(username='otheruser', password='password', email='other@example.com')
+        self.due = timezone.now() + timedelta(days=1)
+
+    def create_tasks(self, user, count, **kwargs):
+        return Task.objects.bulk_create([
+            Task(user=user, name=f'Task {i}', description='Task description', to_be_completed_time=self.due, **kwargs)
+            for i in range(count)
+        ])
+
+    def test_bulk_create(self):
+        due = self.due.strftime('%Y-%m-%dT%H:%M:%S')
+        data = [
+            {'name': 'First', 'description': 'First description', 'to_be_completed_time': due},
+            {'name': 'Missing description', 'to_be_completed_time': due},
+            {'name': 'x' * 300, 'description': 'Too long', 'to_be_completed_time': due},
+            {'name': 'Second', 'description': 'Second description', 'to_be_completed_time': due},
+        ]
+        response = self.client.post(reverse('bulk_create_tasks'), data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data['results']
+        self.assertEqual([result['status'] for result in results], [201, 400, 400, 201])
+        self.assertEqual(results[1]['error'], 'description is required.')
+        self.assertIn('name', results[2]['errors'])
+        self.assertEqual(Task.objects.filter(user=self.user).count(), 2)
+        self.assertEqual(results[3]['task']['name'], 'Second')
+
+    def test_bulk_create_rejects_non_list(self):
+        response = self.client.post(reverse('bulk_create_tasks'), {'name': 'Task'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_update(self):
+        own, = self.create_tasks(self.user, 1)
+        other, = self.create_tasks(self.other_user, 1)
+        data = [
+            {'id': own.id, 'name': 'Renamed'},
+            {'id': other.id, 'name': 'Not mine'},
+            {'id': 0, 'name': 'Missing'},
+            {'id': own.id, 'name': 'Duplicate'},
+        ]
+        response = self.client.put(reverse('bulk_update_tasks'), data, format='json')
+        self.assertEqual([result['status'] for result in response.data['results']], [200, 403, 404, 400])
+        own.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual(own.name, 'Renamed')
+        self.assertEqual(other.name, 'Task 0')
+
+    def test_bulk_complete_uses_constant_queries(self):
+        tasks = self.create_tasks(self.user, 500)
+        ids = [task.id for task in tasks]
+        counters.get_counter(self.user.id)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('bulk_complete_tasks'), {'ids': ids}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertLessEqual(len(queries.captured_queries), 6)
+        self.assertEqual(Task.objects.filter(id__in=ids, completed=True, sort_priority=0).count(), 500)
+        self.assertTrue(all(result['message'] == 'Task marked as completed' for result in response.data['results']))
+
+    def test_bulk_complete_per_item_results(self):
+        done, = self.create_tasks(self.user, 1, completed=True, completion_time=timezone.now())
+        other, = self.create_tasks(self.other_user, 1)
+        response = self.client.post(reverse('bulk_complete_tasks'), {'ids': [done.id, other.id, 0]}, format='json')
+        results = response.data['results']
+        self.assertEqual([result['status'] for result in results], [200, 403, 404])
+        self.assertEqual(results[0]['message'], 'Task is already completed')
+        other.refresh_from_db()
+        self.assertFalse(other.completed)
+
+    def test_bulk_soft_delete(self):
+        tasks = self.create_tasks(self.user, 3)
+        other, = self.create_tasks(self.other_user, 1)
+        ids = [task.id for task in tasks] + [other.id]
+        response = self.client.post(reverse('bulk_soft_delete_tasks'), {'ids': ids}, format='json')
+        self.assertEqual([result['status'] for result in response.data['results']], [200, 200, 200, 403])
+        self.assertEqual(Task.objects.filter(user=self.user, deleted=True).count(), 3)
+        self.assertFalse(Task.objects.get(id=other.id).deleted)
+
+
+class TaskConditionalUpdateTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword', email='test@example.com')
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        self.other_user = User.objects.create_user(username='otheruser', password='password', email='other@example.com')
+        due = timezone.now() + timedelta(days=1)
+        self.task = Task.objects.create(user=self.user, name='Task', description='Task description', to_be_completed_time=due)
+        self.other_task = Task.objects.create(user=self.other_user, name='Other', description='Other description', to_be_completed_time=due)
+        counters.get_counter(self.user.id)
+
+    def task_queries(self, method, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(self.client, method)(url)
+        return response, [query for query in queries.captured_queries if '"tasks_task"' in query['sql']]
+
+    def test_complete_is_a_single_update(self):
+        response, queries = self.task_queries('post', reverse('mark_task_completed', args=[self.task.id]))
+        self.assertEqual(response.data['message'], 'Task marked as completed')
+        self.assertEqual(len(queries), 1)
+        self.task.refresh_from_db()
+        self.assertTrue(self.task.completed)
+        self.assertEqual(self.task.sort_priority, 0)
+        self.assertEqual(self.task.sort_time, self.task.completion_time)
+
+    def test_complete_twice_reports_original_completion_time(self):
+        url = reverse('mark_task_completed', args=[self.task.id])
+        first = self.client.post(url)
+        second = self.client.post(url)
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.data['message'], 'Task is already completed')
+        self.assertEqual(second.data['completion_time'], first.data['completion_time'])
+
+    def test_complete_errors(self):
+        response = self.client.post(reverse('mark_task_completed', args=[self.other_task.id]))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        response = self.client.post(reverse('mark_task_completed', args=[0]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.other_task.refresh_from_db()
+        self.assertFalse(self.other_task.completed)
+
+    def test_delete_is_a_single_update(self):
+        response, queries = self.task_queries('delete', reverse('soft_delete_task', args=[self.task.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(queries), 1)
+        response = self.client.delete(reverse('soft_delete_task', args=[self.task.id]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_delete_other_users_task(self):
+        response = self.client.delete(reverse('soft_delete_task', args=[self.other_task.id]))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.other_task.refresh_from_db()
+        self.assertFalse(self.other_task.deleted)
+
+
+class TaskSummaryTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword', email='test@example.com')
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        now = timezone.now()
+        self.overdue = Task.objects.create(user=self.user, name='Overdue', description='Overdue task', to_be_completed_time=now - timedelta(days=1))
+        self.upcoming = Task.objects.create(user=self.user, name='Upcoming', description='Upcoming task', to_be_completed_time=now + timedelta(days=1))
+
+    def summary(self):
+        response = self.client.get(reverse('task_summary'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_summary_tracks_writes(self):
+        self.assertEqual(self.summary(), {'total': 2, 'pending': 1, 'delayed': 1, 'completed': 0, 'deleted': 0})
+
+        due = (timezone.now() + timedelta(days=2)).strftime('%Y-%m-%dT%H:%M:%S')
+        self.client.post(reverse('create_task'), {'name': 'New', 'description': 'New task', 'to_be_completed_time': due}, format='json')
+        self.client.post(reverse('mark_task_completed', args=[self.overdue.id]))
+        self.client.delete(reverse('soft_delete_task', args=[self.overdue.id]))
+        self.client.delete(reverse('soft_delete_task', args=[self.upcoming.id]))
+        self.assertEqual(self.summary(), {'total': 1, 'pending': 1, 'delayed': 0, 'completed': 0, 'deleted': 2})
+        self.assertEqual(TaskCounter.objects.get(user=self.user).open_count, 1)
+
+    def test_summary_tracks_bulk_writes(self):
+        self.summary()
+        ids = [self.overdue.id, self.upcoming.id]
+        self.client.post(reverse('bulk_complete_tasks'), {'ids': ids[:1]}, format='json')
+        self.client.post(reverse('bulk_soft_delete_tasks'), {'ids': ids}, format='json')
+        self.assertEqual(self.summary(), {'total': 0, 'pending': 0, 'delayed': 0, 'completed': 0, 'deleted': 2})
+
+    def test_reconcile_fixes_drift(self):
+        self.summary()
+        TaskCounter.objects.filter(user=self.user).update(open_count=10, deleted_count=3)
+        version = TaskCounter.objects.get(user=self.user).version
+        etag = self.client.get(reverse('list_tasks'))['ETag']
+        out = StringIO()
+        call_command('reconcile_task_counters', stdout=out)
+        self.assertIn('fixed 1 drifted', out.getvalue())
+        self.assertEqual(self.summary()['total'], 2)
+        self.assertEqual(self.summary()['deleted'], 0)
+        # Responses validated against the drifted counts are invalidated.
+        self.assertEqual(TaskCounter.objects.get(user=self.user).version, version + 1)
+        self.assertNotEqual(self.client.get(reverse('list_tasks'))['ETag'], etag)
+
+    def test_delayed_count_uses_index(self):
+        queryset = Task.objects.filter(user=self.user, deleted=False, completed=False, to_be_completed_time__lt=timezone.now())
+        plan = queryset.explain()
+        if connection.vendor == 'sqlite':
+            self.assertIn('USING INDEX task_user_', plan)
+            self.assertIn('to_be_completed_time<?', plan)
+
+
+class TaskRowSerializerTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword', email='test@example.com')
+        now = timezone.now()
+        Task.objects.create(user=self.user, name='Pending', description='Pending task', to_be_completed_time=now + timedelta(days=1))
+        Task.objects.create(user=self.user, name='Delayed', description='', to_be_completed_time=now - timedelta(days=1))
+        Task.objects.create(user=self.user, name='Completed', description='Done', to_be_completed_time=now, completed=True, completion_time=now)
+        Task.objects.create(user=self.user, name='Deleted', description='Gone', to_be_completed_time=now, deleted=True, deleted_at=now)
+
+    def test_output_matches_task_serializer(self):
+        tasks = Task.objects.order_by('id')
+        expected = JSONRenderer().render(TaskSerializer(tasks, many=True).data)
+        actual = JSONRenderer().render(TaskRowSerializer(tasks.values(*TaskRowSerializer.columns)).data)
+        self.assertEqual(actual, expected)
+
+    def test_output_matches_task_serializer_in_utc(self):
+        tasks = Task.objects.order_by('id')
+        with timezone.override('UTC'):
+            expected = JSONRenderer().render(TaskSerializer(tasks, many=True).data)
+            actual = JSONRenderer().render(TaskRowSerializer(tasks.values(*TaskRowSerializer.columns)).data)
+        self.assertEqual(actual, expected)
+        self.assertIn(b'Z"', actual)
+
+    def test_list_tasks_matches_task_serializer(self):
+        token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+        for sort_by in TASK_ORDERINGS:
+            response = self.client.get(reverse('list_tasks'), {'sort_by': sort_by})
+            expected = TaskSerializer(get_task_queryset(self.user, sort_by), many=True).data
+            self.assertEqual(JSONRenderer().render(response.data['results']), JSONRenderer().render(expected))
+
+
+class TaskListConditionalTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword', email='test@example.com')
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        self.now = timezone.now()
+        self.task = Task.objects.create(user=self.user, name='Task', description='Task description', to_be_completed_time=self.now + timedelta(hours=1))
+        counters.get_counter(self.user.id)
+        self.url = reverse('list_tasks')
+
+    def test_unchanged_list_returns_304(self):
+        response = self.client.get(self.url)
+        etag = response['ETag']
+        self.assertNotIn('Last-Modified', response)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        task_queries = [query['sql'] for query in queries.captured_queries if '"tasks_task"' in query['sql']]
+        self.assertEqual(len(task_queries), 1)
+        self.assertNotIn('COUNT(', task_queries[0].upper())
+
+    def test_etag_depends_on_query(self):
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(self.url, {'sort_by': 'to_be_completed_time'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_write_changes_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        self.client.put(reverse('update_task', args=[self.task.id]), {'name': 'Renamed'}, format='json')
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0]['name'], 'Renamed')
+
+    def test_write_in_same_second_is_not_hidden(self):
+        self.client.get(self.url)
+        since = http_date(timezone.now().timestamp() + 1)
+        self.client.put(reverse('update_task', args=[self.task.id]), {'name': 'Renamed'}, format='json')
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=since)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0]['name'], 'Renamed')
+
+    def test_status_flip_changes_etag(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['results'][0]['status'], 'pending')
+        with mock.patch('django.utils.timezone.now', return_value=self.now + timedelta(hours=2)):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0]['status'], 'delayed')
+
+
+@override_settings(TASK_CHANGES_SETTLE_SECONDS=0)
+class TaskChangeFeedTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword', email='test@example.com')
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        self.other_user = User.objects.create_user(username='otheruser', password='password', email='other@example.com')
+        due = timezone.now() + timedelta(days=1)
+        self.first = Task.objects.create(user=self.user, name='First', description='First task', to_be_completed_time=due)
+        self.second = Task.objects.create(user=self.user, name='Second', description='Second task', to_be_completed_time=due)
+        Task.objects.create(user=self.other_user, name='Other', description='Other task', to_be_completed_time=due)
+        self.url = reverse('task_changes')
+
+    def test_initial_sync_and_incremental_changes(self):
+        response = self.client.get(self.url)
+        self.assertEqual([task['id'] for task in response.data['changes']], [self.first.id, self.second.id])
+        self.assertFalse(response.data['has_more'])
+        since = response.data['next']
+
+        response = self.client.get(self.url, {'since': since})
+        self.assertEqual(response.data['changes'], [])
+        self.assertEqual(response.data['next'], since)
+
+        self.client.post(reverse('mark_task_completed', args=[self.second.id]))
+        self.client.delete(reverse('soft_delete_task', args=[self.first.id]))
+        response = self.client.get(self.url, {'since': since})
+        changes = response.data['changes']
+        self.assertEqual([task['id'] for task in changes], [self.second.id, self.first.id])
+        self.assertEqual(changes[0]['status'], 'completed')
+        self.assertTrue(changes[1]['deleted'])
+        self.assertIsNotNone(changes[1]['deleted_at'])
+
+    def test_limit(self):
+        response = self.client.get(self.url, {'limit': 1})
+        self.assertEqual(len(response.data['changes']), 1)
+        self.assertTrue(response.data['has_more'])
+        response = self.client.get(self.url, {'limit': 1, 'since': response.data['next']})
+        self.assertEqual(response.data['changes'][0]['id'], self.second.id)
+
+    @override_settings(TASK_CHANGES_SETTLE_SECONDS=60)
+    def test_unsettled_changes_are_held_back(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['changes'], [])
+
+    def test_invalid_token(self):
+        response = self.client.get(self.url, {'since': 'bogus'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_malformed_token(self):
+        # Well-encoded tokens whose values do not fit (updated_at, id).
+        encode = ChangeFeedPagination().encode_cursor
+        now = timezone.now().isoformat()
+        for values in [[None, 1], [now, None], [1, now], [now], [now, 1, 2], [now, '1'], [now[:-6], 1], ['not a date', 1]]:
+            with self.subTest(values=values):
+                response = self.client.get(self.url, {'since': encode(values)})
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+                self.assertEqual(response.data['detail'], 'Invalid since token')
+
+    def test_uses_change_index(self):
+        plan = Task.objects.filter(user=self.user, updated_at__gt=timezone.now()).order_by('updated_at', 'id').explain()
+        if connection.vendor == 'sqlite':
+            self.assertIn('USING INDEX task_user_changes_idx', plan)
+            self.assertNotIn('TEMP B-TREE', plan)
+
+
+class TaskExportTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword', email='test@example.com')
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        now = timezone.now()
+        Task.objects.create(user=self.user, name='Pending, "quoted"', description='Line one\nline two', to_be_completed_time=now + timedelta(days=1))
+        Task.objects.create(user=self.user, name='Completed', description='Done', to_be_completed_time=now, completed=True, completion_time=now)
+        Task.objects.create(user=self.user, name='Deleted', description='Gone', to_be_completed_time=now, deleted=True, deleted_at=now)
+        self.url = reverse('export_tasks')
+
+    def expected(self, **filters):
+        tasks = get_task_queryset(self.user, 'created_at', **filters)
+        return json.loads(JSONRenderer().render(TaskSerializer(tasks, many=True).data))
+
+    def test_export_ndjson(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = b''.join(response.streaming_content).decode('utf-8').splitlines()
+        self.assertEqual([json.loads(line) for line in lines], self.expected())
+
+    def test_export_csv_with_filter(self):
+        response = self.client.get(self.url, {'output': 'csv', 'show_pending': 'true'})
+        rows = list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode('utf-8'))))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['name'], 'Pending, "quoted"')
+        self.assertEqual(rows[0]['description'], 'Line one\nline two')
+        self.assertEqual(rows[0]['completed'], 'false')
+        self.assertEqual(rows[0]['completion_time'], '')
+
+    def test_export_gzip(self):
+        response = self.client.get(self.url, {'gzip': 'true'})
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        self.assertIn('.ndjson.gz', response['Content-Disposition'])
+        lines = gzip.decompress(b''.join(response.streaming_content)).decode('utf-8').splitlines()
+        self.assertEqual(len(lines), 2)
+
+    def test_export_invalid_output(self):
+        response = self.client.get(self.url, {'output': 'xml'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class TaskImportTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword', email='test@example.com')
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        self.url = reverse('import_tasks')
+        self.future = (timezone.now() + timedelta(days=1)).strftime('%Y-%m-%dT%H:%M:%SZ')
+        self.past = (timezone.now() - timedelta(days=1)).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+    def test_import_ndjson_body(self):
+        body = '\n'.join([
+            json.dumps({'name': 'First', 'description': 'One', 'to_be_completed_time': self.future}),
+            json.dumps({'name': '', 'description': 'Missing name', 'to_be_completed_time': self.future}),
+            'not json',
+            json.dumps({'name': 'Second', 'description': 'Two', 'to_be_completed_time': self.future}),
+        ])
+        response = self.client.post(self.url, body, content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['rows'], 4)
+        self.assertEqual(response.data['imported'], 2)
+        self.assertEqual(response.data['failed'], 2)
+        self.assertEqual([error['line'] for error in response.data['errors']], [2, 3])
+        self.assertEqual(Task.objects.filter(user=self.user).count(), 2)
+        self.assertEqual(counters.get_summary(self.user.id)['pending'], 2)
+
+    def test_import_csv_upload_with_completed_rows(self):
+        upload = io.BytesIO(
+            'name,description,to_be_completed_time,completed,completion_time\n'
+            f'Old,"Done, long ago",{self.past},true,{self.past}\n'
+            f'New,Pending,{self.future},,\n'.encode('utf-8')
+        )
+        upload.name = 'tasks.csv'
+        response = self.client.post(self.url + '?allow_past=true', {'file': upload}, format='multipart')
+        self.assertEqual(response.data['imported'], 2)
+        old = Task.objects.get(name='Old')
+        self.assertTrue(old.completed)
+        self.assertEqual(old.description, 'Done, long ago')
+        self.assertEqual(old.sort_priority, 0)
+        summary = counters.get_summary(self.user.id)
+        self.assertEqual((summary['pending'], summary['completed']), (1, 1))
+
+    def test_past_due_rejected_without_allow_past(self):
+        body = json.dumps({'name': 'Old', 'description': 'Past', 'to_be_completed_time': self.past})
+        response = self.client.post(self.url, body, content_type='application/x-ndjson')
+        self.assertEqual(response.data['imported'], 0)
+        self.assertEqual(response.data['failed'], 1)
+
+    def test_invalid_format(self):
+        upload = io.BytesIO(b'<tasks/>')
+        upload.name = 'tasks.xml'
+        response = self.client.post(self.url, {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_slow_chunk_is_restamped_before_commit(self):
+        body = json.dumps({'name': 'Late', 'description': 'Slow chunk', 'to_be_completed_time': self.future})
+        self.client.post(self.url, body, content_type='application/x-ndjson')
+        task = Task.objects.get(name='Late')
+        self.assertLess(task.updated_at - task.created_at, timedelta(milliseconds=1))
+
+        with override_settings(TASK_CHANGES_SETTLE_SECONDS=0), mock.patch('tasks.importer.counters.record', side_effect=lambda *args, **kwargs: time.sleep(0.01)):
+            self.client.post(self.url, body.replace('Late', 'Later'), content_type='application/x-ndjson')
+        task = Task.objects.get(name='Later')
+        self.assertGreaterEqual(task.updated_at - task.created_at, timedelta(milliseconds=10))
+
+    def test_decode_error_reports_committed_chunks(self):
+        rows = [json.dumps({'name': f'Task {i}', 'description': 'Imported', 'to_be_completed_time': self.future}).encode('utf-8') for i in range(3)]
+        lines = (line.decode('utf-8') for line in rows + [b'\xff\xfe'])
+        with mock.patch('tasks.importer.events.publish_resync') as publish_resync:
+            report = importer.TaskImporter(self.user, chunk_size=2).run(lines, 'ndjson').as_dict()
+        self.assertEqual((report['imported'], report['error']), (2, 'The file must be UTF-8 encoded.'))
+        self.assertEqual(Task.objects.filter(user=self.user).count(), 2)
+        publish_resync.assert_called_once_with(self.user.id)
+
+        response = self.client.post(self.url, b'\xff\xfe', content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual((response.data['imported'], response.data['error']), (0, 'The file must be UTF-8 encoded.'))
+
+    def test_import_command(self):
+        path = self.id().rsplit('.', 1)[-1] + '.ndjson'
+        with mock.patch('builtins.open', mock.mock_open(read_data='\n'.join([
+            json.dumps({'name': 'Task %d' % i, 'description': 'Imported', 'to_be_completed_time': self.future})
+            for i in range(5)
+        ]))):
+            out = StringIO()
+            call_command('import_tasks', path, user='testuser', chunk_size=2, stdout=out)
+        self.assertIn('Imported 5 of 5 rows', out.getvalue())
+        self.assertEqual(Task.objects.filter(user=self.user).count(), 5)
+        self.assertEqual(TaskCounter.objects.get(user=self.user).open_count, 5)
+
+
+class TaskArchiveTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword', email='test@example.com')
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        now = timezone.now()
+        old = now - timedelta(days=60)
+        self.live = Task.objects.create(user=self.user, name='Live', description='Still here', to_be_completed_time=now + timedelta(days=1))
+        self.recent = Task.objects.create(user=self.user, name='Recent', description='Deleted yesterday', to_be_completed_time=now, deleted=True, deleted_at=now - timedelta(days=1))
+        self.old = Task.objects.create(user=self.user, name='Old', description='Deleted long ago', to_be_completed_time=old, completed=True, completion_time=old, deleted=True, deleted_at=old)
+        Task.objects.filter(id=self.old.id).update(created_at=old, updated_at=old)
+        counters.get_counter(self.user.id)
+
+    def archive(self, **options):
+        out = StringIO()
+        call_command('archive_tasks', stdout=out, **options)
+        return out.getvalue()
+
+    def test_archive_moves_old_tombstones(self):
+        self.assertIn('Archived 1 tasks', self.archive(batch_size=1))
+        self.assertFalse(Task.objects.filter(id=self.old.id).exists())
+        self.assertTrue(Task.objects.filter(id=self.recent.id).exists())
+        archived = TaskArchive.objects.get(id=self.old.id)
+        self.assertEqual(archived.description, 'Deleted long ago')
+        self.assertEqual(counters.get_summary(self.user.id)['deleted'], 2)
+        self.assertEqual(counters.count_tasks(self.user.id)['deleted_count'], 2)
+
+    def test_lookup_archived_task(self):
+        self.archive()
+        response = self.client.get(reverse('get_task', args=[self.old.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data['archived'])
+        self.assertTrue(response.data['deleted'])
+        self.assertEqual(response.data['status'], 'completed')
+
+        response = self.client.get(reverse('get_task', args=[self.live.id]))
+        self.assertFalse(response.data['archived'])
+
+        other = User.objects.create_user(username='other', password='otherpassword')
+        self.client.force_authenticate(other)
+        response = self.client.get(reverse('get_task', args=[self.old.id]))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_restore_archived_task(self):
+        self.archive()
+        response = self.client.post(reverse('restore_task', args=[self.old.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        task = Task.objects.get(id=self.old.id)
+        self.assertFalse(task.deleted)
+        self.assertLess(task.created_at, timezone.now() - timedelta(days=59))
+        self.assertFalse(TaskArchive.objects.filter(id=self.old.id).exists())
+        summary = counters.get_summary(self.user.id)
+        self.assertEqual((summary['completed'], summary['deleted']), (1, 1))
+
+        response = self.client.post(reverse('restore_task', args=[self.old.id]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_purge(self):
+        self.archive()
+        TaskArchive.objects.update(archived_at=timezone.now() - timedelta(days=400))
+        self.assertIn('purged 1 archived tasks', self.archive(purge_days=365))
+        self.assertFalse(TaskArchive.objects.exists())
+        self.assertEqual(counters.get_summary(self.user.id)['deleted'], 1)
+
+        out = StringIO()
+        call_command('reconcile_task_counters', stdout=out)
+        self.assertIn('fixed 0 drifted counters', out.getvalue())
+
+    def test_days_below_window_rejected(self):
+        with self.assertRaises(CommandError):
+            self.archive(days=1)
+
+    @override_settings(TASK_CHANGES_SETTLE_SECONDS=0)
+    def test_change_feed_rejects_expired_token(self):
+        paginator = KeysetPagination(('updated_at', 'id'))
+        expired = paginator.encode_cursor([timezone.now() - timedelta(days=45), 1])
+        response = self.client.get(reverse('task_changes'), {'since': expired})
+        self.assertEqual(response.status_code, status.HTTP_410_GONE)
+
+        fresh = paginator.encode_cursor([timezone.now() - timedelta(days=1), 1])
+        response = self.client.get(reverse('task_changes'), {'since': fresh})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class AsyncTaskViewTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword', email='test@example.com')
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        self.due = (timezone.now() + timedelta(days=1)).strftime('%Y-%m-%dT%H:%M:%SZ')
+        self.task = Task.objects.create(user=self.user, name='Existing', description='Task description', to_be_completed_time=timezone.now() + timedelta(days=2))
+
+    def test_requires_token(self):
+        self.client.credentials()
+        response = self.client.get(reverse('async_list_tasks'))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(response['WWW-Authenticate'], 'Token')
+
+        self.client.credentials(HTTP_AUTHORIZATION='Token bogus')
+        response = self.client.get(reverse('async_list_tasks'))
+        self.assertEqual(response.json(), {'detail': 'Invalid token.'})
+
+    def test_method_not_allowed(self):
+        response = self.client.get(reverse('async_create_task'))
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    def test_crud(self):
+        data = {'name': 'Async', 'description': 'Created async', 'to_be_completed_time': self.due}
+        response = self.client.post(reverse('async_create_task'), data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        task_id = response.json()['id']
+
+        response = self.client.put(reverse('async_update_task', args=[task_id]), {'name': 'Renamed'}, format='json')
+        self.assertEqual(response.json()['name'], 'Renamed')
+
+        response = self.client.post(reverse('async_mark_task_completed', args=[task_id]))
+        self.assertEqual(response.json()['message'], 'Task marked as completed')
+        response = self.client.post(reverse('async_mark_task_completed', args=[task_id]))
+        self.assertEqual(response.json()['message'], 'Task is already completed')
+
+        response = self.client.get(reverse('async_get_task', args=[task_id]))
+        self.assertEqual(response.json()['status'], 'completed')
+
+        response = self.client.delete(reverse('async_soft_delete_task', args=[task_id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.delete(reverse('async_soft_delete_task', args=[task_id]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        summary = counters.get_summary(self.user.id)
+        self.assertEqual((summary['pending'], summary['completed'], summary['deleted']), (1, 0, 1))
+
+    def test_other_users_task(self):
+        other = User.objects.create_user(username='other', password='otherpassword')
+        task = Task.objects.create(user=other, name='Theirs', description='Not mine', to_be_completed_time=timezone.now())
+        response = self.client.put(reverse('async_update_task', args=[task.id]), {'name': 'Mine'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        response = self.client.post(reverse('async_mark_task_completed', args=[task.id]))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_list_matches_sync_view(self):
+        for i in range(6):
+            Task.objects.create(user=self.user, name=f'Task {i}', description='Listed', to_be_completed_time=timezone.now() + timedelta(hours=i))
+        for params in [{}, {'page': 2}, {'sort_by': 'to_be_completed_time', 'page_size': 3}, {'show_pending': 'true'}]:
+            expected = self.client.get(reverse('list_tasks'), params).json()
+            actual = self.client.get(reverse('async_list_tasks'), params).json()
+            self.assertEqual(actual['count'], expected['count'])
+            self.assertEqual(actual['results'], expected['results'])
+            self.assertEqual(actual['next'] is None, expected['next'] is None)
+
+        response = self.client.get(reverse('async_list_tasks'), {'page': 9})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_get_matches_sync_view(self):
+        now = timezone.now()
+        archived = Task.objects.create(user=self.user, name='Old', description='Archived', to_be_completed_time=now, deleted=True, deleted_at=now - timedelta(days=90))
+        TaskArchive.from_task(archived, now).save()
+        Task.objects.filter(id=archived.id).delete()
+
+        for task_id in (self.task.id, archived.id):
+            expected = self.client.get(reverse('get_task', args=[task_id]))
+            actual = self.client.get(reverse('async_get_task', args=[task_id]))
+            self.assertEqual(actual.status_code, expected.status_code)
+            self.assertEqual(actual.json(), expected.json())
+        self.assertTrue(actual.json()['archived'])
+
+
+class ConnectionPoolTests(SimpleTestCase):
+    class FakeConnection:
+        closed = False
+
+        def close(self):
+            self.closed = True
+
+    def make_pool(self, **kwargs):
+        return ConnectionPool(self.FakeConnection, **kwargs)
+
+    def test_reuses_released_connections(self):
+        pool = self.make_pool(max_size=2)
+        first = pool.acquire()
+        pool.release(first)
+        self.assertIs(pool.acquire(), first)
+        stats = pool.stats()
+        self.assertEqual((stats['checkouts'], stats['connections_opened'], stats['in_use']), (2, 1, 1))
+
+    def test_bounded_size_times_out(self):
+        pool = self.make_pool(max_size=1, timeout=0.05)
+        pool.acquire()
+        with self.assertRaises(PoolTimeout):
+            pool.acquire()
+        self.assertEqual(pool.stats()['timeouts'], 1)
+
+    def test_waiter_gets_released_connection(self):
+        pool = self.make_pool(max_size=1, timeout=5)
+        held = pool.acquire()
+        timer = threading.Timer(0.05, pool.release, [held])
+        timer.start()
+        self.assertIs(pool.acquire(), held)
+        timer.join()
+        stats = pool.stats()
+        self.assertEqual(stats['waits'], 1)
+        self.assertGreater(stats['max_wait_time'], 0)
+
+    def test_unhealthy_and_rejected_connections_are_replaced(self):
+        pool = self.make_pool(max_size=1, check=lambda connection: False, check_after=0)
+        stale = pool.acquire()
+        pool.release(stale)
+        fresh = pool.acquire()
+        self.assertIsNot(fresh, stale)
+        self.assertTrue(stale.closed)
+
+        pool.reset = lambda connection: False
+        pool.release(fresh)
+        self.assertTrue(fresh.closed)
+        self.assertEqual(pool.stats()['size'], 0)
+
+
+@receiver(setting_changed)
+def reload_database_settings(setting, value, **kwargs):
+    # django.db.connections reads DATABASES once; let override_settings reach it.
+    if setting == 'DATABASES':
+        for alias in set(connections) - set(value or settings.DATABASES):
+            connections[alias].close()
+            del connections[alias]
+        connections.__dict__.pop('settings', None)
+        connections._settings = None
+
+
+class ReplicaRoutingTests(APITransactionTestCase):
+    # Not wrapped in a transaction: the replica is a second connection to the
+    # test database and only sees committed rows, and reads inside a
+    # transaction always go to the primary.
+
+    @classmethod
+    def setUpClass(cls):
+        # Built here rather than in a class decorator, once the test database
+        # exists, so the mirror gets its name. The alias only exists from here
+        # on, so the test runner must not see it in ``databases``.
+        replica = {**settings.DATABASES['default'], 'TEST': {'MIRROR': 'default'}}
+        with warnings.catch_warnings():
+            warnings.filterwarnings('ignore', 'Overriding setting DATABASES')
+            cls.enterClassContext(override_settings(DATABASES={**settings.DATABASES, 'replica': replica}, REPLICA_DATABASE='replica'))
+        cls.databases = {'default', 'replica'}
+        super().setUpClass()
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpassword', email='test@example.com')
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        Task.objects.create(user=self.user, name='Existing', description='Task', to_be_completed_time=timezone.now() + timedelta(days=1))
+
+    def task_reads(self, request):
+        """Return the aliases that read the task table while making ``request``."""
+        captured = {}
+        for alias in ('default', 'replica'):
+            context = CaptureQueriesContext(connections[alias])
+            context.__enter__()
+            self.addCleanup(context.__exit__, None, None, None)
+            captured[alias] = context
+        response = request()
+        for context in captured.values():
+            context.__exit__(None, None, None)
+        self.assertLess(response.status_code, 400)
+        return {alias for alias, context in captured.items() if any('"tasks_task"' in query['sql'] for query in context.captured_queries)}
+
+    def list_tasks(self):
+        return self.client.get(reverse('list_tasks'))
+
+    def test_safe_views_read_from_replica(self):
+        self.assertEqual(self.task_reads(self.list_tasks), {'replica'})
+        response = self.client.get(reverse('task_summary'))
+        self.assertEqual(response.data['total'], 1)
+
+    def test_writes_pin_user_to_primary(self):
+        due = (timezone.now() + timedelta(days=1)).strftime('%Y-%m-%dT%H:%M:%SZ')
+        response = self.client.post(reverse('create_task'), {'name': 'New', 'description': 'Written', 'to_be_completed_time': due}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        self.assertEqual(self.task_reads(self.list_tasks), {'default'})
+
+        # Once the pin expires reads go back to the replica.
+        cache.clear()
+        self.assertEqual(self.task_reads(self.list_tasks), {'replica'})
+
+    def test_failed_write_does_not_pin(self):
+        self.client.post(reverse('create_task'), {'name': 'Bad'}, format='json')
+        self.assertEqual(self.task_reads(self.list_tasks), {'replica'})
+
+    def test_unmarked_views_and_transactions_use_primary(self):
+        def export():
+            response = self.client.get(reverse('export_tasks'))
+            b''.join(response.streaming_content)
+            return response
+
+        self.assertEqual(self.task_reads(export), {'default'})
+
+        router = ReplicaRouter()
+        token = routers._use_replica.set(True)
+        try:
+            self.assertEqual(router.db_for_read(Task), 'replica')
+            self.assertEqual(router.db_for_read(Token), 'default')
+            with transaction.atomic():
+                self.assertEqual(router.db_for_read(Task), 'default')
+            self.assertEqual(router.db_for_write(Task), 'default')
+        finally:
+            routers._use_replica.reset(token)
+
+    def test_pin_middleware_runs_async(self):
+        async def view(request):
+            return HttpResponse(status=request.status)
+
+        middleware = PrimaryPinMiddleware(view)
+        self.assertTrue(iscoroutinefunction(middleware))
+        request = RequestFactory().get('/')
+        request.user, request.status = self.user, 200
+        async_to_sync(middleware)(request)
+        self.assertFalse(routers.is_pinned(self.user.id))
+
+        request = RequestFactory().post('/')
+        request.user, request.status = self.user, 201
+        async_to_sync(middleware)(request)
+        self.assertTrue(routers.is_pinned(self.user.id))
+
+
+class ReplicaPinCacheCheckTests(SimpleTestCase):
+    def test_requires_shared_pin_cache(self):
+        locmem = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+        redis = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://localhost:6379'}}
+        with override_settings(REPLICA_DATABASE=None, CACHES=locmem):
+            self.assertEqual(routers.check_pin_cache(None), [])
+        with override_settings(REPLICA_DATABASE='replica', CACHES=locmem):
+            self.assertEqual([error.id for error in routers.check_pin_cache(None)], ['task_manager.E001'])
+        with override_settings(REPLICA_DATABASE='replica', REPLICA_PIN_CACHE='pins', CACHES=redis):
+            self.assertEqual([error.id for error in routers.check_pin_cache(None)], ['task_manager.E001'])
+        with override_settings(REPLICA_DATABASE='replica', CACHES=redis):
+            self.assertEqual(routers.check_pin_cache(None), [])
+
+
+class TaskSearchTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword', email='test@example.com')
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        now = timezone.now()
+        due = now + timedelta(days=1)
+        self.standup = Task.objects.create(user=self.user, name='Team meeting', description='Weekly standup', to_be_completed_time=due)
+        self.review = Task.objects.create(user=self.user, name='Review notes', description='From the planning meeting', to_be_completed_time=due, completed=True, completion_time=now)
+        Task.objects.create(user=self.user, name='Groceries', description='Milk and eggs', to_be_completed_time=due)
+        Task.objects.create(user=self.user, name='Old meeting', description='Deleted', to_be_completed_time=due, deleted=True, deleted_at=now)
+        other = User.objects.create_user(username='other', password='otherpassword')
+        Task.objects.create(user=other, name='Their meeting', description='Not mine', to_be_completed_time=due)
+        self.url = reverse('search_tasks')
+
+    def search(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response
+
+    def test_prefix_match(self):
+        response = self.search(q='meet')
+        self.assertEqual({task['id'] for task in response.data['results']}, {self.standup.id, self.review.id})
+        self.assertIn('rank', response.data['results'][0])
+
+    def test_all_terms_must_match(self):
+        response = self.search(q='meeting plan')
+        self.assertEqual([task['id'] for task in response.data['results']], [self.review.id])
+
+    def test_filters(self):
+        response = self.search(q='meeting', show_completed='true')
+        self.assertEqual([task['id'] for task in response.data['results']], [self.review.id])
+        response = self.search(q='meeting', show_pending='true')
+        self.assertEqual([task['id'] for task in response.data['results']], [self.standup.id])
+
+    def test_keyset_pagination(self):
+        first = self.search(q='meeting', page_size=1)
+        self.assertEqual(len(first.data['results']), 1)
+        second = self.client.get(first.data['next'])
+        self.assertEqual(len(second.data['results']), 1)
+        self.assertIsNone(second.data['next'])
+        self.assertNotEqual(first.data['results'][0]['id'], second.data['results'][0]['id'])
+
+    def test_keyset_pagination_through_tied_ranks(self):
+        due = timezone.now() + timedelta(days=1)
+        tied = {Task.objects.create(user=self.user, name='Sync meeting', description='Same text', to_be_completed_time=due).id for _ in range(5)}
+        seen = []
+        response = self.search(q='sync meeting', page_size=1)
+        while True:
+            seen.extend(task['id'] for task in response.data['results'])
+            if not response.data['next']:
+                break
+            response = self.client.get(response.data['next'])
+        self.assertEqual(seen, sorted(tied, reverse=True))
+
+    def test_query_required(self):
+        response = self.client.get(self.url, {'q': ' :* & '})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class LoggingPipelineTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def make_logger(self, handler):
+        logger = logging.getLogger(f'tests.{self.id()}')
+        logger.handlers = [handler]
+        logger.setLevel(logging.DEBUG)
+        logger.propagate = False
+        return logger
+
+    def test_queue_handler_writes_json_lines(self):
+        handler = QueueHandler(os.path.join(self.directory, 'app.log'))
+        self.addCleanup(handler.close)
+        handler.setFormatter(JSONFormatter())
+        logger = self.make_logger(handler)
+        args = ['before']
+        logger.info('Task created by %s', args, extra={'task_id': 7})
+        args[0] = 'after'
+        handler.flush()
+
+        with open(os.path.join(self.directory, 'app.log')) as log_file:
+            entry = json.loads(log_file.readline())
+        self.assertEqual(entry['message'], "Task created by ['before']")
+        self.assertEqual(entry['level'], 'INFO')
+        self.assertEqual(entry['task_id'], 7)
+
+    def test_other_handlers_see_the_original_record(self):
+        handler = QueueHandler(os.path.join(self.directory, 'app.log'))
+        self.addCleanup(handler.close)
+        logger = self.make_logger(handler)
+        seen = []
+        other = logging.Handler()
+        other.emit = lambda record: seen.append((record.msg, record.args))
+        logger.addHandler(other)
+        logger.info('Task %s created', 7)
+        self.assertEqual(seen, [('Task %s created', (7,))])
+
+    def test_reopens_file_after_external_rotation(self):
+        path = os.path.join(self.directory, 'app.log')
+        handler = QueueHandler(path)
+        self.addCleanup(handler.close)
+        logger = self.make_logger(handler)
+        logger.info('Before rotation')
+        handler.flush()
+        os.rename(path, path + '.1')
+        logger.info('After rotation')
+        handler.flush()
+
+        with open(path + '.1') as rotated, open(path) as current:
+            self.assertIn('Before rotation', rotated.read())
+            self.assertIn('After rotation', current.read())
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        handler = QueueHandler(os.path.join(self.directory, 'app.log'), queue_size=1)
+        self.addCleanup(handler.close)
+        handler.listener.stop()
+        logger = self.make_logger(handler)
+        for i in range(3):
+            logger.info('Message %s', i)
+        self.assertEqual(handler.dropped, 2)
+
+    def test_rate_limit_filter(self):
+        rate_limit = RateLimitFilter(rate=2, per=60)
+        records = [
+            logging.LogRecord('myapp', logging.INFO, __file__, 1, 'Task created successfully by user %s', (i,), None)
+            for i in range(5)
+        ]
+        self.assertEqual([rate_limit.filter(record) for record in records], [True, True, False, False, False])
+
+        error = logging.LogRecord('myapp', logging.ERROR, __file__, 1, 'Task created successfully by user %s', (0,), None)
+        self.assertTrue(rate_limit.filter(error))
+
+        rate_limit.per = 0
+        record = logging.LogRecord('myapp', logging.INFO, __file__, 1, 'Task created successfully by user %s', (9,), None)
+        self.assertTrue(rate_limit.filter(record))
+        self.assertEqual(record.suppressed, 3)
+
+
+class MetricsTests(APITestCase):
+    def setUp(self):
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+        self.user = User.objects.create_user(username='metricsuser', password='testpassword', email='metrics@example.com')
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        Task.objects.create(user=self.user, name='Measured', description='', to_be_completed_time=timezone.now())
+
+    def test_records_view_timings(self):
+        response = self.client.get(reverse('list_tasks'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(connection.execute_wrappers, [])
+
+        labels = ('tasks.views.list_tasks', 'GET')
+        self.assertEqual(metrics.request_duration.labels(*labels).count, 1)
+        self.assertGreater(metrics.db_queries.labels(*labels).sum, 0)
+        self.assertGreater(metrics.serialize_duration.labels(*labels).sum, 0)
+        self.assertEqual(metrics.response_size.labels(*labels).sum, len(response.content))
+
+    def test_metrics_endpoint_is_admin_only(self):
+        self.client.get(reverse('task_summary'))
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, status.HTTP_403_FORBIDDEN)
+
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        body = response.content.decode()
+        self.assertIn('http_request_duration_seconds_count{view="tasks.views.task_summary",method="GET"} 1', body)
+        self.assertIn('# TYPE token_cache_hits gauge', body)
+
+    async def test_records_async_views_without_adapting(self):
+        async def view(request):
+            return HttpResponse()
+
+        self.assertTrue(iscoroutinefunction(MetricsMiddleware(view)))
+        self.assertTrue(iscoroutinefunction(MetricsMiddleware(view).process_view))
+
+        response = await self.async_client.get(reverse('async_list_tasks'), headers={'Authorization': 'Token ' + self.token.key})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(connection.execute_wrappers, [])
+
+        labels = ('tasks.async_views.list_tasks', 'GET')
+        self.assertEqual(metrics.request_duration.labels(*labels).count, 1)
+        self.assertGreater(metrics.db_queries.labels(*labels).sum, 0)
+        self.assertEqual(metrics.response_size.labels(*labels).sum, len(response.content))
+
+    @override_settings(METRICS={'ENABLED': True, 'VIEW_MODULES': ['tasks.views'], 'SLOW_REQUEST_MS': 0})
+    def test_slow_request_log_includes_sql(self):
+        with self.assertLogs('myapp', 'WARNING') as logs:
+            self.client.get(reverse('list_tasks'))
+        self.assertIn('Slow request GET /tasks/list/', logs.output[0])
+        self.assertIn('SELECT', logs.output[0])
+
+    @override_settings(METRICS={'ENABLED': False, 'VIEW_MODULES': ['tasks.views'], 'SLOW_REQUEST_MS': None})
+    def test_disabled(self):
+        self.client.get(reverse('list_tasks'))
+        self.assertEqual(metrics.request_duration.children, {})
+
+
+class TaskFieldsetTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='fielduser', password='testpassword', email='fields@example.com')
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        now = timezone.now()
+        for i in range(3):
+            Task.objects.create(user=self.user, name=f'Task {i}', description='x' * 5000, to_be_completed_time=now + timedelta(days=i - 1))
+        self.url = reverse('list_tasks')
+
+    def test_fields_limits_keys_and_columns(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, {'fields': 'id,name,status'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([set(task) for task in response.data['results']], [{'id', 'name', 'status'}] * 3)
+        self.assertEqual({task['status'] for task in response.data['results']}, {'pending', 'delayed'})
+        task_selects = [query['sql'] for query in queries.captured_queries if 'FROM "tasks_task"' in query['sql'] and 'COUNT' not in query['sql']]
+        self.assertTrue(task_selects)
+        self.assertFalse(any('"description"' in sql for sql in task_selects))
+
+    def test_summary_view(self):
+        full = self.client.get(self.url)
+        summary = self.client.get(self.url, {'view': 'summary'})
+        self.assertEqual(list(summary.data['results'][0]), SUMMARY_FIELDS)
+        for full_task, summary_task in zip(full.data['results'], summary.data['results']):
+            self.assertEqual(summary_task, {name: full_task[name] for name in SUMMARY_FIELDS})
+        self.assertLess(len(summary.content), len(full.content) / 10)
+
+    def test_fields_with_cursor(self):
+        response = self.client.get(self.url, {'fields': 'name', 'cursor': '', 'page_size': 2})
+        self.assertEqual(response.data['results'], [{'name': 'Task 2'}, {'name': 'Task 1'}])
+        next_page = self.client.get(response.data['next'])
+        self.assertEqual(next_page.data['results'], [{'name': 'Task 0'}])
+
+    def test_invalid_fields(self):
+        for params in [{'fields': 'name,password'}, {'fields': ','}, {'view': 'tiny'}, {'view': 'summary', 'fields': 'id'}]:
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
+
+
+class TaskEventTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='eventuser', password='testpassword', email='events@example.com')
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        self.broker = events.get_broker()
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+
+    def subscribe(self, user_id, buffer_size=100):
+        subscription = self.broker.subscribe(user_id, buffer_size, loop=self.loop)
+        self.addCleanup(self.broker.unsubscribe, subscription)
+        return subscription
+
+    def received(self, subscription):
+        # Run the callbacks queued by Broker.deliver.
+        self.loop.run_until_complete(asyncio.sleep(0))
+        return list(subscription.events)
+
+    def test_write_views_publish_on_commit(self):
+        subscription = self.subscribe(self.user.id)
+        other = self.subscribe(self.user.id + 1000)
+        due = (timezone.now() + timedelta(days=1)).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            task_id = self.client.post(reverse('create_task'), {'name': 'Live', 'description': 'Pushed', 'to_be_completed_time': due}, format='json').data['id']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.put(reverse('update_task', args=[task_id]), {'name': 'Renamed'}, format='json')
+            self.client.post(reverse('mark_task_completed', args=[task_id]))
+            self.client.delete(reverse('soft_delete_task', args=[task_id]))
+
+        received = self.received(subscription)
+        self.assertEqual([event['type'] for event in received], ['task.created', 'task.updated', 'task.completed', 'task.deleted'])
+        self.assertEqual({event['id'] for event in received}, {task_id})
+        self.assertEqual(received[1]['task']['name'], 'Renamed')
+        self.assertNotIn('description', received[0]['task'])
+        self.assertEqual(self.received(other), [])
+
+    def test_nothing_published_without_commit(self):
+        subscription = self.subscribe(self.user.id)
+        task = Task.objects.create(user=self.user, name='Rolled back', description='', to_be_completed_time=timezone.now())
+        with self.captureOnCommitCallbacks(execute=False):
+            self.client.post(reverse('mark_task_completed', args=[task.id]))
+        self.assertEqual(self.received(subscription), [])
+
+    def test_full_buffer_becomes_resync(self):
+        subscription = self.subscribe(self.user.id, buffer_size=3)
+        for i in range(5):
+            self.broker.deliver(self.user.id, {'type': 'task.updated', 'id': i})
+        self.assertEqual(self.received(subscription), [events.RESYNC, {'type': 'task.updated', 'id': 4}])
+        self.assertEqual(subscription.dropped, 3)
+
+    def test_stream_frames(self):
+        async def read():
+            stream = events.stream(self.user.id, buffer_size=10, heartbeat=0.01, max_seconds=5)
+            frames = [await anext(stream), await anext(stream)]
+            self.broker.deliver(self.user.id, {'type': 'task.deleted', 'id': 7})
+            frames.append(await anext(stream))
+            await stream.aclose()
+            return frames
+
+        frames = asyncio.run(read())
+        self.assertEqual(frames[0], f'retry: {events.RETRY_MS}\n\n')
+        self.assertEqual(frames[1], ': heartbeat\n\n')
+        self.assertEqual(frames[2], 'event: task.deleted\ndata: {"type": "task.deleted", "id": 7}\n\n')
+        self.assertEqual(self.broker.stats()['streams'], 0)
+
+    def test_requires_token(self):
+        self.client.credentials()
+        response = self.client.get(reverse('async_task_events'))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    async def test_event_stream_response(self):
+        response = await self.async_client.get(reverse('async_task_events'), headers={'Authorization': 'Token ' + self.token.key})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertEqual(await anext(response.streaming_content), f'retry: {events.RETRY_MS}\n\n'.encode())
+        await response.streaming_content.aclose()
+
+
+class TaskReminderTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='reminderuser', password='testpassword', email='reminders@example.com')
+        self.now = timezone.now()
+        self.soon = self.create('Soon', minutes=10)
+        self.later = self.create('Later', minutes=120)
+        self.overdue = self.create('Overdue', minutes=-5)
+        self.stale = self.create('Stale', minutes=-180)
+        self.create('Done', minutes=5, completed=True, completion_time=self.now)
+        self.create('Deleted', minutes=5, deleted=True, deleted_at=self.now)
+
+    def create(self, name, minutes, **fields):
+        return Task.objects.create(user=self.user, name=name, description='', to_be_completed_time=self.now + timedelta(minutes=minutes), **fields)
+
+    def scheduler(self):
+        return ReminderScheduler(
+            lead=timedelta(minutes=30), window=timedelta(minutes=10), catch_up=timedelta(minutes=60), rescan=timedelta(seconds=60),
+        )
+
+    def tick(self, scheduler, minutes=0):
+        return {(task_id, kind) for task_id, kind, _ in scheduler.tick(self.now + timedelta(minutes=minutes))}
+
+    def test_due_soon_and_overdue(self):
+        scheduler = self.scheduler()
+        self.assertEqual(self.tick(scheduler), {(self.soon.id, 'due_soon'), (self.overdue.id, 'overdue')})
+        self.assertEqual(self.tick(scheduler, minutes=5), set())
+        self.assertEqual(self.tick(scheduler, minutes=11), {(self.soon.id, 'overdue')})
+        self.assertEqual(self.tick(scheduler, minutes=91), {(self.later.id, 'due_soon')})
+        self.assertEqual(ReminderEvent.objects.count(), 4)
+        self.assertEqual(ReminderEvent.objects.get(task=self.soon, kind='overdue').due_at, self.soon.to_be_completed_time)
+
+    def test_only_tasks_due_in_window_are_loaded(self):
+        Task.objects.bulk_create([
+            Task(user=self.user, name=f'Far {i}', description='', to_be_completed_time=self.now + timedelta(days=1 + i))
+            for i in range(50)
+        ])
+        scheduler = self.scheduler()
+        scheduler.tick(self.now)
+        self.assertEqual({task_id for _, task_id, _, _ in scheduler.heap}, {self.soon.id})
+        self.assertLess(scheduler.loaded_until, self.now + timedelta(hours=1))
+
+    def test_recording_is_idempotent(self):
+        self.assertEqual(len(self.scheduler().tick(self.now)), 2)
+        # A restarted scheduler sees the same tasks again.
+        self.assertEqual(self.scheduler().tick(self.now + timedelta(minutes=1)), [])
+        self.assertEqual(ReminderEvent.objects.count(), 2)
+
+    def test_rescan_picks_up_new_and_moved_due_dates(self):
+        scheduler = self.scheduler()
+        self.tick(scheduler)
+        created = self.create('Created later', minutes=3)
+        self.soon.to_be_completed_time = self.now + timedelta(minutes=4)
+        self.soon.save()
+
+        self.assertEqual(self.tick(scheduler, minutes=2), {(created.id, 'due_soon'), (self.soon.id, 'due_soon')})
+        # The reminder for the old due time is dropped when it comes up.
+        self.assertEqual(self.tick(scheduler, minutes=5), {(created.id, 'overdue'), (self.soon.id, 'overdue')})
+        self.assertEqual(self.tick(scheduler, minutes=11), set())
+
+    def test_completed_task_gets_no_reminder(self):
+        scheduler = self.scheduler()
+        self.tick(scheduler)
+        self.soon.completed = True
+        self.soon.completion_time = self.now
+        self.soon.save()
+        self.assertEqual(self.tick(scheduler, minutes=11), set())
+
+    def test_reminders_are_published(self):
+        with mock.patch('tasks.reminders.events.publish') as publish:
+            self.scheduler().tick(self.now)
+        publish.assert_any_call(self.user.id, 'due_soon', self.soon.id, due_at=self.soon.to_be_completed_time)
+        publish.assert_any_call(self.user.id, 'overdue', self.overdue.id, due_at=self.overdue.to_be_completed_time)
+
+    def test_run_reminders_command(self):
+        out = StringIO()
+        call_command('run_reminders', once=True, stdout=out)
+        self.assertIn('Recorded 2 reminders', out.getvalue())
+
+
+class TaskDateFilterTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='calendaruser', password='testpassword', email='calendar@example.com')
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        # Asia/Kolkata is UTC+5:30, so 20:00 UTC on Oct 2 is already Oct 3 there.
+        self.early = self.create('Early', '2026-10-01T10:00:00Z')
+        self.late_evening = self.create('Late evening', '2026-10-02T20:00:00Z')
+        self.done = self.create('Done', '2026-10-03T09:00:00Z', completion='2026-10-05T12:00:00Z')
+        self.next_month = self.create('Next month', '2026-11-01T10:00:00Z')
+        self.create('Deleted', '2026-10-03T09:00:00Z', deleted=True)
+        other = User.objects.create_user(username='othercalendar', password='testpassword')
+        Task.objects.create(user=other, name='Other', description='', to_be_completed_time=parse_datetime('2026-10-03T09:00:00Z'))
+
+    def create(self, name, due, completion=None, **fields):
+        if completion:
+            fields.update(completed=True, completion_time=parse_datetime(completion))
+        return Task.objects.create(user=self.user, name=name, description='', to_be_completed_time=parse_datetime(due), **fields)
+
+    def list_names(self, **params):
+        response = self.client.get(reverse('list_tasks'), {'sort_by': 'to_be_completed_time', 'page_size': 100, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [task['name'] for task in response.data['results']]
+
+    def test_due_filters(self):
+        self.assertEqual(self.list_names(due_after='2026-10-02T00:00:00Z', due_before='2026-11-01T10:00:00Z'), ['Done', 'Late evening'])
+        # Bare dates are midnight in Asia/Kolkata.
+        self.assertEqual(self.list_names(due_after='2026-10-03'), ['Next month', 'Done', 'Late evening'])
+        self.assertEqual(self.list_names(due_before='2026-10-02'), ['Early'])
+
+    def test_completed_filters(self):
+        self.assertEqual(self.list_names(completed_after='2026-10-05'), ['Done'])
+        self.assertEqual(self.list_names(completed_after='2026-10-06'), [])
+        self.assertEqual(self.list_names(completed_before='2026-10-06'), ['Done'])
+
+    def test_invalid_date(self):
+        response = self.client.get(reverse('list_tasks'), {'due_after': 'yesterday'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('due_after', response.data['error'])
+
+    def test_calendar_counts_per_local_day(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('task_calendar'), {'start': '2026-10-01', 'end': '2026-10-31'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['timezone'], 'Asia/Kolkata')
+        self.assertEqual([(str(day['date']), day['count'], day['completed']) for day in response.data['days']], [
+            ('2026-10-01', 1, 0),
+            ('2026-10-03', 2, 1),
+        ])
+        # Besides the ETag validator lookup, one aggregate query.
+        aggregates = [query['sql'] for query in queries.captured_queries if 'GROUP BY' in query['sql']]
+        self.assertEqual(len(aggregates), 1)
+        self.assertIn('"tasks_task"."user_id" = %s' % self.user.id, aggregates[0])
+
+    def test_calendar_query_uses_index(self):
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        for field in ['due', 'completed']:
+            plan = get_calendar_queryset(self.user, field, date(2026, 10, 1), date(2026, 10, 31), timezone.get_current_timezone()).explain()
+            with self.subTest(field=field):
+                if connection.vendor == 'sqlite':
+                    self.assertIn('USING INDEX task_user_', plan)
+                elif connection.vendor == 'postgresql':
+                    self.assertIn('Index', plan)
+
+    def test_calendar_completed_field_and_tz(self):
+        response = self.client.get(reverse('task_calendar'), {'start': '2026-10-01', 'end': '2026-10-31', 'field': 'completed'})
+        self.assertEqual([(str(day['date']), day['count']) for day in response.data['days']], [('2026-10-05', 1)])
+
+        response = self.client.get(reverse('task_calendar'), {'start': '2026-10-01', 'end': '2026-10-31', 'tz': 'UTC'})
+        self.assertEqual([(str(day['date']), day['count']) for day in response.data['days']], [
+            ('2026-10-01', 1), ('2026-10-02', 1), ('2026-10-03', 1),
+        ])
+
+    def test_calendar_validation(self):
+        url = reverse('task_calendar')
+        for params in [{}, {'start': '2026-10-01'}, {'start': '2026-10-31', 'end': '2026-10-01'},
+                       {'start': '2026-01-01', 'end': '2027-06-01'}, {'start': '2026-10-01', 'end': '2026-10-31', 'field': 'created'},
+                       {'start': '2026-10-01', 'end': '2026-10-31', 'tz': 'Mars/Olympus'}]:
+            self.assertEqual(self.client.get(url, params).status_code, status.HTTP_400_BAD_REQUEST, params)
+
+
+class TaskResponseCacheTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='cacheuser', password='testpassword', email='cache@example.com')
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        response_cache.response_cache.clear()
+        self.addCleanup(response_cache.response_cache.clear)
+        now = timezone.now()
+        self.task = Task.objects.create(user=self.user, name='Cached', description='', to_be_completed_time=now + timedelta(days=1))
+        Task.objects.create(user=self.user, name='Other', description='', to_be_completed_time=now + timedelta(days=2))
+        counters.record(self.user.id, opened=2)
+
+    def list_tasks(self, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('list_tasks'), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        task_reads = [query['sql'] for query in queries.captured_queries if 'FROM "tasks_task"' in query['sql']]
+        return response.data, task_reads
+
+    def test_repeated_list_is_served_from_cache(self):
+        hits = response_cache.get_stats()['hits']
+        first, first_reads = self.list_tasks(sort_by='to_be_completed_time')
+        second, second_reads = self.list_tasks(sort_by='to_be_completed_time')
+        self.assertEqual(first, second)
+        # Only the validator probe is left on a hit.
+        self.assertEqual(len(second_reads), 1)
+        self.assertLess(len(second_reads), len(first_reads))
+        self.assertEqual(response_cache.get_stats()['hits'], hits + 1)
+
+        other, _ = self.list_tasks(sort_by='created_at')
+        self.assertEqual([task['name'] for task in other['results']], ['Other', 'Cached'])
+
+    def test_write_views_invalidate(self):
+        due = (timezone.now() + timedelta(days=3)).strftime('%Y-%m-%dT%H:%M:%SZ')
+        self.list_tasks()
+
+        self.client.post(reverse('create_task'), {'name': 'New', 'description': 'Fresh', 'to_be_completed_time': due}, format='json')
+        data, _ = self.list_tasks()
+        self.assertEqual(data['count'], 3)
+
+        self.client.put(reverse('update_task', args=[self.task.id]), {'name': 'Renamed'}, format='json')
+        data, _ = self.list_tasks()
+        self.assertIn('Renamed', [task['name'] for task in data['results']])
+
+        self.client.post(reverse('mark_task_completed', args=[self.task.id]))
+        data, _ = self.list_tasks(show_completed='true')
+        self.assertEqual([task['name'] for task in data['results']], ['Renamed'])
+
+        self.client.delete(reverse('soft_delete_task', args=[self.task.id]))
+        data, _ = self.list_tasks()
+        self.assertEqual(data['count'], 2)
+
+    def test_status_flip_changes_key(self):
+        data, _ = self.list_tasks()
+        self.assertEqual({task['status'] for task in data['results']}, {'pending'})
+        # No write goes through the views, but the task is now overdue.
+        Task.objects.filter(id=self.task.id).update(to_be_completed_time=timezone.now() - timedelta(minutes=1))
+        data, _ = self.list_tasks()
+        self.assertIn('delayed', {task['status'] for task in data['results']})
+
+    def test_summary_is_cached_and_invalidated(self):
+        url = reverse('task_summary')
+        self.assertEqual(self.client.get(url).data['pending'], 2)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get(url).data['pending'], 2)
+        self.assertFalse(any('COUNT(' in query['sql'] for query in queries.captured_queries))
+
+        self.client.post(reverse('mark_task_completed', args=[self.task.id]))
+        summary = self.client.get(url).data
+        self.assertEqual((summary['pending'], summary['completed']), (1, 1))
+
+    def test_shared_tier(self):
+        with mock.patch.dict(response_cache.RESPONSE_CACHE, {'SHARED_CACHE': 'default'}):
+            cache.clear()
+            first, _ = self.list_tasks()
+            # Another process has the entry only in the shared cache.
+            response_cache.response_cache.clear()
+            second, task_reads = self.list_tasks()
+            self.assertEqual(first, second)
+            self.assertEqual(len(task_reads), 1)
+            self.assertGreaterEqual(response_cache.get_stats()['shared_hits'], 1)
+
+    def test_stats_endpoint_requires_admin(self):
+        url = reverse('response_cache_stats')
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('hit_rate', response.data)
+
+
+class TaskAdminCounterTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username='admin', password='adminpassword', email='admin@example.com')
+        self.user = User.objects.create_user(username='owner', password='testpassword', email='owner@example.com')
+        self.client.force_login(self.admin)
+        due = timezone.now() + timedelta(days=1)
+        self.task = Task.objects.create(user=self.user, name='Admin edited', description='Edit me', to_be_completed_time=due)
+        self.other = Task.objects.create(user=self.user, name='Admin deleted', description='Delete me', to_be_completed_time=due)
+        counters.record(self.user.id, opened=2)
+
+    def version(self):
+        return TaskCounter.objects.get(user=self.user).version
+
+    def test_change_form_updates_counters(self):
+        version = self.version()
+        local_due = timezone.localtime(self.task.to_be_completed_time)
+        response = self.client.post(reverse('admin:tasks_task_change', args=[self.task.id]), {
+            'user': self.user.id,
+            'name': 'Admin edited',
+            'description': 'Edit me',
+            'to_be_completed_time_0': local_due.strftime('%Y-%m-%d'),
+            'to_be_completed_time_1': local_due.strftime('%H:%M:%S'),
+            'completed': 'on',
+        })
+        self.assertEqual(response.status_code, 302)
+        counter = TaskCounter.objects.get(user=self.user)
+        self.assertEqual((counter.open_count, counter.completed_count), (1, 1))
+        self.assertGreater(counter.version, version)
+
+    def test_delete_updates_counters(self):
+        version = self.version()
+        response = self.client.post(reverse('admin:tasks_task_delete', args=[self.other.id]), {'post': 'yes'})
+        self.assertEqual(response.status_code, 302)
+        response = self.client.post(reverse('admin:tasks_task_changelist'), {
+            'action': 'delete_selected', '_selected_action': [self.task.id], 'post': 'yes',
+        })
+        self.assertEqual(response.status_code, 302)
+        counter = TaskCounter.objects.get(user=self.user)
+        self.assertEqual(counter.open_count, 0)
+        self.assertEqual(counter.version, version + 2)
+        self.assertEqual(counters.count_tasks(self.user.id)['open_count'], 0)
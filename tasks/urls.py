@@ -1,10 +1,26 @@
 from django.urls import path
-from .views import create_task, update_task, mark_task_completed, soft_delete_task, list_tasks
+from .views import (
+    create_task, update_task, mark_task_completed, soft_delete_task, get_task, restore_task, list_tasks, search_tasks, task_summary, response_cache_stats, task_calendar, task_changes, export_tasks, import_tasks,
+    bulk_create_tasks, bulk_update_tasks, bulk_complete_tasks, bulk_soft_delete_tasks,
+)
 
 urlpatterns = [
     path('create/', create_task, name='create_task'),
     path('update/<int:task_id>/', update_task, name='update_task'),
     path('complete/<int:task_id>/', mark_task_completed, name='mark_task_completed'),
     path('delete/<int:task_id>/', soft_delete_task, name='soft_delete_task'),
+    path('<int:task_id>/', get_task, name='get_task'),
+    path('restore/<int:task_id>/', restore_task, name='restore_task'),
     path('list/', list_tasks, name='list_tasks'),
+    path('search/', search_tasks, name='search_tasks'),
+    path('summary/', task_summary, name='task_summary'),
+    path('calendar/', task_calendar, name='task_calendar'),
+    path('response-cache/', response_cache_stats, name='response_cache_stats'),
+    path('changes/', task_changes, name='task_changes'),
+    path('export/', export_tasks, name='export_tasks'),
+    path('import/', import_tasks, name='import_tasks'),
+    path('bulk/create/', bulk_create_tasks, name='bulk_create_tasks'),
+    path('bulk/update/', bulk_update_tasks, name='bulk_update_tasks'),
+    path('bulk/complete/', bulk_complete_tasks, name='bulk_complete_tasks'),
+    path('bulk/delete/', bulk_soft_delete_tasks, name='bulk_soft_delete_tasks'),
 ]
@@ -0,0 +1,44 @@
+from django.utils import timezone
+
+def validate_new_task(data, allow_past=False):
+    """
+    Check a create payload, returning an error message or None.
+
+    ``allow_past`` lifts the 'not in the past' rule for historical imports.
+    """
+    required_fields = ['name', 'description', 'to_be_completed_time']
+    for field in required_fields:
+        if field not in data:
+            return f'{field} is required.'
+
+    if not isinstance(data['to_be_completed_time'], str):
+        return 'Invalid datetime format.'
+
+    to_be_completed_time_str = data['to_be_completed_time'].rstrip('Z')
+    try:
+        to_be_completed_time = timezone.datetime.fromisoformat(to_be_completed_time_str)
+        to_be_completed_time = timezone.make_aware(to_be_completed_time, timezone.get_default_timezone())
+    except ValueError:
+        return 'Invalid datetime format.'
+
+    if not allow_past and to_be_completed_time < timezone.now():
+        return 'to_be_completed_time cannot be in the past.'
+    return None
+
+def validate_task_update(data):
+    """Check an update payload, returning an error message or None."""
+    if 'to_be_completed_time' in data:
+        if not isinstance(data['to_be_completed_time'], str):
+            return 'Invalid datetime format.'
+
+        to_be_completed_time_str = data['to_be_completed_time'].rstrip('Z')
+        try:
+            to_be_completed_time = timezone.datetime.fromisoformat(to_be_completed_time_str)
+            if to_be_completed_time.tzinfo is None:
+                to_be_completed_time = timezone.make_aware(to_be_completed_time, timezone.get_default_timezone())
+        except ValueError:
+            return 'Invalid datetime format.'
+
+        if to_be_completed_time < timezone.now():
+            return 'to_be_completed_time cannot be in the past.'
+    return None
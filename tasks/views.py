@@ -1,17 +1,30 @@
+import hashlib
 import json
 import logging
+from datetime import datetime, time, timedelta
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from django.conf import settings
 from django.contrib.auth.models import User
 from django.contrib.auth import authenticate
 from django.utils import timezone
-from django.db import models
+from django.utils.dateparse import parse_date, parse_datetime
+from django.db import models, transaction
+from django.db.models.functions import TruncDate
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+from django.views.decorators.vary import vary_on_headers
 from rest_framework.authtoken.models import Token
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
-from .models import Task
-from .serializers import TaskSerializer
-from .pagination import CustomPageNumberPagination  
+from task_manager import metrics
+from task_manager.db.routers import read_from_replica
+from .models import Task, TaskArchive
+from . import archive, counters, events, export, importer, response_cache, search
+from .serializers import SUMMARY_FIELDS, TaskArchiveSerializer, TaskRowSerializer, TaskSerializer
+from .validation import validate_new_task, validate_task_update
+from .pagination import ChangeFeedPagination, CustomPageNumberPagination, KeysetPagination
 
 # Create a logger instance
 logger = logging.getLogger('myapp')
@@ -22,25 +35,18 @@ def create_task(request):
     data = json.loads(request.body.decode('utf-8'))
     serializer = TaskSerializer(data=data)
 
-    required_fields = ['name', 'description', 'to_be_completed_time']
-    for field in required_fields:
-        if field not in data:
-            return Response({'error': f'{field} is required.'}, status=status.HTTP_400_BAD_REQUEST)
-
-    to_be_completed_time_str = data['to_be_completed_time'].rstrip('Z')
-    try:
-        to_be_completed_time = timezone.datetime.fromisoformat(to_be_completed_time_str)
-        to_be_completed_time = timezone.make_aware(to_be_completed_time, timezone.get_default_timezone())
-    except ValueError:
-        return Response({'error': 'Invalid datetime format.'}, status=status.HTTP_400_BAD_REQUEST)
-    
-    if to_be_completed_time < timezone.now():
-        return Response({'error': 'to_be_completed_time cannot be in the past.'}, status=status.HTTP_400_BAD_REQUEST)
+    error = validate_new_task(data)
+    if error:
+        return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
 
     if serializer.is_valid():
-        task = serializer.save(user=request.user)
+        with transaction.atomic():
+            task = serializer.save(user=request.user)
+            counters.record(request.user.id, opened=1)
+            data = TaskSerializer(task).data
+            events.publish(request.user.id, 'created', task.id, task=data)
         logger.info('Task created successfully by user %s', request.user.username)
-        return Response(TaskSerializer(task).data, status=status.HTTP_201_CREATED)
+        return Response(data, status=status.HTTP_201_CREATED)
     
     logger.error('Error creating task for user %s: %s', request.user.username, serializer.errors)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -58,106 +64,665 @@ def update_task(request, task_id):
 
     data = json.loads(request.body.decode('utf-8'))
 
-    if 'to_be_completed_time' in data:
-        to_be_completed_time_str = data['to_be_completed_time'].rstrip('Z')
-        try:
-            to_be_completed_time = timezone.datetime.fromisoformat(to_be_completed_time_str)
-            if to_be_completed_time.tzinfo is None:
-                to_be_completed_time = timezone.make_aware(to_be_completed_time, timezone.get_default_timezone())
-        except ValueError:
-            return Response({'error': 'Invalid datetime format.'}, status=status.HTTP_400_BAD_REQUEST)
-
-        if to_be_completed_time < timezone.now():
-            return Response({'error': 'to_be_completed_time cannot be in the past.'}, status=status.HTTP_400_BAD_REQUEST)
-        
+    error = validate_task_update(data)
+    if error:
+        return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+
     serializer = TaskSerializer(task, data=data, partial=True)
 
     if serializer.is_valid():
-        serializer.save()
+        with transaction.atomic():
+            serializer.save()
+            counters.record(request.user.id)
+            events.publish(request.user.id, 'updated', task.id, task=serializer.data)
         logger.info('Task updated successfully by user %s', request.user.username)
         return Response(serializer.data, status=status.HTTP_200_OK)
     
     logger.error('Error updating task for user %s: %s', request.user.username, serializer.errors)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+def _get_task_for_error(task_id, user, fields=()):
+    """
+    Explain why a conditional update of ``task_id`` matched no row.
+
+    Returns (error_response, row); row is only set when the task exists,
+    belongs to ``user`` and the caller has to decide what to do with it.
+    """
+    row = Task.objects.filter(id=task_id, deleted=False).values('user_id', *fields).first()
+    if row is None:
+        return Response({'error': 'Task not found'}, status=status.HTTP_404_NOT_FOUND), None
+    if row['user_id'] != user.id:
+        return Response({'error': 'You do not have permission to edit this task'}, status=status.HTTP_403_FORBIDDEN), None
+    return None, row
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def mark_task_completed(request, task_id):
-    try:
-        task = Task.objects.get(id=task_id, deleted=False)
-    except Task.DoesNotExist:
-        return Response({'error': 'Task not found'}, status=status.HTTP_404_NOT_FOUND)
-
-    if task.user != request.user:
-        return Response({'error': 'You do not have permission to edit this task'}, status=status.HTTP_403_FORBIDDEN)
-
-    if task.completed:
-        return Response({'message': 'Task is already completed', 'completion_time': task.completion_time}, status=status.HTTP_200_OK)
+    # A single conditional UPDATE both checks and completes the task, so two
+    # concurrent requests cannot both complete it. Only when nothing matched do
+    # we look the task up again to pick the right response.
+    completion_time = timezone.now()
+    with transaction.atomic():
+        completed = Task.objects.filter(id=task_id, user=request.user, deleted=False, completed=False).update(
+            completed=True, completion_time=completion_time, updated_at=completion_time,
+            sort_priority=0, sort_time=completion_time,
+        )
+        if completed:
+            counters.record(request.user.id, opened=-1, completed=1)
+            events.publish(request.user.id, 'completed', task_id, completion_time=completion_time)
 
-    task.completed = True
-    task.completion_time = timezone.now()
-    task.save()
+    if not completed:
+        error_response, task = _get_task_for_error(task_id, request.user, fields=['completion_time'])
+        if error_response is not None:
+            return error_response
+        return Response({'message': 'Task is already completed', 'completion_time': task['completion_time']}, status=status.HTTP_200_OK)
 
     logger.info('Task marked as completed by user %s', request.user.username)
-    return Response({'message': 'Task marked as completed', 'completion_time': task.completion_time}, status=status.HTTP_200_OK)
+    return Response({'message': 'Task marked as completed', 'completion_time': completion_time}, status=status.HTTP_200_OK)
 
 @api_view(['DELETE'])
 @permission_classes([IsAuthenticated])
 def soft_delete_task(request, task_id):
-    try:
-        task = Task.objects.get(id=task_id, deleted=False)
-    except Task.DoesNotExist:
-        return Response({'error': 'Task not found'}, status=status.HTTP_404_NOT_FOUND)
+    deleted_at = timezone.now()
+    changes = dict(deleted=True, deleted_at=deleted_at, updated_at=deleted_at)
+    task = Task.objects.filter(id=task_id, user=request.user, deleted=False)
 
-    if task.user != request.user:
-        return Response({'error': 'You do not have permission to edit this task'}, status=status.HTTP_403_FORBIDDEN)
-
-    task.deleted = True
-    task.deleted_at = timezone.now()
-    task.save()
+    # Open tasks are tried first; the counters need to know which bucket the
+    # task is leaving, and completed tasks cost a second UPDATE.
+    with transaction.atomic():
+        if task.filter(completed=False).update(**changes):
+            counters.record(request.user.id, opened=-1, deleted=1)
+        elif task.filter(completed=True).update(**changes):
+            counters.record(request.user.id, completed=-1, deleted=1)
+        else:
+            error_response, _ = _get_task_for_error(task_id, request.user)
+            return error_response
+        events.publish(request.user.id, 'deleted', task_id, deleted_at=deleted_at)
 
     logger.info('Task soft-deleted by user %s', request.user.username)
     return Response({'message': 'Task marked as deleted'}, status=status.HTTP_200_OK)
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
-def list_tasks(request):
-    sort_by = request.query_params.get('sort_by', 'created_at')
-    show_pending = request.query_params.get('show_pending', 'false').lower() == 'true'
-    show_completed = request.query_params.get('show_completed', 'false').lower() == 'true'
-    valid_sort_fields = ['created_at', 'to_be_completed_time', 'completion_time']
+@read_from_replica
+def get_task(request, task_id):
+    # Live tasks and tombstones come from Task, older tombstones from the archive.
+    task = Task.objects.filter(id=task_id).first()
+    serializer_class = TaskSerializer
+    if task is None:
+        task = TaskArchive.objects.filter(id=task_id).first()
+        serializer_class = TaskArchiveSerializer
+    if task is None:
+        return Response({'error': 'Task not found'}, status=status.HTTP_404_NOT_FOUND)
 
-    if sort_by not in valid_sort_fields:
-        return Response({'error': f'Invalid sort_by value. Valid values are {valid_sort_fields}'}, status=status.HTTP_400_BAD_REQUEST)
+    if task.user_id != request.user.id:
+        return Response({'error': 'You do not have permission to view this task'}, status=status.HTTP_403_FORBIDDEN)
+
+    data = serializer_class(task).data
+    data['archived'] = serializer_class is TaskArchiveSerializer
+    return Response(data, status=status.HTTP_200_OK)
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def restore_task(request, task_id):
+    archived = TaskArchive.objects.filter(id=task_id).first()
+    if archived is None:
+        return Response({'error': 'Archived task not found'}, status=status.HTTP_404_NOT_FOUND)
+
+    if archived.user_id != request.user.id:
+        return Response({'error': 'You do not have permission to edit this task'}, status=status.HTTP_403_FORBIDDEN)
+
+    try:
+        task = archive.restore(archived)
+    except TaskArchive.DoesNotExist:
+        return Response({'error': 'Archived task not found'}, status=status.HTTP_404_NOT_FOUND)
+
+    logger.info('Archived task restored by user %s', request.user.username)
+    return Response(TaskSerializer(task).data, status=status.HTTP_200_OK)
+
+# Every ordering is backed by one of the partial indexes on Task, so pages are
+# read straight off the index without a sort step.
+TASK_ORDERINGS = {
+    'created_at': ('-created_at', '-id'),
+    'to_be_completed_time': ('-to_be_completed_time', '-id'),
+    'completion_time': ('sort_priority', '-sort_time', '-id'),
+}
+
+# Date filters: *_after is inclusive, *_before exclusive. For completed tasks
+# sort_time is the completion time, and unlike completion_time it is indexed.
+TASK_DATE_FILTERS = {
+    'due_after': 'to_be_completed_time__gte',
+    'due_before': 'to_be_completed_time__lt',
+    'completed_after': 'sort_time__gte',
+    'completed_before': 'sort_time__lt',
+}
 
-    tasks = Task.objects.filter(user=request.user, deleted=False)
+def get_task_queryset(user, sort_by, show_pending=False, show_completed=False,
+                      due_after=None, due_before=None, completed_after=None, completed_before=None):
+    tasks = Task.objects.filter(user=user, deleted=False)
 
     if show_pending:
         tasks = tasks.filter(completed=False)
     elif show_completed:
         tasks = tasks.filter(completed=True)
 
-    if sort_by == 'completion_time':
-        tasks = tasks.annotate(
-            sort_priority = models.Case(
-                models.When(completion_time__isnull=False, then=0),
-                models.When(completion_time__isnull=True, then=1),
-                default=2,
-                output_field=models.IntegerField(),
-            ),
-            sort_field = models.Case(
-                models.When(completion_time__isnull=True, then='to_be_completed_time'),
-                default='completion_time',
-                output_field=models.DateTimeField(),
-            )
-        ).order_by('sort_priority', '-sort_field')
-    elif sort_by == 'to_be_completed_time':
-        tasks = tasks.order_by(f'-{sort_by}')
-    else:
-        tasks = tasks.order_by(f'-{sort_by}')
+    dates = {'due_after': due_after, 'due_before': due_before, 'completed_after': completed_after, 'completed_before': completed_before}
+    lookups = {TASK_DATE_FILTERS[name]: value for name, value in dates.items() if value is not None}
+    if completed_after is not None or completed_before is not None:
+        lookups.update(completed=True, sort_priority=0)
+    if lookups:
+        tasks = tasks.filter(**lookups)
+
+    # 'id' breaks ties so that both page numbers and cursors are stable.
+    return tasks.order_by(*TASK_ORDERINGS[sort_by])
+
+def parse_date_param(value, tz=None):
+    """
+    Read an ISO 8601 datetime, or a date meaning its midnight in ``tz`` (the
+    current time zone by default). Returns None if ``value`` is neither.
+    """
+    try:
+        parsed = parse_datetime(value)
+        if parsed is None:
+            day = parse_date(value)
+            parsed = datetime.combine(day, time.min) if day else None
+    except ValueError:
+        return None
+    if parsed is not None and timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed, tz)
+    return parsed
+
+def parse_list_params(query_params):
+    """Read the list_tasks sort and filter parameters, returning (params, error)."""
+    sort_by = query_params.get('sort_by', 'created_at')
+    show_pending = query_params.get('show_pending', 'false').lower() == 'true'
+    show_completed = query_params.get('show_completed', 'false').lower() == 'true'
+    valid_sort_fields = ['created_at', 'to_be_completed_time', 'completion_time']
+
+    if sort_by not in valid_sort_fields:
+        return None, f'Invalid sort_by value. Valid values are {valid_sort_fields}'
 
-    paginator = CustomPageNumberPagination()
+    params = {'sort_by': sort_by, 'show_pending': show_pending, 'show_completed': show_completed}
+    for name in TASK_DATE_FILTERS:
+        value = query_params.get(name)
+        if value:
+            params[name] = parse_date_param(value)
+            if params[name] is None:
+                return None, f'Invalid {name} value. Use an ISO 8601 date or datetime.'
+    return params, None
+
+TASK_VIEWS = {'full': None, 'summary': SUMMARY_FIELDS}
+
+def parse_fields(query_params):
+    """
+    Read ?fields=a,b or ?view=summary, returning (fields, error). ``fields`` is
+    None when every field is wanted.
+    """
+    view = query_params.get('view')
+    fields = query_params.get('fields')
+    if view is not None and fields is not None:
+        return None, 'Pass either fields or view, not both.'
+
+    if view is not None:
+        if view not in TASK_VIEWS:
+            return None, f'Invalid view value. Valid values are {list(TASK_VIEWS)}'
+        return TASK_VIEWS[view], None
+
+    if fields is None:
+        return None, None
+    names = list(dict.fromkeys(name.strip() for name in fields.split(',') if name.strip()))
+    if not names or any(name not in TaskSerializer.Meta.fields for name in names):
+        return None, f'Invalid fields value. Valid fields are {TaskSerializer.Meta.fields}'
+    return names, None
+
+def _list_tasks_validators(request):
+    if not hasattr(request, '_task_validators'):
+        request._task_validators = counters.get_validators(request.user.id)
+    return request._task_validators
+
+def list_tasks_etag(request):
+    version, _ = _list_tasks_validators(request)
+    key = f'{request.user.id}:{version}:{request.get_full_path()}'
+    return hashlib.md5(key.encode('utf-8')).hexdigest()
+
+# Polling clients send If-None-Match and get a 304 after only the validator
+# lookup when none of their tasks, or task statuses, changed. There is no
+# Last-Modified: HTTP dates have whole seconds, so a change in the same second
+# as the previous response would still get a 304.
+@cache_control(private=True, no_cache=True)
+@vary_on_headers('Authorization')
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@read_from_replica
+@condition(etag_func=list_tasks_etag)
+def list_tasks(request):
+    params, error = parse_list_params(request.query_params)
+    if error:
+        return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+    fields, error = parse_fields(request.query_params)
+    if error:
+        return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+
+    # Repeats of the same request are served from the response cache until
+    # the user's next write or status flip changes the key.
+    key = response_cache.make_key('list', request, _list_tasks_validators(request))
+    data = response_cache.lookup(key)
+    if data is not None:
+        return Response(data)
+
+    sort_by = params['sort_by']
+    tasks = get_task_queryset(request.user, **params)
+
+    # Passing ?cursor= (empty for the first page) switches to keyset pagination,
+    # which skips the COUNT(*) and OFFSET of page-number pagination.
+    if 'cursor' in request.query_params:
+        paginator = KeysetPagination(TASK_ORDERINGS[sort_by])
+    else:
+        paginator = CustomPageNumberPagination()
     paginator.page_size = 5
-    paginated_tasks = paginator.paginate_queryset(tasks, request)
-    serializer = TaskSerializer(paginated_tasks, many=True)
-    return paginator.get_paginated_response(serializer.data)
+
+    # Rows are fetched as plain dicts and rendered by TaskRowSerializer, which
+    # matches TaskSerializer's output without building model instances. Only
+    # the requested fields' columns are read, plus the sort key for cursors.
+    sort_columns = [field.lstrip('-') for field in TASK_ORDERINGS[sort_by]]
+    rows = tasks.values(*dict.fromkeys(TaskRowSerializer.columns_for(fields) + sort_columns))
+    paginated_tasks = paginator.paginate_queryset(rows, request)
+    with metrics.serializer_timer():
+        data = TaskRowSerializer(paginated_tasks, fields=fields).data
+    response = paginator.get_paginated_response(data)
+    response_cache.store(key, response.data)
+    return response
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@read_from_replica
+def search_tasks(request):
+    terms = search.parse_terms(request.query_params.get('q'))
+    if not terms:
+        return Response({'error': 'q is required.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    params, error = parse_list_params(request.query_params)
+    if error:
+        return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+    fields, error = parse_fields(request.query_params)
+    if error:
+        return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+
+    tasks = search.search_tasks(get_task_queryset(request.user, **params), request.query_params['q'])
+    paginator = KeysetPagination(search.SEARCH_ORDERING)
+    rows = paginator.paginate_queryset(tasks.values(*dict.fromkeys(TaskRowSerializer.columns_for(fields) + ['id']), 'rank'), request)
+    with metrics.serializer_timer():
+        results = TaskRowSerializer(rows, fields=fields).data
+        for row, result in zip(rows, results):
+            result['rank'] = row['rank']
+    return paginator.get_paginated_response(results)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@read_from_replica
+def task_summary(request):
+    key = response_cache.make_key('summary', request, _list_tasks_validators(request))
+    data = response_cache.lookup(key)
+    if data is None:
+        data = counters.get_summary(request.user.id)
+        response_cache.store(key, data)
+    return Response(data, status=status.HTTP_200_OK)
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def response_cache_stats(request):
+    return Response(response_cache.get_stats(), status=status.HTTP_200_OK)
+
+# Calendar columns: the bucketed datetime and the filters that, together with
+# the user and the date range, match task_user_due_idx and
+# task_user_done_sort_idx respectively.
+CALENDAR_FIELDS = {
+    'due': ('to_be_completed_time', {}),
+    'completed': ('sort_time', {'completed': True, 'sort_priority': 0}),
+}
+MAX_CALENDAR_DAYS = 366
+
+def get_calendar_queryset(user, field, start, end, tz):
+    # Day boundaries are midnights in ``tz`` and rows are bucketed by their
+    # date there too, all in one GROUP BY query.
+    column, filters = CALENDAR_FIELDS[field]
+    counts = {'count': models.Count('id')}
+    if field == 'due':
+        counts['completed'] = models.Count('id', filter=models.Q(completed=True))
+    return (
+        Task.objects.filter(
+            user=user, deleted=False, **filters, **{
+                f'{column}__gte': datetime.combine(start, time.min, tzinfo=tz),
+                f'{column}__lt': datetime.combine(end + timedelta(days=1), time.min, tzinfo=tz),
+            },
+        )
+        .annotate(date=TruncDate(column, tzinfo=tz))
+        .values('date')
+        .annotate(**counts)
+        .order_by('date')
+    )
+
+@cache_control(private=True, no_cache=True)
+@vary_on_headers('Authorization')
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@read_from_replica
+@condition(etag_func=list_tasks_etag)
+def task_calendar(request):
+    """Per-day task counts between the start and end dates, both inclusive."""
+    field = request.query_params.get('field', 'due')
+    if field not in CALENDAR_FIELDS:
+        return Response({'error': f'Invalid field value. Valid values are {list(CALENDAR_FIELDS)}'}, status=status.HTTP_400_BAD_REQUEST)
+
+    tz_name = request.query_params.get('tz')
+    try:
+        tz = ZoneInfo(tz_name) if tz_name else timezone.get_current_timezone()
+    except (ZoneInfoNotFoundError, ValueError):
+        return Response({'error': 'Invalid tz value. Use an IANA time zone name such as Asia/Kolkata.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        start = parse_date(request.query_params.get('start', ''))
+        end = parse_date(request.query_params.get('end', ''))
+    except ValueError:
+        start = end = None
+    if start is None or end is None:
+        return Response({'error': 'start and end are required as YYYY-MM-DD dates.'}, status=status.HTTP_400_BAD_REQUEST)
+    if not 0 <= (end - start).days < MAX_CALENDAR_DAYS:
+        return Response({'error': f'end must be on or after start and at most {MAX_CALENDAR_DAYS} days later.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response({
+        'field': field,
+        'timezone': str(tz),
+        'start': start,
+        'end': end,
+        'days': list(get_calendar_queryset(request.user, field, start, end, tz)),
+    }, status=status.HTTP_200_OK)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def task_changes(request):
+    # Everything the user's tasks went through after the since token, in
+    # (updated_at, id) order, including soft-deleted tombstones.
+    now = timezone.now()
+    settled = now - timedelta(seconds=settings.TASK_CHANGES_SETTLE_SECONDS)
+    rows = Task.objects.filter(user=request.user, updated_at__lt=settled).values(*TaskRowSerializer.columns)
+
+    paginator = ChangeFeedPagination()
+    # Tombstones older than the archive horizon may have been moved out of the
+    # Task table, so a token from before then could silently miss deletions.
+    position = paginator.decode_cursor(request)
+    # decode_cursor only accepts an aware datetime and an int id.
+    if position is not None and position[0] < archive.archive_horizon(now):
+        return Response({'error': 'The since token has expired; start a full sync without it.'}, status=status.HTTP_410_GONE)
+
+    changes = paginator.paginate_queryset(rows, request)
+    with metrics.serializer_timer():
+        data = TaskRowSerializer(changes).data
+    return paginator.get_paginated_response(data)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def export_tasks(request):
+    params, error = parse_list_params(request.query_params)
+    if error:
+        return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+
+    output = request.query_params.get('output', 'ndjson')
+    if output not in export.FORMATS:
+        return Response({'error': f'Invalid output value. Valid values are {list(export.FORMATS)}'}, status=status.HTTP_400_BAD_REQUEST)
+    compress = request.query_params.get('gzip', 'false').lower() == 'true'
+
+    # iterator() streams rows through a server-side cursor where the database
+    # supports one, so memory stays flat however many tasks are exported.
+    rows = get_task_queryset(request.user, **params).values(*TaskRowSerializer.columns).iterator(chunk_size=export.CHUNK_SIZE)
+
+    logger.info('Exporting tasks as %s for user %s', output, request.user.username)
+    return export.streaming_response(rows, output, compress)
+
+IMPORT_CONTENT_TYPES = {'application/x-ndjson': 'ndjson', 'text/csv': 'csv'}
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def import_tasks(request):
+    # Accepts either a multipart upload in "file" (format from the "format"
+    # field or the file extension) or a raw NDJSON/CSV body. Lines are read
+    # from the upload or the request stream as they are needed.
+    allow_past = request.query_params.get('allow_past', 'false').lower() == 'true'
+    content_type = request.content_type.split(';')[0].strip()
+
+    if content_type in IMPORT_CONTENT_TYPES:
+        file_format = IMPORT_CONTENT_TYPES[content_type]
+        source = request.stream or []
+    elif 'file' in request.FILES:
+        upload = request.FILES['file']
+        file_format = request.data.get('format') or upload.name.rsplit('.', 1)[-1].lower()
+        source = upload
+    else:
+        return Response({'error': 'Upload a file or send an application/x-ndjson or text/csv body.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    if file_format not in importer.FORMATS:
+        return Response({'error': f'Invalid format. Valid values are {importer.FORMATS}'}, status=status.HTTP_400_BAD_REQUEST)
+
+    lines = (line.decode('utf-8-sig') if isinstance(line, bytes) else line for line in source)
+    report = importer.TaskImporter(request.user, allow_past=allow_past).run(lines, file_format)
+
+    logger.info('Imported %d tasks for user %s (%d failed)', report.imported, request.user.username, report.failed)
+    # Chunks are committed as they go, so once any were saved the report,
+    # with its error, is the answer rather than a 400.
+    if report.error and not report.imported:
+        return Response(report.as_dict(), status=status.HTTP_400_BAD_REQUEST)
+    return Response(report.as_dict(), status=status.HTTP_200_OK)
+
+# Batch endpoints. Each accepts up to MAX_BATCH_SIZE items, validates them in
+# one pass and writes them in a single transaction. The response is always 200
+# with one result per item, in request order, carrying its own status code.
+
+MAX_BATCH_SIZE = 1000
+
+def _load_batch(request, key=None):
+    """Return (items, error_response) for a JSON list body, or a list under ``key``."""
+    try:
+        data = json.loads(request.body.decode('utf-8'))
+    except ValueError:
+        return None, Response({'error': 'Invalid JSON.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    if key is not None:
+        data = data.get(key) if isinstance(data, dict) else None
+    if not isinstance(data, list) or not data:
+        expected = f'a non-empty list under "{key}"' if key else 'a non-empty list'
+        return None, Response({'error': f'Expected {expected}.'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(data) > MAX_BATCH_SIZE:
+        return None, Response({'error': f'At most {MAX_BATCH_SIZE} items are allowed per request.'}, status=status.HTTP_400_BAD_REQUEST)
+    return data, None
+
+def _load_batch_ids(request):
+    ids, error_response = _load_batch(request, key='ids')
+    if error_response is None and not all(isinstance(task_id, int) and not isinstance(task_id, bool) for task_id in ids):
+        error_response = Response({'error': 'ids must be integers.'}, status=status.HTTP_400_BAD_REQUEST)
+    return ids, error_response
+
+def _validate_batch(items, indexes, **kwargs):
+    """
+    Run TaskSerializer(many=True) over ``items[i] for i in indexes``.
+
+    Returns ({index: validated_data}, {index: errors}). A failing batch is
+    validated once more without its invalid items to recover the valid ones.
+    """
+    serializer = TaskSerializer(data=[items[i] for i in indexes], many=True, **kwargs)
+    if serializer.is_valid():
+        return dict(zip(indexes, serializer.validated_data)), {}
+
+    errors = {i: item_errors for i, item_errors in zip(indexes, serializer.errors) if item_errors}
+    valid_indexes = [i for i in indexes if i not in errors]
+    if not valid_indexes:
+        return {}, errors
+    validated, _ = _validate_batch(items, valid_indexes, **kwargs)
+    return validated, errors
+
+def _check_batch_ownership(request, ids, rows):
+    """Return per-id error results for ids that are missing or owned by another user."""
+    results = {}
+    for task_id in ids:
+        row = rows.get(task_id)
+        if row is None:
+            results[task_id] = {'id': task_id, 'status': status.HTTP_404_NOT_FOUND, 'error': 'Task not found'}
+        elif row['user_id'] != request.user.id:
+            results[task_id] = {'id': task_id, 'status': status.HTTP_403_FORBIDDEN, 'error': 'You do not have permission to edit this task'}
+    return results
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def bulk_create_tasks(request):
+    items, error_response = _load_batch(request)
+    if error_response is not None:
+        return error_response
+
+    results = [None] * len(items)
+    checked = []
+    for i, item in enumerate(items):
+        error = validate_new_task(item) if isinstance(item, dict) else 'Expected an object.'
+        if error:
+            results[i] = {'index': i, 'status': status.HTTP_400_BAD_REQUEST, 'error': error}
+        else:
+            checked.append(i)
+
+    validated, errors = _validate_batch(items, checked) if checked else ({}, {})
+    for i, item_errors in errors.items():
+        results[i] = {'index': i, 'status': status.HTTP_400_BAD_REQUEST, 'errors': item_errors}
+
+    tasks = [Task(user=request.user, **validated[i]) for i in validated]
+    with transaction.atomic():
+        Task.objects.bulk_create(tasks)
+        if tasks:
+            counters.record(request.user.id, opened=len(tasks))
+            events.publish_resync(request.user.id)
+
+    for i, task in zip(validated, tasks):
+        results[i] = {'index': i, 'status': status.HTTP_201_CREATED, 'task': TaskSerializer(task).data}
+
+    logger.info('%d tasks created in bulk by user %s', len(tasks), request.user.username)
+    return Response({'results': results}, status=status.HTTP_200_OK)
+
+@api_view(['PUT'])
+@permission_classes([IsAuthenticated])
+def bulk_update_tasks(request):
+    items, error_response = _load_batch(request)
+    if error_response is not None:
+        return error_response
+
+    results = [None] * len(items)
+    checked = []
+    seen_ids = set()
+    for i, item in enumerate(items):
+        if not isinstance(item, dict):
+            error = 'Expected an object.'
+        elif not isinstance(item.get('id'), int) or isinstance(item.get('id'), bool):
+            error = 'id is required.'
+        elif item['id'] in seen_ids:
+            error = 'Duplicate id.'
+        else:
+            error = validate_task_update(item)
+        if error:
+            results[i] = {'index': i, 'status': status.HTTP_400_BAD_REQUEST, 'error': error}
+        else:
+            seen_ids.add(item['id'])
+            checked.append(i)
+
+    validated, errors = _validate_batch(items, checked, partial=True) if checked else ({}, {})
+    for i, item_errors in errors.items():
+        results[i] = {'index': i, 'status': status.HTTP_400_BAD_REQUEST, 'errors': item_errors}
+
+    with transaction.atomic():
+        tasks = Task.objects.select_for_update().in_bulk([items[i]['id'] for i in validated])
+        rows = {task_id: {'user_id': task.user_id} for task_id, task in tasks.items() if not task.deleted}
+        denied = _check_batch_ownership(request, [items[i]['id'] for i in validated], rows)
+
+        now = timezone.now()
+        updated = []
+        fields = {'updated_at'}
+        for i, attrs in validated.items():
+            task_id = items[i]['id']
+            if task_id in denied:
+                results[i] = dict(denied[task_id], index=i)
+                continue
+            task = tasks[task_id]
+            for field, value in attrs.items():
+                setattr(task, field, value)
+            task.updated_at = now
+            fields.update(attrs)
+            updated.append((i, task))
+
+        if updated:
+            Task.objects.bulk_update([task for _, task in updated], fields)
+            counters.record(request.user.id)
+            events.publish_resync(request.user.id)
+
+    for i, task in updated:
+        results[i] = {'index': i, 'status': status.HTTP_200_OK, 'task': TaskSerializer(task).data}
+
+    logger.info('%d tasks updated in bulk by user %s', len(updated), request.user.username)
+    return Response({'results': results}, status=status.HTTP_200_OK)
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def bulk_complete_tasks(request):
+    ids, error_response = _load_batch_ids(request)
+    if error_response is not None:
+        return error_response
+
+    with transaction.atomic():
+        rows = {
+            row['id']: row
+            for row in Task.objects.select_for_update().filter(id__in=ids, deleted=False).values('id', 'user_id', 'completed', 'completion_time')
+        }
+        results = _check_batch_ownership(request, ids, rows)
+
+        now = timezone.now()
+        to_complete = {task_id for task_id in ids if task_id not in results and not rows[task_id]['completed']}
+        if to_complete:
+            Task.objects.filter(id__in=to_complete).update(
+                completed=True, completion_time=now, updated_at=now,
+                sort_priority=0, sort_time=now,
+            )
+            counters.record(request.user.id, opened=-len(to_complete), completed=len(to_complete))
+            events.publish_resync(request.user.id)
+
+    for task_id in ids:
+        if task_id in results:
+            continue
+        if task_id in to_complete:
+            results[task_id] = {'id': task_id, 'status': status.HTTP_200_OK, 'message': 'Task marked as completed', 'completion_time': now}
+        else:
+            results[task_id] = {'id': task_id, 'status': status.HTTP_200_OK, 'message': 'Task is already completed', 'completion_time': rows[task_id]['completion_time']}
+
+    logger.info('%d tasks marked as completed in bulk by user %s', len(to_complete), request.user.username)
+    return Response({'results': [results[task_id] for task_id in ids]}, status=status.HTTP_200_OK)
+
+# POST rather than DELETE because many HTTP clients drop DELETE bodies.
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def bulk_soft_delete_tasks(request):
+    ids, error_response = _load_batch_ids(request)
+    if error_response is not None:
+        return error_response
+
+    with transaction.atomic():
+        rows = {
+            row['id']: row
+            for row in Task.objects.select_for_update().filter(id__in=ids, deleted=False).values('id', 'user_id', 'completed')
+        }
+        results = _check_batch_ownership(request, ids, rows)
+
+        now = timezone.now()
+        to_delete = {task_id for task_id in ids if task_id not in results}
+        if to_delete:
+            Task.objects.filter(id__in=to_delete).update(deleted=True, deleted_at=now, updated_at=now)
+            completed = sum(rows[task_id]['completed'] for task_id in to_delete)
+            counters.record(request.user.id, opened=completed - len(to_delete), completed=-completed, deleted=len(to_delete))
+            events.publish_resync(request.user.id)
+
+    for task_id in to_delete:
+        results[task_id] = {'id': task_id, 'status': status.HTTP_200_OK, 'message': 'Task marked as deleted'}
+
+    logger.info('%d tasks soft-deleted in bulk by user %s', len(to_delete), request.user.username)
+    return Response({'results': [results[task_id] for task_id in ids]}, status=status.HTTP_200_OK)
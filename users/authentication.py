@@ -0,0 +1,148 @@
+import copy
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication, get_authorization_header
+from rest_framework.authtoken.models import Token
+
+from task_manager.cache import LRUCache
+
+TOKEN_AUTH_CACHE = {
+    'MAX_SIZE': 10000,
+    'TTL': 30,
+    'SHARED_CACHE': None,
+    'SHARED_TTL': 300,
+    **getattr(settings, 'TOKEN_AUTH_CACHE', {}),
+}
+
+# Token key -> (Token with its user loaded, stamp). Evicting a token clears
+# this process's entry at once. Other processes only find out through the
+# shared tier: the stamp stored there is deleted on eviction and every local
+# hit is checked against it. Without SHARED_CACHE nothing tells them, so a
+# token deleted or a user deactivated elsewhere keeps working in the other
+# workers for up to TTL seconds; only a single worker process gets immediate
+# eviction that way.
+token_cache = LRUCache(max_size=TOKEN_AUTH_CACHE['MAX_SIZE'], ttl=TOKEN_AUTH_CACHE['TTL'])
+shared_stats = {'hits': 0, 'misses': 0}
+
+
+def _shared_cache():
+    alias = TOKEN_AUTH_CACHE['SHARED_CACHE']
+    return caches[alias] if alias else None
+
+
+def _shared_key(key):
+    return f'auth-token:{key}'
+
+
+def _stamp_key(key):
+    return f'auth-token-stamp:{key}'
+
+
+def evict_token(key):
+    token_cache.delete(key)
+    shared = _shared_cache()
+    if shared is not None:
+        shared.delete_many([_shared_key(key), _stamp_key(key)])
+
+
+def evict_user_tokens(user_id):
+    """
+    Evict every token of a user. The post_save signal calls this; call it
+    yourself after changing users with QuerySet.update(), which sends none.
+    """
+    for key in Token.objects.filter(user_id=user_id).values_list('key', flat=True):
+        evict_token(key)
+
+
+def get_stats():
+    stats = token_cache.stats()
+    if _shared_cache() is not None:
+        stats['shared_hits'] = shared_stats['hits']
+        stats['shared_misses'] = shared_stats['misses']
+    return stats
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication that remembers token -> user lookups.
+
+    Hits skip the authtoken_token/auth_user query entirely. Logging out
+    (deleting the token) and saving or deactivating the user evict the entry;
+    see users.signals and the note on token_cache about other processes.
+    """
+
+    def authenticate_credentials(self, key):
+        shared = _shared_cache()
+        entry = token_cache.get(key)
+        if entry is not None and shared is not None and shared.get(_stamp_key(key)) != entry[1]:
+            # Evicted by another process since it was cached here.
+            token_cache.delete(key)
+            entry = None
+
+        if entry is None:
+            if shared is not None:
+                entry = shared.get(_shared_key(key))
+                shared_stats['hits' if entry is not None else 'misses'] += 1
+            if entry is None:
+                user, token = super().authenticate_credentials(key)
+                entry = (token, uuid.uuid4().hex)
+                if shared is not None:
+                    shared.set_many({_shared_key(key): entry, _stamp_key(key): entry[1]}, TOKEN_AUTH_CACHE['SHARED_TTL'])
+            token_cache.set(key, entry)
+
+        return self._for_request(entry[0])
+
+    async def aauthenticate(self, request):
+        """Async counterpart of authenticate() for plain Django async views."""
+        auth = get_authorization_header(request).split()
+
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+
+        if len(auth) != 2:
+            raise exceptions.AuthenticationFailed(_('Invalid token header. Token string should not contain spaces.'))
+
+        try:
+            key = auth[1].decode()
+        except UnicodeError:
+            raise exceptions.AuthenticationFailed(_('Invalid token header. Token string should not contain invalid characters.'))
+
+        return await self.aauthenticate_credentials(key)
+
+    async def aauthenticate_credentials(self, key):
+        shared = _shared_cache()
+        entry = token_cache.get(key)
+        if entry is not None and shared is not None and await shared.aget(_stamp_key(key)) != entry[1]:
+            token_cache.delete(key)
+            entry = None
+
+        if entry is None:
+            if shared is not None:
+                entry = await shared.aget(_shared_key(key))
+                shared_stats['hits' if entry is not None else 'misses'] += 1
+            if entry is None:
+                model = self.get_model()
+                try:
+                    token = await model.objects.select_related('user').aget(key=key)
+                except model.DoesNotExist:
+                    raise exceptions.AuthenticationFailed(_('Invalid token.'))
+                if not token.user.is_active:
+                    raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+                entry = (token, uuid.uuid4().hex)
+                if shared is not None:
+                    await shared.aset_many({_shared_key(key): entry, _stamp_key(key): entry[1]}, TOKEN_AUTH_CACHE['SHARED_TTL'])
+            token_cache.set(key, entry)
+
+        return self._for_request(entry[0])
+
+    @staticmethod
+    def _for_request(token):
+        # Hand each request its own copies so per-request state never leaks
+        # into the cached instances.
+        token = copy.copy(token)
+        token.user = copy.copy(token.user)
+        return (token.user, token)
@@ -0,0 +1,19 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from .authentication import evict_token, evict_user_tokens
+
+
+@receiver(post_delete, sender=Token)
+def evict_deleted_token(sender, instance, **kwargs):
+    evict_token(instance.key)
+
+
+@receiver(post_save, sender=User)
+def evict_saved_user_tokens(sender, instance, created, **kwargs):
+    if created:
+        return
+    # Covers deactivation as well as any other change to the cached user.
+    evict_user_tokens(instance.id)
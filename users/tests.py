@@ -4,6 +4,12 @@ from rest_framework.test import APITestCase
 from django.contrib.auth.models import User
 from rest_framework.authtoken.models import Token
 from tasks.models import Task 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from unittest import mock
+from task_manager.cache import LRUCache
+from users import authentication
+from users.authentication import token_cache
 import json
 
 class UserTests(APITestCase):
@@ -56,4 +62,72 @@ class UserTests(APITestCase):
         url = reverse('logout')
         response = self.client.post(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(Token.objects.filter(user=self.user).count(), 0)
\ No newline at end of file
+        self.assertEqual(Token.objects.filter(user=self.user).count(), 0)
+
+class CachedTokenAuthenticationTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword', email='test@example.com')
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        self.url = reverse('list_tasks')
+
+    def token_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [query for query in queries.captured_queries if 'authtoken_token' in query['sql']]
+
+    def test_cached_token_skips_lookup(self):
+        self.assertEqual(len(self.token_queries()), 1)
+        hits = token_cache.hits
+        self.assertEqual(self.token_queries(), [])
+        self.assertEqual(token_cache.hits, hits + 1)
+
+    def test_logout_evicts_token(self):
+        self.client.get(self.url)
+        response = self.client.post(reverse('logout'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(token_cache.get(self.token.key))
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivation_evicts_token(self):
+        self.client.get(self.url)
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @mock.patch.dict(authentication.TOKEN_AUTH_CACHE, SHARED_CACHE='default')
+    def test_eviction_reaches_other_processes(self):
+        # Two workers with their own local caches sharing one cache tier.
+        workers = [LRUCache(), LRUCache()]
+
+        def get_as(worker):
+            with mock.patch.object(authentication, 'token_cache', workers[worker]):
+                return self.client.get(self.url).status_code
+
+        self.assertEqual((get_as(0), get_as(1)), (200, 200))
+        with self.assertNumQueries(0), mock.patch.object(authentication, 'token_cache', workers[1]):
+            authentication.CachedTokenAuthentication().authenticate_credentials(self.token.key)
+
+        with mock.patch.object(authentication, 'token_cache', workers[0]):
+            self.user.is_active = False
+            self.user.save()
+        self.assertEqual(get_as(1), status.HTTP_401_UNAUTHORIZED)
+
+        self.user.is_active = True
+        self.user.save()
+        self.assertEqual(get_as(1), 200)
+        with mock.patch.object(authentication, 'token_cache', workers[0]):
+            self.assertEqual(self.client.post(reverse('logout')).status_code, 200)
+        self.assertEqual(get_as(1), status.HTTP_401_UNAUTHORIZED)
+
+    def test_stats_require_admin(self):
+        url = reverse('token_cache_stats')
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('evictions', response.data)
@@ -1,8 +1,9 @@
 from django.urls import path
-from .views import register, login_view, logout_view
+from .views import register, login_view, logout_view, token_cache_stats
 
 urlpatterns = [
     path('register/', register, name='register'),
     path('login/', login_view, name='login'),
     path('logout/', logout_view, name='logout'),
+    path('token-cache/', token_cache_stats, name='token_cache_stats'),
 ]
@@ -6,9 +6,10 @@ from django.utils import timezone
 from django.db import models
 from rest_framework.authtoken.models import Token
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
+from .authentication import get_stats as get_token_cache_stats
 
 logger = logging.getLogger('myapp')
 
@@ -62,4 +63,9 @@ def login_view(request):
 def logout_view(request):
     logger.info('User %s logging out', request.user.username)
     request.user.auth_token.delete()
-    return Response({'message': 'Logout successful'}, status=status.HTTP_200_OK)
\ No newline at end of file
+    return Response({'message': 'Logout successful'}, status=status.HTTP_200_OK)
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def token_cache_stats(request):
+    return Response(get_token_cache_stats(), status=status.HTTP_200_OK)